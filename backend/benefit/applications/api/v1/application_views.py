@@ -2,7 +2,7 @@ import logging
 import re
 from datetime import date, timedelta
 from decimal import ROUND_DOWN, Decimal
-from typing import List
+from typing import Iterator, List
 
 from azure.core.exceptions import ResourceNotFoundError
 from dateutil.relativedelta import relativedelta
@@ -32,6 +32,7 @@ from rest_framework.views import APIView
 from simple_history.utils import update_change_reason
 from sql_util.aggregates import SubqueryCount
 
+from applications.api.v1.pagination import SimplifiedListKeysetPagination
 from applications.api.v1.serializers.application import (
     ApplicantApplicationSerializer,
     HandlerApplicationListSerializer,
@@ -53,14 +54,12 @@ from applications.models import (
     AhjoSetting,
     Application,
     ApplicationAlteration,
-    ApplicationBatch,
     ApplicationLogEntry,
 )
 from applications.services.ahjo_integration import (
     ExportFileInfo,
-    generate_zip,
-    prepare_csv_file,
-    prepare_pdf_files,
+    iter_csv_pdf_files,
+    stream_zip,
 )
 from applications.services.application_alteration_csv_report import (
     AlterationCsvConfigurableFields,
@@ -71,6 +70,10 @@ from applications.services.applications_power_bi_csv_report import (
     ApplicationsPowerBiCsvService,
 )
 from applications.services.clone_application import clone_application_based_on_other
+from applications.services.export_jobs import (
+    create_application_batch,
+    export_filename_without_suffix,
+)
 from applications.services.generate_application_summary import (
     generate_application_summary_file,
     generate_handler_application_pdf,
@@ -280,12 +283,34 @@ class BaseApplicationViewSet(AuditLoggingModelViewSet):
         """  # noqa: E501
         context = self.get_serializer_context()
         qs = self._get_simplified_queryset(request, context)
-        serializer = self.serializer_class(qs, many=True, context=context)
+        return self._simplified_list_response(
+            request, qs, self.serializer_class, context
+        )
+
+    def _simplified_list_response(self, request, qs, serializer_class, context):
+        """
+        Serialize the simplified list. If a page_size or a cursor is given, only a
+        single page of the list is returned along with the link to the next page.
+        """
+        order_by_employee_name = request.query_params.get("order_by") in [
+            "employee_name"
+        ]
+
+        if SimplifiedListKeysetPagination.is_requested(request):
+            paginator = SimplifiedListKeysetPagination(request)
+            if order_by_employee_name:
+                page = paginator.paginate_queryset_by_employee_name(qs)
+            else:
+                page = paginator.paginate_queryset(qs)
+            serializer = serializer_class(page, many=True, context=context)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(qs, many=True, context=context)
         data = serializer.data
 
         # Sorting by encrypted fields has to be done after the data has been retrieved
         # and decrypted
-        if request.query_params.get("order_by") in ["employee_name"]:
+        if order_by_employee_name:
             data = sorted(
                 data,
                 key=lambda item: (
@@ -951,15 +976,16 @@ class HandlerApplicationViewSet(BaseApplicationViewSet):
     def simplified_application_list(self, request):
         context = self.get_serializer_context()
         qs = self._get_simplified_queryset(request, context)
-        qs = qs.exclude(
-            status=ApplicationStatus.DRAFT,
-            application_origin=ApplicationOrigin.APPLICANT,
+        qs = (
+            qs.exclude(
+                status=ApplicationStatus.DRAFT,
+                application_origin=ApplicationOrigin.APPLICANT,
+            )
+            .select_related("handler")
+            .prefetch_related("alteration_set")
         )
-        serializer = HandlerApplicationListSerializer(qs, many=True, context=context)
-
-        return Response(
-            serializer.data,
-            status=status.HTTP_200_OK,
+        return self._simplified_list_response(
+            request, qs, HandlerApplicationListSerializer, context
         )
 
     @action(detail=False, methods=["get"])
@@ -1134,28 +1160,12 @@ class HandlerApplicationViewSet(BaseApplicationViewSet):
         Create a new application batch out of the existing applications in the given status
         that are not yet assigned to a batch.
         """  # noqa: E501
-        queryset = self.get_queryset().filter(status=status, batch__isnull=True)
-        status_map = {
-            ApplicationStatus.ACCEPTED: ApplicationBatchStatus.DECIDED_ACCEPTED,
-            ApplicationStatus.REJECTED: ApplicationBatchStatus.DECIDED_REJECTED,
-        }
-        if status not in status_map:
-            raise AssertionError("Internal error, should not happen")
-
-        application_ids = [application.pk for application in queryset]
-        if queryset:
-            batch = ApplicationBatch.objects.create(
-                proposal_for_decision=status_map[status]
-            )
-            queryset.update(batch=batch)
+        application_ids = create_application_batch(self.get_queryset(), status)
         return self.get_queryset().filter(pk__in=application_ids)
 
     @staticmethod
     def _export_filename_without_suffix():
-        return format_lazy(
-            _("Helsinki-lisan hakemukset viety {date}"),
-            date=timezone.now().strftime("%Y%m%d_%H%M%S"),
-        )
+        return export_filename_without_suffix()
 
     def _csv_response(
         self,
@@ -1193,21 +1203,20 @@ class HandlerApplicationViewSet(BaseApplicationViewSet):
         self,
         queryset: QuerySet[Application],
         remove_quotes: bool = False,
-    ) -> HttpResponse:
+    ) -> StreamingHttpResponse:
         ordered_queryset = queryset.order_by(self.APPLICATION_ORDERING)
         export_filename_without_suffix = self._export_filename_without_suffix()
 
-        csv_file = prepare_csv_file(
+        files: Iterator[ExportFileInfo] = iter_csv_pdf_files(
             ordered_queryset, remove_quotes, export_filename_without_suffix
         )
 
-        pdf_files: List[ExportFileInfo] = prepare_pdf_files(ordered_queryset)
-
-        zip_file: bytes = generate_zip([csv_file] + pdf_files)
         zip_filename = f"{export_filename_without_suffix}.zip"
 
-        response: HttpResponse = HttpResponse(
-            zip_file, content_type="application/x-zip-compressed"
+        # The PDFs are converted and zipped while the response is streamed
+        response = StreamingHttpResponse(
+            stream_zip(files),
+            content_type="application/x-zip-compressed",
         )
         response["Content-Disposition"] = f"attachment; filename={zip_filename}"
         return response
@@ -0,0 +1,44 @@
+from django.http import FileResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from applications.api.v1.serializers.export_job import ExportJobSerializer
+from applications.enums import ExportJobStatus
+from applications.models import ExportJob
+from common.permissions import BFIsHandler
+from shared.audit_log.viewsets import AuditLoggingModelViewSet
+
+
+class HandlerExportJobViewSet(AuditLoggingModelViewSet):
+    """
+    Enqueue handler exports to be run by the run_export_jobs command, poll their
+    status and download their results. Each handler only sees their own jobs.
+    """
+
+    serializer_class = ExportJobSerializer
+    permission_classes = [BFIsHandler]
+    http_method_names = ["get", "post", "head", "options"]
+
+    def get_queryset(self):
+        user = self.request.user
+        if not user.is_authenticated:
+            return ExportJob.objects.none()
+        return ExportJob.objects.filter(created_by=user).order_by("-created_at")
+
+    @action(methods=["GET"], detail=True)
+    def download(self, request, pk=None):
+        with self.record_action():
+            job = self.get_object()
+            if job.status != ExportJobStatus.COMPLETED:
+                return Response(
+                    {"detail": _("The export is not completed")},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return FileResponse(
+                job.result_file.open("rb"),
+                as_attachment=True,
+                filename=job.result_filename,
+                content_type=job.result_content_type,
+            )
@@ -0,0 +1,256 @@
+import base64
+import datetime
+import json
+
+from django.core.exceptions import FieldError, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet, Value
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from applications.models import Application
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder that keeps the microseconds of the datetimes, which
+    DjangoJSONEncoder truncates to milliseconds, so the cursor values match the
+    timestamps of the rows exactly
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class SimplifiedListKeysetPagination:
+    """
+    Opt-in keyset pagination for the simplified application lists.
+
+    The next page is selected with a WHERE clause that continues from the ordering
+    values of the last row of the previous page, so only one page of applications is
+    serialized per request and the pages stay stable while applications are added.
+    The primary key is always used as the final tie-breaker.
+
+    Ordering by the encrypted employee name uses Employee.name_sort_key, a keyed
+    order preserving key of the last name prefix, as the keyset column. Only the
+    employee names of the sort key buckets touched by the page are decrypted for the
+    exact ordering.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    default_page_size = 100
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, request):
+        self.request = request
+        self.next_cursor = None
+
+    @classmethod
+    def is_requested(cls, request) -> bool:
+        return (
+            cls.page_size_query_param in request.query_params
+            or cls.cursor_query_param in request.query_params
+        )
+
+    def get_page_size(self) -> int:
+        try:
+            page_size = int(
+                self.request.query_params.get(
+                    self.page_size_query_param, self.default_page_size
+                )
+            )
+        except ValueError:
+            return self.default_page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def decode_cursor(self) -> list | None:
+        encoded = self.request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(cursor, list):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def convert_cursor(self, queryset: QuerySet, fields: list[str], cursor: list):
+        """
+        Convert the decoded cursor values to the Python values of the fields they
+        were encoded from, so a tampered cursor is rejected as invalid instead of
+        failing in the query
+        """
+        if len(cursor) != len(fields):
+            raise NotFound(self.invalid_cursor_message)
+        query = queryset.query.chain()
+        try:
+            return [
+                None
+                if value is None
+                else query.resolve_ref(field.lstrip("-")).output_field.to_python(value)
+                for field, value in zip(fields, cursor)
+            ]
+        except (FieldError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def encode_cursor(values) -> str:
+        return base64.urlsafe_b64encode(
+            json.dumps(list(values), cls=CursorJSONEncoder).encode("utf-8")
+        ).decode("ascii")
+
+    @staticmethod
+    def get_ordering(queryset: QuerySet) -> list[str]:
+        ordering = [
+            field
+            for field in (queryset.query.order_by or queryset.model._meta.ordering)
+            if isinstance(field, str) and field.lstrip("-") not in ("pk", "id")
+        ]
+        return ordering + ["pk"]
+
+    @staticmethod
+    def _after_value(field: str, value) -> Q:
+        """Rows that come after the value in PostgreSQL's default NULL ordering"""
+        name = field.lstrip("-")
+        descending = field.startswith("-")
+        if value is None:
+            # NULLs are last in ascending and first in descending order
+            return Q(**{f"{name}__isnull": False}) if descending else Q(pk__in=[])
+        if descending:
+            return Q(**{f"{name}__lt": value})
+        return Q(**{f"{name}__gt": value}) | Q(**{f"{name}__isnull": True})
+
+    @staticmethod
+    def _equal_value(field: str, value) -> Q:
+        name = field.lstrip("-")
+        if value is None:
+            return Q(**{f"{name}__isnull": True})
+        return Q(**{name: value})
+
+    def _after_cursor(self, ordering: list[str], cursor: list) -> Q:
+        condition = Q(pk__in=[])
+        for index, field in enumerate(ordering):
+            row_condition = self._after_value(field, cursor[index])
+            for previous_field, previous_value in zip(ordering[:index], cursor[:index]):
+                row_condition &= self._equal_value(previous_field, previous_value)
+            condition |= row_condition
+        return condition
+
+    @staticmethod
+    def _load_in_order(queryset: QuerySet, pks: list) -> list[Application]:
+        applications = {
+            application.pk: application
+            for application in queryset.filter(pk__in=pks).order_by()
+        }
+        return [applications[pk] for pk in pks]
+
+    def paginate_queryset(self, queryset: QuerySet) -> list[Application]:
+        """Return the requested page of the queryset in its current ordering"""
+        page_size = self.get_page_size()
+        ordering = self.get_ordering(queryset)
+        field_names = [field.lstrip("-") for field in ordering]
+
+        page_queryset = queryset.order_by(*ordering)
+        cursor = self.decode_cursor()
+        if cursor is not None:
+            cursor = self.convert_cursor(queryset, ordering, cursor)
+            page_queryset = page_queryset.filter(self._after_cursor(ordering, cursor))
+
+        rows = list(page_queryset.values_list(*field_names)[: page_size + 1])
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+
+        return self._load_in_order(queryset, [row[-1] for row in rows])
+
+    @staticmethod
+    def _employee_name_sort_key(row) -> tuple:
+        sort_key, pk, last_name, first_name = row
+        return (
+            sort_key,
+            (last_name or "").lower(),
+            (first_name or "").lower(),
+            str(pk),
+        )
+
+    def paginate_queryset_by_employee_name(
+        self, queryset: QuerySet
+    ) -> list[Application]:
+        """
+        Return the requested page of the queryset ordered by employee last name, first
+        name and primary key. The cursor only holds the sort key and the primary key of
+        the last row, so that decrypted names never end up in URLs.
+        """
+        page_size = self.get_page_size()
+        queryset = queryset.annotate(
+            employee_name_sort_key=Coalesce("employee__name_sort_key", Value(0))
+        ).order_by()
+        fields = (
+            "employee_name_sort_key",
+            "pk",
+            "employee__encrypted_last_name",
+            "employee__encrypted_first_name",
+        )
+
+        rows = []
+        following = queryset
+        cursor = self.decode_cursor()
+        if cursor is not None:
+            cursor = self.convert_cursor(queryset, fields[:2], cursor)
+            bucket = list(
+                queryset.filter(employee_name_sort_key=cursor[0]).values_list(*fields)
+            )
+            cursor_rows = [row for row in bucket if row[1] == cursor[1]] or list(
+                # The last row of the previous page may have been filtered out since
+                Application.objects.annotate(employee_name_sort_key=Value(cursor[0]))
+                .filter(pk=cursor[1])
+                .values_list(*fields)
+            )
+            if not cursor_rows:
+                raise NotFound(self.invalid_cursor_message)
+            cursor_key = self._employee_name_sort_key(cursor_rows[0])
+            rows = [
+                row for row in bucket if self._employee_name_sort_key(row) > cursor_key
+            ]
+            following = queryset.filter(employee_name_sort_key__gt=cursor[0])
+
+        # Find the sort key bucket that completes the page and decrypt the names of
+        # the rows in the buckets up to it
+        missing = page_size + 1 - len(rows)
+        if missing > 0:
+            last_sort_keys = list(
+                following.order_by("employee_name_sort_key").values_list(
+                    "employee_name_sort_key", flat=True
+                )[missing - 1 : missing]
+            )
+            if last_sort_keys:
+                following = following.filter(
+                    employee_name_sort_key__lte=last_sort_keys[0]
+                )
+            rows += following.values_list(*fields)
+
+        rows = sorted(rows, key=self._employee_name_sort_key)
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode_cursor(rows[-1][:2])
+
+        return self._load_in_order(queryset, [row[1] for row in rows])
+
+    def get_next_link(self) -> str | None:
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.next_cursor,
+        )
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({"next": self.get_next_link(), "results": data})
@@ -12,7 +12,6 @@ from django.db import models
 from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from fuzzywuzzy import fuzz
 from rest_framework import filters as drf_filters
 from rest_framework import status
 from rest_framework.response import Response
@@ -24,7 +23,12 @@ from applications.api.v1.serializers.application import (
     HandlerApplicationListSerializer,
 )
 from applications.enums import ApplicationStatus
-from applications.models import Application, ArchivalApplication
+from applications.models import (
+    Application,
+    ArchivalApplication,
+    EmployeeNameSearchKey,
+)
+from applications.services.employee_name_search import EmployeeNameMatcher
 from common.permissions import BFIsHandler
 from messages.models import MessageType
 
@@ -276,53 +280,6 @@ def search_applications(
     )
 
 
-def _fuzzy_matching(applications, query, threshold):
-    """Advanced fuzzy matching for all possible combinations of first/lastname orders"""
-
-    scores = []
-    for index, app in enumerate(applications):
-        ratios = [
-            fuzz.ratio(str(query), str(value))
-            for value in _get_filter_combinations(app)
-        ]
-        scores.append({"index": index, "score": max(ratios)})
-
-    filtered_scores = [item for item in scores if item["score"] >= threshold]
-    sorted_filtered_scores = sorted(
-        filtered_scores, key=lambda k: k["score"], reverse=True
-    )
-
-    filtered_list_of_dicts = [
-        applications[item["index"]] for item in sorted_filtered_scores
-    ]
-    return {"data": filtered_list_of_dicts, "scores": sorted_filtered_scores}
-
-
-def _contains_matching(
-    applications,
-    query,
-):
-    """Simple substring matching for all possible combinations of first/lastname orders,
-    used as fallback for fuzzy matching"""
-    results = []
-    for app in applications:
-        for value in _get_filter_combinations(app):
-            if query in value.lower():
-                results.append(app)
-                break
-    return {"data": results, "scores": None}
-
-
-def _get_filter_combinations(app):
-    """Return all possible combinations of first/lastname orders for matching"""
-    return [
-        (app["employee"]["first_name"] + " " + app["employee"]["last_name"]).lower(),
-        (app["employee"]["last_name"] + " " + app["employee"]["first_name"]).lower(),
-        app["employee"]["first_name"].lower(),
-        app["employee"]["last_name"].lower(),
-    ]
-
-
 def _query_by_application_number(
     application_queryset, archival_application_queryset, application_number
 ):
@@ -477,23 +434,23 @@ def _perform_in_memory_search(
     """Perform more expensive in-memory search from within applications"""
     if detected_pattern == SearchPattern.COMPANY:
         in_memory_filter_str = search_string
-    # No previous search results, use all applications as haystack
+    # No previous search results, use the best candidates from the name search index
+    # of all applications as haystack
     if len(data) == 0 or search_string == "":
-        data = serializer(queryset, many=True).data
+        data = serializer(
+            EmployeeNameSearchKey.objects.rank_candidates(
+                queryset, in_memory_filter_str
+            ),
+            many=True,
+        ).data
         detected_pattern = f"{SearchPattern.ALL} {SearchPattern.IN_MEMORY}"
     else:
         detected_pattern = f"{SearchPattern.COMPANY} {SearchPattern.IN_MEMORY}"
 
     # Try fuzzy matching with high threshold. If zero matches, try lower score and
-    # finally try substring matching
-    in_memory_results = _fuzzy_matching(data, in_memory_filter_str, 80)
-    if not in_memory_results["data"]:
-        in_memory_results = _fuzzy_matching(data, in_memory_filter_str, 70)
-    if not in_memory_results["data"]:
-        in_memory_results = _contains_matching(
-            data,
-            in_memory_filter_str,
-        )
+    # finally try substring matching, all from a single scoring pass
+    in_memory_results = EmployeeNameMatcher(data).match(in_memory_filter_str)
+    if in_memory_results.pop("fallback"):
         detected_pattern += "-fallback"
 
     return {**in_memory_results, "detected_pattern": detected_pattern}
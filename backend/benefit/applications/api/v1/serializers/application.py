@@ -30,12 +30,16 @@ from applications.api.v1.serializers.employee import (
     EmployeeSerializer,
     SearchEmployeeSerializer,
 )
+from applications.api.v1.serializers.loaders import (
+    ApplicationListSerializer,
+    ApplicationLoadersMixin,
+    get_latest_log_entry,
+)
 from applications.api.v1.serializers.utils import DynamicFieldsModelSerializer
 from applications.api.v1.status_transition_validator import (
     ApplicantApplicationStatusValidator,
     HandlerApplicationStatusValidator,
 )
-from applications.benefit_aggregation import get_former_benefit_info
 from applications.enums import (
     AhjoStatus as AhjoStatusEnum,
 )
@@ -87,32 +91,24 @@ from terms.api.v1.serializers import (
     ApplicantTermsApprovalSerializer,
     ApproveTermsSerializer,
     TermsSerializer,
+    get_serialized_terms_in_effect,
 )
-from terms.enums import TermsType
-from terms.models import ApplicantTermsApproval, Terms
+from terms.models import ApplicantTermsApproval
 from users.api.v1.serializers import UserSerializer
 from users.utils import get_company_from_request, get_request_user_from_context
 
 log = logging.getLogger(__name__)
 
 
-def _get_instalment(application, instalment_number):
-    """Get the second instalment for the application"""
-    try:
-        instalment = (
-            application.calculation.instalments.filter(
-                instalment_number=instalment_number
-            ).first()
-            or None
-        )
-        if instalment is not None:
-            return InstalmentSerializer(instalment).data
-    except AttributeError:
-        return None
+def _get_instalment(loaders, application, instalment_number):
+    """Get the given instalment for the application"""
+    instalment = loaders.instalments.load(application.pk).get(instalment_number)
+    if instalment is not None:
+        return InstalmentSerializer(instalment).data
     return None
 
 
-class BaseApplicationSerializer(DynamicFieldsModelSerializer):
+class BaseApplicationSerializer(ApplicationLoadersMixin, DynamicFieldsModelSerializer):
     """
     Fields in the Company model come from YTJ/other source and are not editable by user, and are listed
     in read_only_fields. If sent in the request, these fields are ignored.
@@ -168,6 +164,7 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
 
     class Meta:
         model = Application
+        list_serializer_class = ApplicationListSerializer
         fields = [
             "id",
             "status",
@@ -429,13 +426,11 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
 
     def get_calculated_benefit_amount(self, obj):
         if obj.handled_by_ahjo_automation:
-            # Check if ahjo_status is None or does not have any related objects
-            if obj.ahjo_status is None or not obj.ahjo_status.exists():
-                return None
-
-            latest_status = obj.ahjo_status.latest().status
-
-            if latest_status != AhjoStatusEnum.DETAILS_RECEIVED_FROM_AHJO:
+            latest_status = self.loaders.latest_ahjo_status.load(obj.pk)
+            if (
+                latest_status is None
+                or latest_status.status != AhjoStatusEnum.DETAILS_RECEIVED_FROM_AHJO
+            ):
                 return None
         elif obj.batch is None:
             return None
@@ -527,24 +522,15 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
     )
 
     def get_applicant_terms_approval_needed(self, obj):
-        return ApplicantTermsApproval.terms_approval_needed(obj)
+        return self.loaders.terms_approvals_needed.load(obj.pk)
 
     @extend_schema_field(TermsSerializer())
     def get_applicant_terms_in_effect(self, obj):
-        terms_map = {
-            ApplicationOrigin.APPLICANT: TermsType.APPLICANT_TERMS,
-            ApplicationOrigin.HANDLER: TermsType.HANDLER_TERMS,
-        }
-        terms_type = terms_map.get(
-            ApplicationOrigin(obj.application_origin), ApplicationOrigin.APPLICANT
+        # If given the request, the URLs of the FileFields are included
+        return get_serialized_terms_in_effect(
+            ApplicantTermsApproval.get_terms_type(obj.application_origin),
+            self.context.get("request"),
         )
-        terms = Terms.objects.get_terms_in_effect(terms_type)
-        if terms:
-            # If given the request in context, DRF will output the URL for FileFields
-            context = {"request": self.context.get("request")}
-            return TermsSerializer(terms, context=context).data
-        else:
-            return None
 
     def get_warnings(self, obj) -> Dict[str, List[str]]:
         """
@@ -566,29 +552,18 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
             }
         """  # noqa: E501
         warnings = {}
-        if all(
-            [
-                obj.start_date,
-                obj.end_date,
-                obj.employee.social_security_number,
-            ]
-        ):
-            if former_benefit_warnings := get_former_benefit_info(
-                obj,
-                obj.company,
-                obj.employee.social_security_number,
-                obj.start_date,
-                obj.end_date,
-                obj.apprenticeship_program,
-            ).warnings:
-                warnings["former_benefits"] = former_benefit_warnings
+        former_benefit_info = self.loaders.former_benefit_infos.load(obj).get(
+            "application"
+        )
+        if former_benefit_info and former_benefit_info.warnings:
+            warnings["former_benefits"] = former_benefit_info.warnings
         return warnings
 
     def _get_status_change_timestamp(self, obj, to_status=None):
-        change_qs = obj.log_entries.all()
-        if to_status:
-            change_qs = change_qs.filter(to_status=to_status)
-        if log_entry := change_qs.order_by("-created_at").first():
+        if log_entry := get_latest_log_entry(
+            self.loaders.latest_log_entries.load(obj.pk),
+            [to_status] if to_status else None,
+        ):
             return log_entry.created_at
         else:
             return None
@@ -604,24 +579,14 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
             return None
 
     def get_status_last_changed_at(self, obj):
-        if log_entry := obj.log_entries.all().order_by("-created_at").first():
-            return log_entry.created_at
-        else:
-            return None
+        return self._get_status_change_timestamp(obj)
 
     def get_former_benefit_info(self, obj):
-        if not hasattr(obj, "calculation"):
+        # uses start_date and end_date from calculation, if defined
+        aggregated_info = self.loaders.former_benefit_infos.load(obj).get("calculation")
+        if aggregated_info is None:
             return {}
 
-        # use start_date and end_date from calculation, if defined
-        aggregated_info = get_former_benefit_info(
-            obj,
-            obj.company,
-            obj.employee.social_security_number,
-            obj.calculation.start_date or obj.start_date,
-            obj.calculation.end_date or obj.end_date,
-            obj.apprenticeship_program,
-        )
         if aggregated_info.months_remaining is None:
             last_possible_end_date = None
         else:
@@ -1058,9 +1023,8 @@ class BaseApplicationSerializer(DynamicFieldsModelSerializer):
 
     def get_latest_ahjo_status(self, obj) -> Union[str, None]:
         """Get the latest Ahjo status text for the application"""
-        try:
-            status = obj.ahjo_status.latest()
-        except AhjoStatus.DoesNotExist:
+        status = self.loaders.latest_ahjo_status.load(obj.pk)
+        if status is None:
             return None
         return status.status
 
@@ -1720,20 +1684,34 @@ class HandlerApplicationSerializer(BaseApplicationSerializer):
 
     ahjo_error = serializers.SerializerMethodField()
 
+    latest_decision_comment = serializers.SerializerMethodField(
+        "get_latest_decision_comment"
+    )
+
     first_instalment = serializers.SerializerMethodField("get_first_instalment")
     second_instalment = serializers.SerializerMethodField("get_second_instalment")
 
+    def get_latest_decision_comment(self, obj) -> Union[str, None]:
+        log_entry = get_latest_log_entry(
+            self.loaders.latest_log_entries.load(obj.pk),
+            [
+                ApplicationStatus.ACCEPTED,
+                ApplicationStatus.CANCELLED,
+                ApplicationStatus.REJECTED,
+            ],
+        )
+        return log_entry.comment if log_entry else None
+
     def get_first_instalment(self, application):
-        return _get_instalment(application, 1)
+        return _get_instalment(self.loaders, application, 1)
 
     def get_second_instalment(self, application):
-        return _get_instalment(application, 2)
+        return _get_instalment(self.loaders, application, 2)
 
     def get_latest_ahjo_error(self, obj) -> Union[Dict, None]:
         """Get the latest Ahjo error for the application"""
-        try:
-            status = obj.ahjo_status.latest()
-        except AhjoStatus.DoesNotExist:
+        status = self.loaders.latest_ahjo_status.load(obj.pk)
+        if status is None:
             return None
         return AhjoStatusSerializer(status).data
 
@@ -1979,11 +1957,12 @@ class ChangeHistorySerializer(serializers.Serializer):
     new = serializers.CharField()
 
 
-class HandlerApplicationListSerializer(serializers.Serializer):
+class HandlerApplicationListSerializer(ApplicationLoadersMixin, serializers.Serializer):
     model = Application
     ADDITIONAL_INFORMATION_DEADLINE = timedelta(days=7)
 
     class Meta:
+        list_serializer_class = ApplicationListSerializer
         fields = [
             "id",
             "status",
@@ -2058,18 +2037,17 @@ class HandlerApplicationListSerializer(serializers.Serializer):
     second_instalment = serializers.SerializerMethodField("get_second_instalment")
 
     def get_first_instalment(self, application):
-        return _get_instalment(application, 1)
+        return _get_instalment(self.loaders, application, 1)
 
     def get_second_instalment(self, application):
-        return _get_instalment(application, 2)
+        return _get_instalment(self.loaders, application, 2)
 
     ahjo_error = serializers.SerializerMethodField("get_latest_ahjo_error")
 
     def get_latest_ahjo_error(self, obj) -> Union[Dict, None]:
         """Get the latest Ahjo error for the application"""
-        try:
-            status = obj.ahjo_status.latest()
-        except AhjoStatus.DoesNotExist:
+        status = self.loaders.latest_ahjo_status.load(obj.pk)
+        if status is None:
             return None
         data = AhjoStatusSerializer(status).data
         if data["error_from_ahjo"] is None:
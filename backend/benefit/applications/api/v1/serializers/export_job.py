@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import translation
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from applications.enums import ExportJobStatus, ExportJobType
+from applications.models import Application, ApplicationBatch, ExportJob
+from users.utils import get_request_user_from_context
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    # The parameter that must refer to an existing object for each job type
+    REQUIRED_PARAMETERS = {
+        ExportJobType.BATCH_PDF_FILES: ("batch_id", ApplicationBatch),
+        ExportJobType.APPLICATION_PDF: ("application_id", Application),
+    }
+
+    download_url = serializers.SerializerMethodField("get_download_url")
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id",
+            "job_type",
+            "parameters",
+            "status",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "result_filename",
+            "download_url",
+        ]
+        read_only_fields = [
+            "id",
+            "status",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "result_filename",
+            "download_url",
+        ]
+
+    def get_download_url(self, obj):
+        if obj.status != ExportJobStatus.COMPLETED:
+            return None
+        path = reverse("v1:handler-export-job-download", kwargs={"pk": obj.pk})
+        if request := self.context.get("request"):
+            return request.build_absolute_uri(path)
+        return path
+
+    def validate(self, data):
+        parameters = data.get("parameters") or {}
+        if not isinstance(parameters, dict):
+            raise serializers.ValidationError(
+                {"parameters": _("Parameters must be an object")}
+            )
+        if required := self.REQUIRED_PARAMETERS.get(data["job_type"]):
+            name, model = required
+            try:
+                exists = model.objects.filter(pk=parameters.get(name)).exists()
+            except (ValueError, DjangoValidationError):
+                exists = False
+            if not exists:
+                raise serializers.ValidationError(
+                    {"parameters": _("Invalid or missing {name}").format(name=name)}
+                )
+            parameters = {name: str(parameters[name])}
+        else:
+            parameters = {}
+        return {**data, "parameters": parameters}
+
+    def create(self, validated_data):
+        user = get_request_user_from_context(self)
+        language = translation.get_language()
+        if language not in dict(settings.LANGUAGES):
+            language = settings.LANGUAGE_CODE
+        return super().create(
+            {
+                **validated_data,
+                "created_by": user if user and user.is_authenticated else None,
+                # The export is run in the language of the request
+                "language": language,
+            }
+        )
@@ -0,0 +1,227 @@
+from typing import Callable, Dict, Hashable, Iterable
+
+from django.db import models
+from rest_framework import serializers
+
+from applications.benefit_aggregation import (
+    FormerBenefitInfo,
+    FormerBenefitQuery,
+    get_former_benefit_infos,
+)
+from applications.models import AhjoStatus, ApplicationLogEntry
+from calculator.models import Instalment
+from terms.models import ApplicantTermsApproval
+
+
+class BatchLoader:
+    """
+    DataLoader-style loader that loads the values of all the keys requested so far
+    with a single call to the batch load function the first time any of them is
+    needed, and serves the later requests of the same keys from the loaded values.
+    """
+
+    def __init__(
+        self, batch_load: Callable[[set], Dict[Hashable, object]], default=None
+    ):
+        self._batch_load = batch_load
+        self._default = default
+        self._pending_keys = set()
+        self._values = {}
+
+    def prime(self, keys: Iterable[Hashable]):
+        """Queue the keys to be loaded in the same batch with the next load"""
+        self._pending_keys.update(key for key in keys if key not in self._values)
+
+    def load(self, key: Hashable):
+        if key not in self._values:
+            keys = self._pending_keys | {key}
+            self._pending_keys = set()
+            values = self._batch_load(keys)
+            for loaded_key in keys:
+                self._values[loaded_key] = values.get(loaded_key, self._default)
+        return self._values[key]
+
+
+def load_instalments(application_ids: set) -> Dict[object, Dict[int, Instalment]]:
+    """
+    Load the instalments of the applications by their instalment number, with the
+    alterations their amount after recoveries is computed from
+    """
+    instalments = {}
+    for instalment in (
+        Instalment.objects.filter(calculation__application_id__in=application_ids)
+        .select_related("calculation__application")
+        .prefetch_related("calculation__application__alteration_set")
+    ):
+        instalments.setdefault(instalment.calculation.application_id, {}).setdefault(
+            instalment.instalment_number, instalment
+        )
+    return instalments
+
+
+def load_latest_ahjo_statuses(application_ids: set) -> Dict[object, AhjoStatus]:
+    """Load the latest Ahjo status of the applications"""
+    return {
+        ahjo_status.application_id: ahjo_status
+        for ahjo_status in AhjoStatus.objects.filter(application_id__in=application_ids)
+        .order_by("application_id", "-created_at")
+        .distinct("application_id")
+    }
+
+
+def load_latest_log_entries(application_ids: set) -> Dict[object, dict]:
+    """Load the latest log entry of the applications to each status"""
+    log_entries = {}
+    for log_entry in (
+        ApplicationLogEntry.objects.filter(application_id__in=application_ids)
+        .order_by("application_id", "to_status", "-created_at")
+        .distinct("application_id", "to_status")
+    ):
+        log_entries.setdefault(log_entry.application_id, {})[log_entry.to_status] = (
+            log_entry
+        )
+    return log_entries
+
+
+def get_former_benefit_queries(application) -> Dict[str, FormerBenefitQuery]:
+    """
+    Get the former benefit queries of the benefit period of the application and,
+    once the application has a calculation, of the benefit period of the
+    calculation
+    """
+    employee = getattr(application, "employee", None)
+    social_security_number = employee.social_security_number if employee else None
+    queries = {}
+    if all([application.start_date, application.end_date, social_security_number]):
+        queries["application"] = FormerBenefitQuery(
+            company_id=application.company_id,
+            social_security_number=social_security_number,
+            start_date=application.start_date,
+            end_date=application.end_date,
+            apprenticeship_program=application.apprenticeship_program,
+            application_id=application.pk,
+        )
+    if hasattr(application, "calculation"):
+        # use start_date and end_date from calculation, if defined
+        queries["calculation"] = FormerBenefitQuery(
+            company_id=application.company_id,
+            social_security_number=social_security_number,
+            start_date=application.calculation.start_date or application.start_date,
+            end_date=application.calculation.end_date or application.end_date,
+            apprenticeship_program=application.apprenticeship_program,
+            application_id=application.pk,
+        )
+    return queries
+
+
+def load_former_benefit_infos(
+    applications: set,
+) -> Dict[object, Dict[str, FormerBenefitInfo]]:
+    """
+    Load the former benefit info of the applications, see get_former_benefit_queries,
+    with one query of the accepted applications and one of the previous benefits
+    """
+    queries = {
+        application: get_former_benefit_queries(application)
+        for application in applications
+    }
+    infos = get_former_benefit_infos(
+        query
+        for application_queries in queries.values()
+        for query in application_queries.values()
+    )
+    return {
+        application: {name: infos[query] for name, query in application_queries.items()}
+        for application, application_queries in queries.items()
+    }
+
+
+def get_latest_log_entry(log_entries: dict, to_statuses=None):
+    """
+    Get the latest of the loaded log entries of an application, optionally only of
+    the transitions to one of the given statuses
+    """
+    return max(
+        (
+            log_entry
+            for to_status, log_entry in log_entries.items()
+            if to_statuses is None or to_status in to_statuses
+        ),
+        key=lambda log_entry: log_entry.created_at,
+        default=None,
+    )
+
+
+class ApplicationLoaders:
+    """
+    The loaders of the relations of the applications serialized in one
+    serialization pass. Each relation is loaded for all the applications with one
+    query the first time a method field needs it.
+    """
+
+    def __init__(self):
+        self.instalments = BatchLoader(load_instalments, default={})
+        self.latest_ahjo_status = BatchLoader(load_latest_ahjo_statuses)
+        self.latest_log_entries = BatchLoader(load_latest_log_entries, default={})
+        self.terms_approvals_needed = BatchLoader(
+            ApplicantTermsApproval.terms_approvals_needed, default=True
+        )
+        # Keyed by the applications, as the queries depend on their field values
+        self.former_benefit_infos = BatchLoader(load_former_benefit_infos, default={})
+
+    def prime(self, applications: list):
+        application_ids = [application.pk for application in applications]
+        self.instalments.prime(application_ids)
+        self.latest_ahjo_status.prime(application_ids)
+        self.latest_log_entries.prime(application_ids)
+        self.terms_approvals_needed.prime(application_ids)
+        self.former_benefit_infos.prime(applications)
+
+
+def get_application_loaders(serializer: serializers.BaseSerializer):
+    """
+    Get the application loaders of the serialization pass, which are shared by all
+    the serializers under the same root serializer.
+    """
+    root = serializer.root
+    loaders = getattr(root, "_application_loaders", None)
+    if loaders is None:
+        loaders = root._application_loaders = ApplicationLoaders()
+    return loaders
+
+
+def reset_application_loaders(serializer: serializers.BaseSerializer):
+    """Start a new serialization pass, so no values of earlier passes are used"""
+    serializer.root._application_loaders = ApplicationLoaders()
+
+
+class ApplicationListSerializer(serializers.ListSerializer):
+    """
+    List serializer that primes the application loaders with all the listed
+    applications, so that the method fields of the applications load each relation
+    for the whole list with one query.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        applications = list(iterable)
+        if self.root is self:
+            reset_application_loaders(self)
+        get_application_loaders(self).prime(applications)
+        return super().to_representation(applications)
+
+
+class ApplicationLoadersMixin:
+    """
+    Mixin for the application serializers whose method fields read the relations
+    through the application loaders
+    """
+
+    @property
+    def loaders(self) -> ApplicationLoaders:
+        return get_application_loaders(self)
+
+    def to_representation(self, instance):
+        if self.root is self:
+            reset_application_loaders(self)
+        return super().to_representation(instance)
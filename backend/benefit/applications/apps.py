@@ -1,6 +1,31 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+from simple_history.signals import post_create_historical_record
 
 
 class AppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "applications"
+
+    def ready(self):
+        from applications import signals
+        from applications.models import Application, Attachment, Employee
+
+        # Materialize the change history of the applications as the history
+        # records are created
+        post_create_historical_record.connect(
+            signals.record_application_change_set, sender=Application.history.model
+        )
+        # The change reason is set on the history record after it is created
+        post_save.connect(
+            signals.update_application_change_set_reason,
+            sender=Application.history.model,
+        )
+        post_create_historical_record.connect(
+            signals.record_employee_change_set, sender=Employee.history.model
+        )
+        post_create_historical_record.connect(
+            signals.record_attachment_change_set, sender=Attachment.history.model
+        )
+        # The cached decision PDFs show the employee names of the application
+        post_delete.connect(signals.delete_application_cached_pdfs, sender=Application)
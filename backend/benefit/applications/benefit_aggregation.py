@@ -1,14 +1,18 @@
 import operator
 from dataclasses import dataclass, field
+from datetime import date
 from decimal import Decimal
-from itertools import chain
+from functools import reduce
+from typing import Iterable
+from uuid import UUID
 
 from dateutil.relativedelta import relativedelta
+from django.db.models import F, Q
 from django.utils.text import format_lazy
 from django.utils.translation import gettext_lazy as _
 
 from applications.enums import ApplicationStatus
-from applications.models import Application
+from applications.models import Application, Employee
 from calculator.models import PreviousBenefit
 from common.utils import date_range_overlap, duration_in_months, pairwise
 
@@ -26,6 +30,22 @@ class FormerBenefitInfo:
 BENEFIT_WAITING_PERIOD_MONTHS = 24
 
 
+@dataclass(frozen=True)
+class FormerBenefitQuery:
+    """
+    The application field values the former benefit info is aggregated for. The
+    application is only used to ensure that the application being validated isn't
+    validated against itself.
+    """
+
+    company_id: UUID | None
+    social_security_number: str | None
+    start_date: date | None
+    end_date: date | None
+    apprenticeship_program: bool = False
+    application_id: UUID | None = None
+
+
 def get_former_benefit_info(
     application,
     company,
@@ -39,15 +59,62 @@ def get_former_benefit_info(
     # doesn't yet exist when the rest framework does the validation.
     # The Application parameter is only used to ensure that the application being
     # validated isn't validated against itself.
+    query = FormerBenefitQuery(
+        company_id=getattr(company, "pk", company),
+        social_security_number=social_security_number,
+        start_date=start_date,
+        end_date=end_date,
+        apprenticeship_program=apprenticeship_program,
+        application_id=application.pk if application else None,
+    )
+    return get_former_benefit_infos([query])[query]
+
+
+def get_former_benefit_infos(
+    queries: Iterable[FormerBenefitQuery],
+) -> dict[FormerBenefitQuery, FormerBenefitInfo]:
+    """
+    Aggregate the former benefit info of many applications at once. The past
+    benefits of all the employees are loaded with one query of the accepted
+    applications and one query of the previous benefits.
+    """
+    queries = set(queries)
+    past_benefits = _get_past_benefits_in_bulk(
+        [query for query in queries if _is_employee_info_entered(query)]
+    )
+    return {
+        query: _aggregate_former_benefit_info(
+            query,
+            past_benefits.get((query.company_id, query.social_security_number), []),
+        )
+        for query in queries
+    }
+
+
+def _is_employee_info_entered(query: FormerBenefitQuery) -> bool:
+    return bool(query.social_security_number and query.end_date)
 
+
+def _aggregate_former_benefit_info(query: FormerBenefitQuery, past_benefits):
     former_benefit_info = FormerBenefitInfo()
 
-    if not social_security_number or not end_date:
+    if not _is_employee_info_entered(query):
         # the employee info hasn't been entered yet
         return former_benefit_info
 
+    start_date = query.start_date
+    end_date = query.end_date
     recent_benefits = _get_benefits_relevant_for_validation(
-        _get_past_benefits(application, company, social_security_number, end_date),
+        [
+            benefit
+            for benefit in past_benefits
+            # catch also overlapping benefits
+            if benefit.start_date <= end_date
+            and (
+                not isinstance(benefit, Application)
+                or benefit.pk != query.application_id
+            )
+        ],
         start_date,
     )
 
@@ -58,7 +125,7 @@ def get_former_benefit_info(
     former_benefit_info.months_used = sum(
         benefit.duration_in_months for benefit in recent_benefits
     )
-    if apprenticeship_program:
+    if query.apprenticeship_program:
         # Kanslia Helsinki-lisä Teams discussion 2021-12-09: there's no upper limit
         # defined for
         # sequentially granted apprenticeship benefits
@@ -69,7 +136,7 @@ def get_former_benefit_info(
         )
 
     if (
-        not apprenticeship_program
+        not query.apprenticeship_program
         and duration_in_months(start_date, end_date)
         > former_benefit_info.months_remaining
     ):
@@ -80,44 +147,93 @@ def get_former_benefit_info(
     return former_benefit_info
 
 
-def _get_past_benefits(
-    application, company, social_security_number, end_date
-) -> list[PreviousBenefit | Application]:
+def _get_past_benefits_in_bulk(
+    queries: list[FormerBenefitQuery],
+) -> dict[tuple, list[PreviousBenefit | Application]]:
     """
-    Return a list containing two types of objects:
+    Return the past benefits of the employees of the queries by (company_id,
+    social_security_number). The values are lists containing two types of objects:
     * PreviousBenefits
     * Applications that are in ACCEPTED status
 
-    The list is sorted according to start_date in descending order.
+    The lists are sorted according to start_date in descending order.
 
     PreviousBenefit and Application objects these have these in common:
     * start_date and end_date fields
     * duration_in_months property
+
+    Only the benefits starting before the latest end_date queried for the employee
+    are loaded, the rest of the filtering is left to the caller.
     """
+    latest_end_dates = {}
+    for query in queries:
+        key = (query.company_id, query.social_security_number)
+        latest_end_dates[key] = max(query.end_date, latest_end_dates.get(key, date.min))
+    if not latest_end_dates:
+        return {}
 
     # The waiting time starts at the end of the latest benefit period granted.
     previously_accepted_applications = Application.objects.filter(
-        employee__social_security_number=social_security_number,
-        company=company,
+        reduce(
+            operator.or_,
+            (
+                Q(
+                    employee__social_security_number=social_security_number,
+                    company_id=company_id,
+                    start_date__lte=end_date,
+                )
+                for (company_id, social_security_number), end_date in (
+                    latest_end_dates.items()
+                )
+            ),
+        ),
         status=ApplicationStatus.ACCEPTED,
-        start_date__lte=end_date,  # catch also overlapping benefits
-    )
-
-    if application:
-        previously_accepted_applications = previously_accepted_applications.exclude(
-            pk=application.pk
+    ).annotate(social_security_number_hash=F("employee__social_security_number"))
+    previous_benefits = PreviousBenefit.objects.filter(
+        reduce(
+            operator.or_,
+            (
+                Q(
+                    social_security_number=social_security_number,
+                    company_id=company_id,
+                    start_date__lte=end_date,
+                )
+                for (company_id, social_security_number), end_date in (
+                    latest_end_dates.items()
+                )
+            ),
         )
+    ).annotate(social_security_number_hash=F("social_security_number"))
 
-    previous_benefits = PreviousBenefit.objects.filter(
-        social_security_number=social_security_number,
-        company=company,
-        start_date__lte=end_date,
-    )
-    return sorted(
-        chain(previously_accepted_applications, previous_benefits),
-        key=operator.attrgetter("start_date"),
-        reverse=True,
-    )  # most recent first
+    # The search fields of the models are hashed with different keys
+    keys_by_hash = {
+        model: {
+            (
+                company_id,
+                model._meta.get_field("social_security_number").get_prep_value(
+                    social_security_number
+                ),
+            ): (company_id, social_security_number)
+            for company_id, social_security_number in latest_end_dates
+        }
+        for model in (Employee, PreviousBenefit)
+    }
+    past_benefits = {}
+    for model, benefits in (
+        (Employee, previously_accepted_applications),
+        (PreviousBenefit, previous_benefits),
+    ):
+        for benefit in benefits:
+            key = keys_by_hash[model][
+                (benefit.company_id, benefit.social_security_number_hash)
+            ]
+            past_benefits.setdefault(key, []).append(benefit)
+    return {
+        key: sorted(
+            benefits, key=operator.attrgetter("start_date"), reverse=True
+        )  # most recent first
+        for key, benefits in past_benefits.items()
+    }
 
 
 def _get_benefits_relevant_for_validation(past_benefits, start_date):
@@ -297,6 +297,26 @@ class AhjoDecisionUpdateType(models.TextChoices):
     UPDATED = "Updated", _("Updated")
 
 
+class ExportJobType(models.TextChoices):
+    BATCH_PDF_FILES = "batch_pdf_files", _("Batch CSV and PDF files")
+    NEW_ACCEPTED_APPLICATIONS_CSV_PDF = (
+        "new_accepted_applications_csv_pdf",
+        _("New accepted applications CSV and PDF files"),
+    )
+    NEW_REJECTED_APPLICATIONS_CSV_PDF = (
+        "new_rejected_applications_csv_pdf",
+        _("New rejected applications CSV and PDF files"),
+    )
+    APPLICATION_PDF = "application_pdf", _("Application PDF")
+
+
+class ExportJobStatus(models.TextChoices):
+    PENDING = "pending", _("Pending")
+    RUNNING = "running", _("Running")
+    COMPLETED = "completed", _("Completed")
+    FAILED = "failed", _("Failed")
+
+
 @dataclass(frozen=True, order=True)
 class AhjoDecisionDetails:
     decision_maker_name: str
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.models import ApplicationStatusTimestamps
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the denormalized status transition timestamps of all applications"
+        " from their log entries, or check that they are consistent"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help=(
+                "Only report the applications whose stored timestamps differ from their"
+                " log entries, fail if there are any"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        expected = ApplicationStatusTimestamps.objects.compute_for()
+
+        if not options["check"]:
+            ApplicationStatusTimestamps.objects.store(expected)
+            self.stdout.write(
+                f"Rebuilt status timestamps of {len(expected)} applications"
+            )
+            return
+
+        fields = list(ApplicationStatusTimestamps.objects.TIMESTAMP_STATUSES)
+        stored = {
+            row.pop("application_id"): row
+            for row in ApplicationStatusTimestamps.objects.values(
+                "application_id", *fields
+            )
+        }
+        # Applications without any log entries do not need a stored row
+        missing = dict.fromkeys(fields)
+        inconsistent = [
+            application_id
+            for application_id, values in expected.items()
+            if stored.get(application_id, missing) != values
+        ]
+        for application_id in inconsistent:
+            self.stdout.write(
+                f"Application {application_id}: stored"
+                f" {stored.get(application_id)}, expected {expected[application_id]}"
+            )
+        if inconsistent:
+            raise CommandError(
+                f"Status timestamps of {len(inconsistent)} applications are"
+                " inconsistent, run the command without --check to rebuild them"
+            )
+        self.stdout.write(
+            f"Status timestamps of all {len(expected)} applications are consistent"
+        )
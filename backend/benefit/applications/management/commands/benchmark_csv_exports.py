@@ -0,0 +1,197 @@
+import json
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from applications.enums import ApplicationAlterationType
+from applications.models import Application, Attachment
+from applications.services.applications_csv_report import ApplicationsCsvService
+from applications.services.applications_power_bi_csv_report import (
+    ApplicationsPowerBiCsvService,
+)
+from applications.services.talpa_csv_service import TalpaCsvService
+from applications.tests.factories import (
+    ApplicationAlterationFactory,
+    DecidedApplicationFactory,
+)
+
+EXPORTERS = {
+    "applications_csv": ApplicationsCsvService,
+    "power_bi_csv": ApplicationsPowerBiCsvService,
+    "talpa_csv": TalpaCsvService,
+}
+
+
+def seed_applications(number: int) -> list:
+    """Create decided applications with calculations, instalments and alterations"""
+    application_ids = []
+    for index in range(number):
+        application = DecidedApplicationFactory()
+        if index % 2 == 0:
+            ApplicationAlterationFactory(
+                application=application,
+                alteration_type=ApplicationAlterationType.TERMINATION,
+                handled_by=application.calculation.handler,
+            )
+        application_ids.append(application.pk)
+    return application_ids
+
+
+def run_exporter(csv_service_class, application_ids: list, repeat: int) -> dict:
+    """
+    Export all applications with the given CSV service and return the query count,
+    the best wall time, the peak memory use and the throughput of the export.
+    """
+
+    def export():
+        csv_service = csv_service_class(
+            Application.objects.filter(pk__in=application_ids).order_by(
+                "application_number"
+            )
+        )
+        return sum(1 for _ in csv_service.get_csv_cell_list_lines_generator()) - 1
+
+    with CaptureQueriesContext(connection) as context:
+        rows = export()
+    queries = len(context)
+
+    seconds = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        export()
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    # Measured separately, as tracing the allocations slows down the export
+    tracemalloc.start()
+    try:
+        export()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "rows": rows,
+        "queries": queries,
+        "seconds": round(seconds, 4),
+        "peak_memory_bytes": peak_memory,
+        "rows_per_second": round(rows / seconds, 1) if seconds else None,
+    }
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compare the results to a baseline. Any increase of the query count is a
+    regression, while the throughput and the memory use may vary within the
+    tolerance, as they depend on the machine that runs the benchmark.
+    """
+    regressions = []
+    for name, result in results["exporters"].items():
+        if (expected := baseline.get("exporters", {}).get(name)) is None:
+            continue
+        if result["queries"] > expected["queries"]:
+            regressions.append(
+                f"{name}: {result['queries']} queries, baseline {expected['queries']}"
+            )
+        min_rows_per_second = (expected["rows_per_second"] or 0) * (1 - tolerance)
+        if (result["rows_per_second"] or 0) < min_rows_per_second:
+            regressions.append(
+                f"{name}: {result['rows_per_second']} rows/s,"
+                f" baseline {expected['rows_per_second']}"
+            )
+        if result["peak_memory_bytes"] > expected["peak_memory_bytes"] * (
+            1 + tolerance
+        ):
+            regressions.append(
+                f"{name}: peak memory {result['peak_memory_bytes']} bytes,"
+                f" baseline {expected['peak_memory_bytes']}"
+            )
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the application CSV, Power BI and Talpa exports with seeded"
+        " applications. The seeded applications are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number",
+            type=int,
+            default=100,
+            help="Number of applications to seed",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of times each export is run, the best time is reported",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Save the results as JSON to this file, e.g. to be used as a baseline",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=str,
+            help="Fail if the results regress compared to this JSON file",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help=(
+                "Allowed relative decrease of the throughput and increase of the"
+                " peak memory compared to the baseline"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as f:
+                baseline = json.load(f)
+
+        results = {"number": options["number"], "exporters": {}}
+        with transaction.atomic(), override_settings(PAYMENT_INSTALMENTS_ENABLED=True):
+            application_ids = seed_applications(options["number"])
+            for name, csv_service_class in EXPORTERS.items():
+                result = run_exporter(
+                    csv_service_class, application_ids, options["repeat"]
+                )
+                results["exporters"][name] = result
+                self.stdout.write(
+                    f"{name:>16}: {result['rows']} rows, {result['queries']} queries,"
+                    f" {result['seconds'] * 1000:.1f} ms,"
+                    f" {result['rows_per_second']} rows/s,"
+                    f" peak memory {result['peak_memory_bytes'] / 1024:.0f} KiB"
+                )
+
+            # The files are not rolled back with the transaction
+            for attachment in Attachment.objects.filter(
+                application__in=application_ids
+            ):
+                attachment.attachment_file.delete(save=False)
+            transaction.set_rollback(True)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Saved the results to {options['output']}")
+
+        if baseline is not None:
+            if baseline.get("number") != options["number"]:
+                raise CommandError(
+                    f"The baseline was measured with {baseline.get('number')}"
+                    f" applications, not {options['number']}"
+                )
+            if regressions := find_regressions(results, baseline, options["tolerance"]):
+                raise CommandError(
+                    "Export performance regressed: " + "; ".join(regressions)
+                )
+            self.stdout.write("No regressions compared to the baseline")
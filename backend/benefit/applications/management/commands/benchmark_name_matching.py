@@ -0,0 +1,126 @@
+import time
+
+import faker
+from django.core.management.base import BaseCommand
+from fuzzywuzzy import fuzz
+
+from applications.services.employee_name_search import EmployeeNameMatcher
+
+
+def _get_filter_combinations(app):
+    return [
+        (app["employee"]["first_name"] + " " + app["employee"]["last_name"]).lower(),
+        (app["employee"]["last_name"] + " " + app["employee"]["first_name"]).lower(),
+        app["employee"]["first_name"].lower(),
+        app["employee"]["last_name"].lower(),
+    ]
+
+
+def _fuzzy_matching(applications, query, threshold):
+    scores = []
+    for index, app in enumerate(applications):
+        ratios = [
+            fuzz.ratio(str(query), str(value))
+            for value in _get_filter_combinations(app)
+        ]
+        scores.append({"index": index, "score": max(ratios)})
+
+    filtered_scores = [item for item in scores if item["score"] >= threshold]
+    sorted_filtered_scores = sorted(
+        filtered_scores, key=lambda k: k["score"], reverse=True
+    )
+    return {
+        "data": [applications[item["index"]] for item in sorted_filtered_scores],
+        "scores": sorted_filtered_scores,
+    }
+
+
+def _contains_matching(applications, query):
+    results = []
+    for app in applications:
+        for value in _get_filter_combinations(app):
+            if query in value.lower():
+                results.append(app)
+                break
+    return {"data": results, "scores": None}
+
+
+def three_pass_matching(applications, query):
+    """The original matching of SearchView: threshold 80, then 70, then substring"""
+    results = _fuzzy_matching(applications, query, 80)
+    if not results["data"]:
+        results = _fuzzy_matching(applications, query, 70)
+    if not results["data"]:
+        results = _contains_matching(applications, query)
+    return results
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the single-pass employee name matcher against the original"
+        " three-pass matching with synthetic applications"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=50000,
+            help="Number of synthetic applications to match against",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of times each query is run, the best time is reported",
+        )
+
+    def handle(self, *args, **options):
+        fake = faker.Faker("fi_FI")
+        fake.seed_instance(0)
+        applications = [
+            {
+                "employee": {
+                    "first_name": fake.first_name(),
+                    "last_name": fake.last_name(),
+                }
+            }
+            for _ in range(options["rows"])
+        ]
+        sample = applications[len(applications) // 2]["employee"]
+        queries = {
+            "exact": f"{sample['first_name']} {sample['last_name']}".lower(),
+            "typo": f"{sample['last_name'][:-1]}x {sample['first_name']}".lower(),
+            "substring": sample["last_name"][1:4].lower(),
+            "no match": "qwxz qwxz qwxz",
+        }
+
+        self.stdout.write(f"Matching against {len(applications)} applications")
+        for name, query in queries.items():
+            three_pass_time, expected = self._best_time(
+                options["repeat"], three_pass_matching, applications, query
+            )
+            single_pass_time, results = self._best_time(
+                options["repeat"],
+                lambda data, q: EmployeeNameMatcher(data).match(q),
+                applications,
+                query,
+            )
+            if results["data"] != expected["data"]:
+                self.stderr.write(f"Results differ for the {name} query {query!r}")
+            self.stdout.write(
+                f"{name:>10}: three-pass {three_pass_time * 1000:8.1f} ms,"
+                f" single-pass {single_pass_time * 1000:8.1f} ms,"
+                f" speedup {three_pass_time / single_pass_time:5.1f}x,"
+                f" {len(results['data'])} matches"
+            )
+
+    @staticmethod
+    def _best_time(repeat, matcher, applications, query):
+        best_time = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = matcher(applications, query)
+            elapsed = time.perf_counter() - start
+            best_time = elapsed if best_time is None else min(best_time, elapsed)
+        return best_time, results
@@ -0,0 +1,48 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from applications.services.ahjo_integration import (
+    PDF_CACHE_APPLICATIONS_DIRECTORY,
+    PDF_CACHE_DIRECTORY,
+    get_pdf_cache_name,
+    is_pdf_cache_expired,
+)
+
+
+def _listdir(directory: str):
+    try:
+        return default_storage.listdir(directory)
+    except FileNotFoundError:
+        return [], []
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the cached decision PDFs older than EXPORT_PDF_CACHE_TIMEOUT seconds"
+        " and the application index files of the deleted PDFs"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Delete all the cached PDFs regardless of their age",
+        )
+
+    def handle(self, *args, **options):
+        delete_all = options["all"]
+
+        total_deleted = 0
+        for file in _listdir(PDF_CACHE_DIRECTORY)[1]:
+            name = f"{PDF_CACHE_DIRECTORY}/{file}"
+            if delete_all or is_pdf_cache_expired(name):
+                default_storage.delete(name)
+                total_deleted += 1
+
+        for application_directory in _listdir(PDF_CACHE_APPLICATIONS_DIRECTORY)[0]:
+            directory = f"{PDF_CACHE_APPLICATIONS_DIRECTORY}/{application_directory}"
+            for digest in _listdir(directory)[1]:
+                if delete_all or not default_storage.exists(get_pdf_cache_name(digest)):
+                    default_storage.delete(f"{directory}/{digest}")
+
+        self.stdout.write(f"Deleted {total_deleted} cached PDFs")
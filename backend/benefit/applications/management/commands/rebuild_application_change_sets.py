@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from applications.models import Application
+from applications.services.change_history import (
+    backfill_application_change_sets,
+    rebuild_application_change_sets,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the materialized change history of the applications from the history"
+        " of the applications, their employees and their attachments"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--application",
+            action="append",
+            dest="application_ids",
+            help="Id of an application to rebuild, can be given many times",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only build the change history of the applications that have none",
+        )
+
+    def handle(self, *args, **options):
+        if options["missing"]:
+            total = backfill_application_change_sets()
+            self.stdout.write(f"Built change history of {total} applications")
+            return
+
+        applications = Application._base_manager.order_by("created_at")
+        if options["application_ids"]:
+            applications = applications.filter(pk__in=options["application_ids"])
+
+        total = 0
+        for application_id in applications.values_list("pk", flat=True).iterator():
+            rebuild_application_change_sets(application_id)
+            total += 1
+
+        self.stdout.write(f"Rebuilt change history of {total} applications")
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+
+from applications.models import ArchivalApplication, Employee, EmployeeNameSearchKey
+from applications.services.employee_name_search import name_sort_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the employee name search index and sort keys of all applications and"
+        " archival applications, e.g. after the name hash keys have been changed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="The number of rows to decrypt at a time",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+
+        total_employees = 0
+        changed_employees = []
+        for employee in Employee.objects.only(
+            "application_id",
+            "encrypted_first_name",
+            "encrypted_last_name",
+            "name_sort_key",
+        ).iterator(chunk_size=chunk_size):
+            EmployeeNameSearchKey.objects.update_for(
+                employee.first_name,
+                employee.last_name,
+                application_id=employee.application_id,
+            )
+            sort_key = name_sort_key(employee.last_name)
+            if employee.name_sort_key != sort_key:
+                employee.name_sort_key = sort_key
+                changed_employees.append(employee)
+            total_employees += 1
+        Employee.objects.bulk_update(
+            changed_employees, ["name_sort_key"], batch_size=chunk_size
+        )
+
+        total_archival_applications = 0
+        for archival_application in ArchivalApplication.objects.only(
+            "encrypted_employee_first_name", "encrypted_employee_last_name"
+        ).iterator(chunk_size=chunk_size):
+            EmployeeNameSearchKey.objects.update_for(
+                archival_application.employee_first_name,
+                archival_application.employee_last_name,
+                archival_application=archival_application,
+            )
+            total_archival_applications += 1
+
+        self.stdout.write(
+            f"Rebuilt name search index of {total_employees} applications and"
+            f" {total_archival_applications} archival applications"
+        )
@@ -0,0 +1,97 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from applications.enums import ExportJobStatus
+from applications.models import ExportJob
+from applications.services.export_jobs import HEARTBEAT_INTERVAL, run_export_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the queued handler export jobs. The jobs are queued in the database, so"
+        " several workers can be run in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty instead of waiting for new jobs",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5,
+            help="Seconds to wait before polling an empty queue again",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=5,
+            help=(
+                "Minutes without a heartbeat after which a running job is considered"
+                " abandoned by a stopped worker and queued again"
+            ),
+        )
+        parser.add_argument(
+            "--heartbeat-interval",
+            type=float,
+            default=HEARTBEAT_INTERVAL,
+            help="Seconds between the heartbeats of a running job",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=3,
+            help="Times an abandoned job is attempted before it is failed",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=7,
+            help="Days after which finished jobs and their result files are deleted",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            now = timezone.now()
+            requeued, failed = ExportJob.objects.requeue_stale(
+                now - timedelta(minutes=options["stale_after"]),
+                options["max_attempts"],
+            )
+            if requeued:
+                self.stdout.write(f"Queued {requeued} abandoned export jobs again")
+            if failed:
+                self.stderr.write(
+                    f"Failed {failed} export jobs abandoned"
+                    f" {options['max_attempts']} times"
+                )
+            if deleted := ExportJob.objects.delete_finished(
+                now - timedelta(days=options["keep_days"])
+            ):
+                self.stdout.write(f"Deleted {deleted} finished export jobs")
+
+            job = ExportJob.objects.claim_next()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            start = time.monotonic()
+            job = run_export_job(job, options["heartbeat_interval"])
+            elapsed = time.monotonic() - start
+            if job.status == ExportJobStatus.COMPLETED:
+                self.stdout.write(
+                    f"Export job {job.pk} of type {job.job_type} completed in"
+                    f" {elapsed:.1f} seconds"
+                )
+            else:
+                self.stderr.write(
+                    f"Export job {job.pk} of type {job.job_type} failed: {job.error}"
+                )
@@ -1,10 +1,14 @@
 import logging
+import statistics
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Union
+from typing import List, Optional, Tuple, Union
 
+from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
 from django.core.management.base import BaseCommand
+from django.db import connections
 from django.db.models import QuerySet
 
 from applications.enums import AhjoRequestType
@@ -18,6 +22,7 @@ from applications.services.ahjo_authentication import (
     AhjoToken,
     AhjoTokenExpiredError,
 )
+from applications.services.ahjo_client import ahjo_rate_limiter
 from applications.services.ahjo_error_writer import AhjoErrorWriter, AhjoFormattedError
 from applications.services.ahjo_integration import (
     delete_application_in_ahjo,
@@ -61,6 +66,16 @@ class Command(BaseCommand):
             help="Run the command without making actual changes",
         )
 
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.AHJO_REQUEST_WORKERS,
+            help=(
+                "Number of applications to send requests for in parallel, the requests"
+                " to each Ahjo host are rate limited by AHJO_REQUESTS_PER_SECOND"
+            ),
+        )
+
         parser.add_argument(
             "--retry-failed-older-than",
             type=int,
@@ -116,19 +131,23 @@ class Command(BaseCommand):
                 )
             return
 
-        self.run_requests(
-            applications[:number_to_process], ahjo_auth_token, request_type
-        )
+        with ahjo_rate_limiter.enabled():
+            self.run_requests(
+                applications[:number_to_process],
+                ahjo_auth_token,
+                request_type,
+                workers=options["workers"],
+            )
 
     def run_requests(
         self,
         applications: QuerySet[Application],
         ahjo_auth_token: AhjoToken,
         ahjo_request_type: AhjoRequestType,
+        workers: int = 1,
     ) -> None:
         start_time = time.time()
-        successful_applications = []
-        failed_applications = []
+        applications = list(applications)
 
         application_numbers = self.get_application_numbers(applications)
 
@@ -141,50 +160,45 @@ class Command(BaseCommand):
 
         self.stdout.write(self._print_with_timestamp(message))
 
-        request_handler = self._get_request_handler(ahjo_request_type)
-
-        counter = 0
-        exception_messages = {
-            ValueError: "Value error for application",
-            ObjectDoesNotExist: "Object not found error for application",
-            ImproperlyConfigured: "Improperly configured error for application",
-            DecisionProposalAlreadyAcceptedError: (
-                "Decision proposal error for application"
-            ),
-        }
-
-        for application in applications:
-            counter += 1
+        def send(counter: int, application: Application):
+            return self._send_request(
+                counter, application, ahjo_auth_token, ahjo_request_type
+            )
 
+        def send_in_worker(counter: int, application: Application):
+            # Each worker thread uses its own database connection, so the status
+            # writes of each application are committed independently
             try:
-                sent_application, response_text = request_handler(
-                    application, ahjo_auth_token
-                )
-            except tuple(exception_messages.keys()) as e:
-                error_text = (
-                    f"{exception_messages[type(e)]}"
-                    f" {application.application_number}: {e}"
-                )
-                LOGGER.error(error_text)
-                AhjoErrorWriter.write_to_validation_error(
-                    AhjoFormattedError(
-                        application=application, message_to_handler=error_text
+                return send(counter, application)
+            finally:
+                connections.close_all()
+
+        if workers > 1 and len(applications) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(
+                    executor.map(
+                        send_in_worker,
+                        range(1, len(applications) + 1),
+                        applications,
                     )
                 )
-                failed_applications.append(application)
-                self._handle_failed_request(
-                    counter, application, ahjo_request_type, error_text
-                )
-                continue
-
-            if sent_application:
-                successful_applications.append(sent_application)
-                self._handle_successful_request(
-                    counter, sent_application, response_text, ahjo_request_type
-                )
-            else:
-                failed_applications.append(application)
-                self._handle_failed_request(counter, application, ahjo_request_type)
+        else:
+            results = [
+                send(counter, application)
+                for counter, application in enumerate(applications, start=1)
+            ]
+
+        successful_applications = [
+            sent_application
+            for sent_application, _, _ in results
+            if sent_application is not None
+        ]
+        failed_applications = [
+            failed_application
+            for _, failed_application, _ in results
+            if failed_application is not None
+        ]
+        latencies = [latency for _, _, latency in results]
 
         end_time = time.time()
         elapsed_time = end_time - start_time
@@ -194,14 +208,75 @@ class Command(BaseCommand):
             failed_applications,
             ahjo_request_type,
             elapsed_time,
+            latencies,
         )
 
+    def _send_request(
+        self,
+        counter: int,
+        application: Application,
+        ahjo_auth_token: AhjoToken,
+        ahjo_request_type: AhjoRequestType,
+    ) -> Tuple[Optional[Application], Optional[Application], float]:
+        """
+        Send the request for a single application and handle the result. Returns the
+        sent application or the failed application, and the latency of the request.
+        """
+        request_handler = self._get_request_handler(ahjo_request_type)
+        exception_messages = {
+            ValueError: "Value error for application",
+            ObjectDoesNotExist: "Object not found error for application",
+            ImproperlyConfigured: "Improperly configured error for application",
+            DecisionProposalAlreadyAcceptedError: (
+                "Decision proposal error for application"
+            ),
+        }
+
+        request_start_time = time.perf_counter()
+        try:
+            sent_application, response_text = request_handler(
+                application, ahjo_auth_token
+            )
+        except tuple(exception_messages.keys()) as e:
+            latency = time.perf_counter() - request_start_time
+            error_text = (
+                f"{exception_messages[type(e)]} {application.application_number}: {e}"
+            )
+            LOGGER.error(error_text)
+            AhjoErrorWriter.write_to_validation_error(
+                AhjoFormattedError(
+                    application=application, message_to_handler=error_text
+                )
+            )
+            self._handle_failed_request(
+                counter, application, ahjo_request_type, error_text
+            )
+            return None, application, latency
+        latency = time.perf_counter() - request_start_time
+
+        if sent_application:
+            self._handle_successful_request(
+                counter, sent_application, response_text, ahjo_request_type
+            )
+            return sent_application, None, latency
+
+        self._handle_failed_request(counter, application, ahjo_request_type)
+        return None, application, latency
+
+    @staticmethod
+    def _get_latency_percentiles(latencies: List[float]) -> dict:
+        if len(latencies) < 2:
+            return {"p50": latencies[0], "p90": latencies[0], "p99": latencies[0]}
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        return {"p50": percentiles[49], "p90": percentiles[89], "p99": percentiles[98]}
+
     def _print_results(
         self,
         successful_applications,
         failed_applications,
         ahjo_request_type,
         elapsed_time,
+        latencies=None,
     ):
         if successful_applications:
             successful_application_numbers = self.get_application_numbers(
@@ -234,6 +309,15 @@ class Command(BaseCommand):
                     )
                 )
             )
+        if latencies:
+            percentiles = ", ".join(
+                f"{name} {latency:.3f}"
+                for name, latency in self._get_latency_percentiles(latencies).items()
+            )
+            self.stdout.write(
+                f"{ahjo_request_type} request latencies in seconds: {percentiles},"
+                f" max {max(latencies):.3f}"
+            )
 
     def _handle_application_request_success(
         self,
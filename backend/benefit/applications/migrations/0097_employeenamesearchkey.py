@@ -0,0 +1,62 @@
+# Generated by Django 5.2.16 on 2026-10-18 08:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0096_application_other_subsidised_employed_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmployeeNameSearchKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=16)),
+                (
+                    "application",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="name_search_keys",
+                        to="applications.application",
+                    ),
+                ),
+                (
+                    "archival_application",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="name_search_keys",
+                        to="applications.archivalapplication",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "employee name search key",
+                "verbose_name_plural": "employee name search keys",
+                "db_table": "bf_applications_employee_name_search_key",
+                "indexes": [
+                    models.Index(
+                        fields=["key", "application"], name="bf_applicat_key_6e83cf_idx"
+                    ),
+                    models.Index(
+                        fields=["key", "archival_application"],
+                        name="bf_applicat_key_f36d4c_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.16 on 2026-10-18 09:08
+
+import hashlib
+import hmac
+import itertools
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copy of applications.services.employee_name_search.name_sort_key at the
+# time of this migration
+NAME_SORT_KEY_LENGTH = 2
+NAME_SORT_KEY_CHARACTERS = 0x250
+NAME_SORT_KEY_MAX_GAP = 16
+
+
+def _character_sort_keys(hash_key):
+    key = bytes.fromhex(hash_key)
+    gaps = b"".join(
+        hmac.new(key, f"name-sort-key:{block}".encode(), hashlib.sha256).digest()
+        for block in range(-(-NAME_SORT_KEY_CHARACTERS // hashlib.sha256().digest_size))
+    )[:NAME_SORT_KEY_CHARACTERS]
+    return tuple(itertools.accumulate(1 + gap % NAME_SORT_KEY_MAX_GAP for gap in gaps))
+
+
+def _name_sort_key(character_keys, last_name):
+    shared_key = character_keys[-1] + 1
+    key = 0
+    remaining = NAME_SORT_KEY_LENGTH
+    for character in (last_name or "").lower()[:NAME_SORT_KEY_LENGTH]:
+        code = ord(character)
+        remaining -= 1
+        key = key * (shared_key + 1)
+        if code >= NAME_SORT_KEY_CHARACTERS:
+            key += shared_key
+            break
+        key += character_keys[code]
+    return key * (shared_key + 1) ** remaining
+
+
+def populate_name_sort_keys(apps, _):
+    employee_model = apps.get_model("applications", "Employee")
+    character_keys = _character_sort_keys(settings.EMPLOYEE_LAST_NAME_HASH_KEY)
+    employees = []
+    for employee in employee_model.objects.only("encrypted_last_name").iterator():
+        employee.name_sort_key = _name_sort_key(
+            character_keys, employee.encrypted_last_name
+        )
+        employees.append(employee)
+    employee_model.objects.bulk_update(employees, ["name_sort_key"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0097_employeenamesearchkey"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employee",
+            name="name_sort_key",
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(populate_name_sort_keys, migrations.RunPython.noop),
+    ]
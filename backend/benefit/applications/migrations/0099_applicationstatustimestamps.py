@@ -0,0 +1,75 @@
+# Generated by Django 5.2.16 on 2026-10-18 09:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max, Q
+
+TIMESTAMP_STATUSES = {
+    "handled_at": ["rejected", "accepted", "cancelled"],
+    "additional_information_requested_at": ["additional_information_needed"],
+    "submitted_at": ["received"],
+}
+
+
+def populate_status_timestamps(apps, _):
+    application_model = apps.get_model("applications", "Application")
+    timestamps_model = apps.get_model("applications", "ApplicationStatusTimestamps")
+    timestamps = application_model.objects.values("pk").annotate(
+        **{
+            field_name: Max(
+                "log_entries__created_at",
+                filter=Q(log_entries__to_status__in=to_statuses),
+            )
+            for field_name, to_statuses in TIMESTAMP_STATUSES.items()
+        }
+    )
+    timestamps_model.objects.bulk_create(
+        [
+            timestamps_model(application_id=row.pop("pk"), **row)
+            for row in timestamps.order_by().iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0098_employee_name_sort_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationStatusTimestamps",
+            fields=[
+                (
+                    "application",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="status_timestamps",
+                        serialize=False,
+                        to="applications.application",
+                        verbose_name="application",
+                    ),
+                ),
+                (
+                    "handled_at",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                (
+                    "additional_information_requested_at",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                (
+                    "submitted_at",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+            ],
+            options={
+                "verbose_name": "application status timestamps",
+                "verbose_name_plural": "application status timestamps",
+                "db_table": "bf_applications_application_status_timestamps",
+            },
+        ),
+        migrations.RunPython(populate_status_timestamps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 5.2.16 on 2026-10-18 10:28
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0099_applicationstatustimestamps"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportJob",
+            fields=[
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="time created"
+                    ),
+                ),
+                (
+                    "modified_at",
+                    models.DateTimeField(auto_now=True, verbose_name="time modified"),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "job_type",
+                    models.CharField(
+                        choices=[
+                            ("batch_pdf_files", "Batch CSV and PDF files"),
+                            (
+                                "new_accepted_applications_csv_pdf",
+                                "New accepted applications CSV and PDF files",
+                            ),
+                            (
+                                "new_rejected_applications_csv_pdf",
+                                "New rejected applications CSV and PDF files",
+                            ),
+                            ("application_pdf", "Application PDF"),
+                        ],
+                        max_length=64,
+                        verbose_name="type of the export",
+                    ),
+                ),
+                ("parameters", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=64,
+                        verbose_name="status",
+                    ),
+                ),
+                (
+                    "language",
+                    models.CharField(
+                        choices=[
+                            ("fi", "Finnish"),
+                            ("en", "English"),
+                            ("sv", "Swedish"),
+                        ],
+                        default="fi",
+                        max_length=2,
+                        verbose_name="language of the export",
+                    ),
+                ),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("heartbeat_at", models.DateTimeField(blank=True, null=True)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "result_file",
+                    models.FileField(
+                        blank=True,
+                        null=True,
+                        upload_to="export_jobs/",
+                        verbose_name="export result",
+                    ),
+                ),
+                ("result_filename", models.CharField(blank=True, max_length=255)),
+                ("result_content_type", models.CharField(blank=True, max_length=100)),
+                ("error", models.TextField(blank=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="export_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="created by",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "export job",
+                "verbose_name_plural": "export jobs",
+                "db_table": "bf_applications_export_job",
+                "ordering": ["created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="bf_applicat_status_703fe0_idx",
+                    )
+                ],
+            },
+        ),
+    ]
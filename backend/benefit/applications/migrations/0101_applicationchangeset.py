@@ -0,0 +1,71 @@
+# Generated by Django 5.2.16 on 2026-10-18 12:02
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0100_exportjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationChangeSet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("application_history_id", models.IntegerField(blank=True, null=True)),
+                ("history_date", models.DateTimeField()),
+                ("reason", models.TextField(blank=True, null=True)),
+                ("user_is_staff", models.BooleanField(default=False)),
+                ("user_name", models.CharField(max_length=256)),
+                (
+                    "changes",
+                    models.JSONField(
+                        default=list,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                    ),
+                ),
+                (
+                    "application",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="change_sets",
+                        to="applications.application",
+                        verbose_name="application",
+                    ),
+                ),
+                (
+                    "attachment",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="change_sets",
+                        to="applications.attachment",
+                        verbose_name="attachment",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "application change set",
+                "verbose_name_plural": "application change sets",
+                "db_table": "bf_applications_application_change_set",
+                "indexes": [
+                    models.Index(
+                        fields=["application", "-history_date"],
+                        name="bf_app_change_set_date_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -4,8 +4,19 @@ from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
-from django.db import connection, models
-from django.db.models import Exists, F, JSONField, OuterRef, Prefetch, Subquery
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    JSONField,
+    Max,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+)
 from django.db.models.constraints import UniqueConstraint
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -26,6 +37,8 @@ from applications.enums import (
     AttachmentType,
     BenefitType,
     DecisionType,
+    ExportJobStatus,
+    ExportJobType,
     HandlerRole,
     PaySubsidyGranted,
 )
@@ -37,6 +50,11 @@ from applications.exceptions import (
     BatchCompletionRequiredFieldsError,
     BatchTooManyDraftsError,
 )
+from applications.services.employee_name_search import (
+    NAME_SEARCH_MAX_CANDIDATES,
+    name_search_keys,
+    name_sort_key,
+)
 from calculator.enums import InstalmentStatus
 from common.localized_iban_field import LocalizedIBANField
 from common.utils import DurationMixin
@@ -102,32 +120,23 @@ class ApplicationManager(models.Manager):
 
     ARCHIVE_THRESHOLD = relativedelta(days=-14)
 
-    def _annotate_with_log_timestamp(self, qs, field_name, to_statuses):
-        subquery = (
-            ApplicationLogEntry.objects.filter(
-                application=OuterRef("pk"), to_status__in=to_statuses
-            )
-            .order_by("-created_at")
-            .values("created_at")[:1]
-        )
-        return qs.annotate(**{field_name: Subquery(subquery)})
-
     def get_queryset(self):
         """
         Annotate the queryset with information about timestamps of past status transitions.
         If multiple transitions to the same status have occurred, then use the latest status transition timestamp.
+        The timestamps are maintained in ApplicationStatusTimestamps whenever log entries are written.
         """  # noqa: E501
-        qs = super().get_queryset()
-        qs = self._annotate_with_log_timestamp(qs, "handled_at", self.HANDLED_STATUSES)
-        qs = self._annotate_with_log_timestamp(
-            qs,
-            "additional_information_requested_at",
-            [ApplicationStatus.ADDITIONAL_INFORMATION_NEEDED],
-        )
-        qs = self._annotate_with_log_timestamp(
-            qs, "submitted_at", [ApplicationStatus.RECEIVED]
+        return (
+            super()
+            .get_queryset()
+            .annotate(
+                handled_at=F("status_timestamps__handled_at"),
+                additional_information_requested_at=F(
+                    "status_timestamps__additional_information_requested_at"
+                ),
+                submitted_at=F("status_timestamps__submitted_at"),
+            )
         )
-        return qs
 
     def with_non_downloaded_attachments(self):
         """
@@ -684,13 +693,26 @@ class Application(UUIDModel, TimeStampedModel, DurationMixin):
         )
 
     def get_log_entry_field(self, to_statuses, field_name):
-        if (
-            log_entry := self.log_entries.filter(to_status__in=to_statuses)
-            .order_by(
-                "-created_at"
-            )  # the latest transition to one of the statuses listed in to_statuses
-            .first()
-        ):
+        if "log_entries" in getattr(self, "_prefetched_objects_cache", {}):
+            # the log entries were prefetched, e.g. for a CSV export
+            log_entry = max(
+                (
+                    log_entry
+                    for log_entry in self.log_entries.all()
+                    if log_entry.to_status in to_statuses
+                ),
+                key=lambda log_entry: log_entry.created_at,
+                default=None,
+            )
+        else:
+            log_entry = (
+                self.log_entries.filter(to_status__in=to_statuses)
+                .order_by(
+                    "-created_at"
+                )  # the latest transition to one of the statuses listed in to_statuses
+                .first()
+            )
+        if log_entry:
             return getattr(log_entry, field_name)
         else:
             return None
@@ -752,7 +774,27 @@ class DeMinimisAid(UUIDModel, TimeStampedModel):
         ordering = ["application__created_at", "ordering"]
 
 
+class ApplicationLogEntryQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        application_ids = set(self.values_list("application_id", flat=True))
+        rows = super().update(**kwargs)
+        ApplicationStatusTimestamps.objects.refresh_for(application_ids)
+        return rows
+
+    update.queryset_only = True
+
+    def delete(self):
+        application_ids = set(self.values_list("application_id", flat=True))
+        deleted = super().delete()
+        ApplicationStatusTimestamps.objects.refresh_for(application_ids)
+        return deleted
+
+    delete.queryset_only = True
+
+
 class ApplicationLogEntry(UUIDModel, TimeStampedModel):
+    objects = ApplicationLogEntryQuerySet.as_manager()
+
     application = models.ForeignKey(
         Application,
         verbose_name=_("application"),
@@ -774,6 +816,16 @@ class ApplicationLogEntry(UUIDModel, TimeStampedModel):
             f"{self.to_status}"
         )
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        ApplicationStatusTimestamps.objects.refresh_for([self.application_id])
+
+    def delete(self, *args, **kwargs):
+        application_id = self.application_id
+        deleted = super().delete(*args, **kwargs)
+        ApplicationStatusTimestamps.objects.refresh_for([application_id])
+        return deleted
+
     class Meta:
         db_table = "bf_applications_applicationlogentry"
         verbose_name = _("application log entry")
@@ -781,6 +833,146 @@ class ApplicationLogEntry(UUIDModel, TimeStampedModel):
         ordering = ["application__created_at", "created_at"]
 
 
+class ApplicationStatusTimestampsManager(models.Manager):
+    TIMESTAMP_STATUSES = {
+        "handled_at": ApplicationManager.HANDLED_STATUSES,
+        "additional_information_requested_at": [
+            ApplicationStatus.ADDITIONAL_INFORMATION_NEEDED
+        ],
+        "submitted_at": [ApplicationStatus.RECEIVED],
+    }
+
+    def compute_for(self, application_ids=None) -> dict:
+        """
+        Compute the latest status transition timestamps from the log entries of the
+        given applications, or of all applications. Returns a dict keyed by
+        application id.
+        """
+        applications = Application._base_manager.order_by()
+        if application_ids is not None:
+            applications = applications.filter(pk__in=application_ids)
+        timestamps = applications.values("pk").annotate(
+            **{
+                field_name: Max(
+                    "log_entries__created_at",
+                    filter=Q(log_entries__to_status__in=to_statuses),
+                )
+                for field_name, to_statuses in self.TIMESTAMP_STATUSES.items()
+            }
+        )
+        return {row.pop("pk"): row for row in timestamps}
+
+    def refresh_for(self, application_ids) -> None:
+        """Recompute and store the timestamps of the given applications"""
+        if not application_ids:
+            return
+        self.store(self.compute_for(application_ids))
+
+    def store(self, timestamps: dict) -> None:
+        self.bulk_create(
+            [
+                ApplicationStatusTimestamps(application_id=application_id, **values)
+                for application_id, values in timestamps.items()
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["application"],
+            update_fields=list(self.TIMESTAMP_STATUSES),
+        )
+
+
+class ApplicationStatusTimestamps(models.Model):
+    """
+    Timestamps of the latest status transitions of an application, denormalized from
+    its log entries so that listing applications does not need to scan the log for
+    every row. Kept up to date when log entries are written and can be rebuilt and
+    checked with the application_status_timestamps management command.
+    """
+
+    objects = ApplicationStatusTimestampsManager()
+
+    application = models.OneToOneField(
+        Application,
+        primary_key=True,
+        related_name="status_timestamps",
+        on_delete=models.CASCADE,
+        verbose_name=_("application"),
+    )
+    handled_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    additional_information_requested_at = models.DateTimeField(null=True, blank=True)
+    submitted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        db_table = "bf_applications_application_status_timestamps"
+        verbose_name = _("application status timestamps")
+        verbose_name_plural = _("application status timestamps")
+
+
+class ApplicationChangeSetQuerySet(models.QuerySet):
+    def visible(self):
+        """
+        The change sets shown in the change history of an application: the ones with
+        changes or with a change reason, newest first
+        """
+        return self.exclude(
+            Q(changes=[]) & (Q(reason__isnull=True) | Q(reason=""))
+        ).order_by("-history_date", F("application_history_id").desc(nulls_last=True))
+
+
+class ApplicationChangeSet(models.Model):
+    """
+    A set of changes made to an application after it was received, shown in the
+    change history of the application in the handler UI. The change sets are
+    materialized from the history records of the application, its employee and its
+    attachments as the records are created, and can be rebuilt with the
+    rebuild_application_change_sets management command.
+    """
+
+    objects = ApplicationChangeSetQuerySet.as_manager()
+
+    application = models.ForeignKey(
+        Application,
+        related_name="change_sets",
+        on_delete=models.CASCADE,
+        verbose_name=_("application"),
+    )
+    # The history record of the application the change set was diffed from, or None
+    # for the change sets of added attachments
+    application_history_id = models.IntegerField(null=True, blank=True)
+    attachment = models.ForeignKey(
+        "Attachment",
+        related_name="change_sets",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name=_("attachment"),
+    )
+    history_date = models.DateTimeField()
+    reason = models.TextField(null=True, blank=True)
+    user_is_staff = models.BooleanField(default=False)
+    user_name = models.CharField(max_length=256)
+    changes = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+
+    def as_dict(self) -> dict:
+        return {
+            "date": self.history_date,
+            "reason": self.reason,
+            "user": {"staff": self.user_is_staff, "name": self.user_name},
+            "changes": self.changes,
+        }
+
+    class Meta:
+        db_table = "bf_applications_application_change_set"
+        verbose_name = _("application change set")
+        verbose_name_plural = _("application change sets")
+        indexes = [
+            models.Index(
+                fields=["application", "-history_date"],
+                name="bf_app_change_set_date_idx",
+            ),
+        ]
+
+
 def validate_decision_date(value):
     """
     Validate batch decision date: allow empty or
@@ -1070,6 +1262,7 @@ class Employee(UUIDModel, TimeStampedModel):
     history = HistoricalRecords(
         table_name="bf_applications_employee_history",
         cascade_delete_history=True,
+        excluded_fields=["name_sort_key"],
     )
 
     encrypted_first_name = EncryptedCharField(
@@ -1099,6 +1292,14 @@ class Employee(UUIDModel, TimeStampedModel):
         encrypted_field_name="encrypted_social_security_number",
     )
 
+    # Keyed, order preserving key of the last name prefix, see name_sort_key. It is
+    # left out of the history, as it is recomputed from the last name on save.
+    name_sort_key = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+    )
+
     phone_number = PhoneNumberField(
         verbose_name=_("phone number"),
         blank=True,
@@ -1176,6 +1377,13 @@ class Employee(UUIDModel, TimeStampedModel):
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
 
+    def save(self, *args, **kwargs):
+        self.name_sort_key = name_sort_key(self.last_name)
+        super().save(*args, **kwargs)
+        EmployeeNameSearchKey.objects.update_for(
+            self.first_name, self.last_name, application_id=self.application_id
+        )
+
     class Meta:
         db_table = "bf_applications_employee"
         verbose_name = _("employee")
@@ -1726,3 +1934,207 @@ class ArchivalApplication(UUIDModel, TimeStampedModel):
             "first_name": self.employee_first_name,
             "last_name": self.employee_last_name,
         }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        EmployeeNameSearchKey.objects.update_for(
+            self.employee_first_name,
+            self.employee_last_name,
+            archival_application=self,
+        )
+
+
+class EmployeeNameSearchKeyManager(models.Manager):
+    def update_for(self, first_name, last_name, **owner):
+        """
+        Replace the search keys of an application or an archival application with
+        keys computed from the current, decrypted employee name.
+        """
+        keys = name_search_keys(first_name, last_name)
+        with transaction.atomic():
+            if set(self.filter(**owner).values_list("key", flat=True)) == keys:
+                return
+            self.filter(**owner).delete()
+            self.bulk_create([EmployeeNameSearchKey(key=key, **owner) for key in keys])
+
+    def rank_candidates(self, queryset, query, limit=NAME_SEARCH_MAX_CANDIDATES):
+        """
+        Narrow down an Application or ArchivalApplication queryset to the candidates
+        sharing the most name trigrams with the query, so that only those need to be
+        decrypted and fuzzy matched.
+        """
+        keys = name_search_keys(query)
+        if not keys:
+            return queryset.none()
+
+        owner_field = (
+            "archival_application_id"
+            if queryset.model is ArchivalApplication
+            else "application_id"
+        )
+        candidate_ids = (
+            self.filter(key__in=keys, **{f"{owner_field}__in": queryset.values("pk")})
+            .values(owner_field)
+            .annotate(hits=Count("id"))
+            .order_by("-hits", owner_field)
+            .values_list(owner_field, flat=True)[:limit]
+        )
+        return queryset.filter(pk__in=list(candidate_ids))
+
+
+class EmployeeNameSearchKey(models.Model):
+    """
+    Keyed hash of a single trigram of an employee name. Exactly one of application
+    and archival_application is set. The keys are maintained when the employee name
+    is saved and can be rebuilt with the rebuild_name_search_index command.
+    """
+
+    objects = EmployeeNameSearchKeyManager()
+
+    application = models.ForeignKey(
+        Application,
+        related_name="name_search_keys",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    archival_application = models.ForeignKey(
+        ArchivalApplication,
+        related_name="name_search_keys",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    key = models.CharField(max_length=16)
+
+    class Meta:
+        db_table = "bf_applications_employee_name_search_key"
+        verbose_name = _("employee name search key")
+        verbose_name_plural = _("employee name search keys")
+        indexes = [
+            models.Index(fields=["key", "application"]),
+            models.Index(fields=["key", "archival_application"]),
+        ]
+
+
+class ExportJobManager(models.Manager):
+    def claim_next(self) -> "ExportJob | None":
+        """
+        Mark the oldest pending export job as running and return it. Rows locked by
+        other workers are skipped, so that several workers can share the queue.
+        """
+        with transaction.atomic():
+            job = (
+                self.select_for_update(skip_locked=True)
+                .filter(status=ExportJobStatus.PENDING)
+                .order_by("created_at")
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = ExportJobStatus.RUNNING
+            job.started_at = job.heartbeat_at = timezone.now()
+            job.attempts += 1
+            job.save(
+                update_fields=[
+                    "status",
+                    "started_at",
+                    "heartbeat_at",
+                    "attempts",
+                    "modified_at",
+                ]
+            )
+        return job
+
+    def requeue_stale(self, heartbeat_before, max_attempts: int) -> tuple[int, int]:
+        """
+        Return the running jobs whose worker has not sent a heartbeat since the given
+        time to the queue, or fail them if they have been attempted max_attempts
+        times already. Return the number of requeued and failed jobs.
+        """
+        now = timezone.now()
+        stale_jobs = self.filter(
+            status=ExportJobStatus.RUNNING, heartbeat_at__lt=heartbeat_before
+        )
+        failed = stale_jobs.filter(attempts__gte=max_attempts).update(
+            status=ExportJobStatus.FAILED,
+            error=f"The export was abandoned by its worker {max_attempts} times",
+            finished_at=now,
+            modified_at=now,
+        )
+        requeued = stale_jobs.update(
+            status=ExportJobStatus.PENDING,
+            started_at=None,
+            heartbeat_at=None,
+            modified_at=now,
+        )
+        return requeued, failed
+
+    def delete_finished(self, finished_before) -> int:
+        """Delete the finished jobs and their result files"""
+        jobs = list(self.filter(finished_at__lt=finished_before))
+        for job in jobs:
+            if job.result_file:
+                job.result_file.delete(save=False)
+        self.filter(pk__in=[job.pk for job in jobs]).delete()
+        return len(jobs)
+
+
+class ExportJob(UUIDModel, TimeStampedModel):
+    """
+    Handler export that is run in the background by the run_export_jobs command.
+    The database table is the queue of the workers.
+    """
+
+    objects = ExportJobManager()
+
+    job_type = models.CharField(
+        max_length=64,
+        verbose_name=_("type of the export"),
+        choices=ExportJobType.choices,
+    )
+    parameters = JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=64,
+        verbose_name=_("status"),
+        choices=ExportJobStatus.choices,
+        default=ExportJobStatus.PENDING,
+    )
+    created_by = models.ForeignKey(
+        User,
+        verbose_name=_("created by"),
+        related_name="export_jobs",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    language = models.CharField(
+        max_length=2,
+        verbose_name=_("language of the export"),
+        choices=settings.LANGUAGES,
+        default=settings.LANGUAGE_CODE,
+    )
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Updated by the worker while the job is running, see export_job_heartbeat
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result_file = models.FileField(
+        verbose_name=_("export result"),
+        upload_to="export_jobs/",
+        null=True,
+        blank=True,
+    )
+    result_filename = models.CharField(max_length=255, blank=True)
+    result_content_type = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = "bf_applications_export_job"
+        verbose_name = _("export job")
+        verbose_name_plural = _("export jobs")
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.job_type} {self.status}"
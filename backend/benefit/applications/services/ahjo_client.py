@@ -1,8 +1,11 @@
 import json
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple, Union
-from urllib.parse import urlencode
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlencode, urlsplit
 
 import requests
 from django.conf import settings
@@ -27,6 +30,65 @@ LOGGER = logging.getLogger(__name__)
 API_CASES_BASE = "/cases"
 
 
+class AhjoRateLimiter:
+    """
+    Space out the requests sent to each Ahjo host, shared by all threads. The
+    requests are only spaced out while the limiter is enabled by a background Ahjo
+    job, so that the requests made while handling web requests never wait.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._next_request_at: Dict[str, float] = {}
+        self._enabled = 0
+
+    @contextmanager
+    def enabled(self):
+        """Rate limit the requests of all threads until the block exits"""
+        with self._lock:
+            self._enabled += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._enabled -= 1
+
+    def wait(self, url: str) -> None:
+        requests_per_second = settings.AHJO_REQUESTS_PER_SECOND
+        if requests_per_second <= 0 or not self._enabled:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            request_at = max(now, self._next_request_at.get(host, now))
+            self._next_request_at[host] = request_at + 1 / requests_per_second
+        if request_at > now:
+            time.sleep(request_at - now)
+
+
+ahjo_rate_limiter = AhjoRateLimiter()
+
+_ahjo_sessions = threading.local()
+
+
+def get_ahjo_session(ahjo_token: AhjoToken) -> requests.Session:
+    """
+    Return the keep-alive session of the current thread for the requests made with
+    the token, so that consecutive requests reuse the connections to Ahjo. The
+    sessions are not shared between threads, so the session of the previous token
+    can be closed when the token is refreshed without breaking the requests of the
+    other threads.
+    """
+    session = getattr(_ahjo_sessions, "session", None)
+    if session is None or _ahjo_sessions.access_token != ahjo_token.access_token:
+        if session is not None:
+            session.close()
+        session = requests.Session()
+        _ahjo_sessions.session = session
+        _ahjo_sessions.access_token = ahjo_token.access_token
+    return session
+
+
 @dataclass
 class AhjoRequest:
     request_type = AhjoRequestType
@@ -283,7 +345,8 @@ class AhjoApiClient:
             headers = self.prepare_ahjo_headers()
             data = json.dumps(data)
             api_url = self._request.api_url()
-            response = requests.request(
+            ahjo_rate_limiter.wait(api_url)
+            response = get_ahjo_session(self.ahjo_token).request(
                 method,
                 api_url,
                 headers=headers,
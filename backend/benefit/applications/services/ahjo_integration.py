@@ -1,19 +1,25 @@
+import hashlib
+import itertools
 import logging
 import os
 import uuid
 import zipfile
-from collections import defaultdict
-from dataclasses import dataclass
-from io import BytesIO
-from typing import List, Optional, Tuple, Union
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
 import jinja2
 import pdfkit
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db.models import QuerySet
 from django.urls import reverse
+from django.utils import timezone
 from lxml import etree
 from lxml.etree import XMLSchemaParseError, XMLSyntaxError
 
@@ -62,6 +68,7 @@ from applications.services.generate_application_summary import (
     generate_application_summary_file,
 )
 from companies.models import Company
+from shared.common.zip_stream import ZipStreamBuffer
 
 
 @dataclass
@@ -69,6 +76,9 @@ class ExportFileInfo:
     filename: str
     file_content: bytes
     html_content: str
+    template_path: str = ""
+    # The applications shown in the PDF, whose deletion clears the cached PDF
+    application_ids: List = field(default_factory=list)
 
 
 PDF_PATH = os.path.join(os.path.dirname(__file__) + "/pdf_templates")
@@ -195,13 +205,131 @@ JINJA_TEMPLATES_SINGLE = {
         },
     },
 }
+# Directory of the file storage where the converted PDFs are cached
+PDF_CACHE_DIRECTORY = "pdf_cache"
+# Directory of the empty files that index the cached PDFs of each application
+PDF_CACHE_APPLICATIONS_DIRECTORY = f"{PDF_CACHE_DIRECTORY}/applications"
+
 LOGGER = logging.getLogger(__name__)
 
 
-def _get_template(path):
+@lru_cache(maxsize=None)
+def _get_template_environment():
     template_loader = jinja2.FileSystemLoader(searchpath=PDF_PATH)
-    env = jinja2.Environment(loader=template_loader, autoescape=True)
-    return env.get_template(path)
+    return jinja2.Environment(loader=template_loader, autoescape=True)
+
+
+def _get_template(path):
+    return _get_template_environment().get_template(path)
+
+
+def _get_pdf_cache_digest(template_path: str, html: str) -> str:
+    return hashlib.sha256(f"{template_path}\0{html}".encode("utf-8")).hexdigest()
+
+
+def get_pdf_cache_name(digest: str) -> str:
+    return f"{PDF_CACHE_DIRECTORY}/{digest}.pdf"
+
+
+def _get_pdf_cache_index_name(application_id, digest: str) -> str:
+    return f"{PDF_CACHE_APPLICATIONS_DIRECTORY}/{application_id}/{digest}"
+
+
+def is_pdf_cache_expired(name: str) -> bool:
+    return default_storage.get_modified_time(name) <= timezone.now() - timedelta(
+        seconds=settings.EXPORT_PDF_CACHE_TIMEOUT
+    )
+
+
+def _read_cached_pdf(cache_name: str) -> Optional[bytes]:
+    if not default_storage.exists(cache_name):
+        return None
+    if is_pdf_cache_expired(cache_name):
+        default_storage.delete(cache_name)
+        return None
+    with default_storage.open(cache_name) as f:
+        return f.read()
+
+
+def _cache_pdf(digest: str, pdf: bytes, application_ids: Iterable):
+    cache_name = get_pdf_cache_name(digest)
+    try:
+        default_storage.save(cache_name, ContentFile(pdf))
+        for application_id in application_ids:
+            index_name = _get_pdf_cache_index_name(application_id, digest)
+            if not default_storage.exists(index_name):
+                default_storage.save(index_name, ContentFile(b""))
+    except OSError as e:
+        LOGGER.warning(f"Could not cache the PDF {cache_name}: {e}")
+
+
+def _convert_to_pdf(
+    template_path: str, html: str, application_ids: Iterable = ()
+) -> bytes:
+    """
+    Convert the rendered HTML to a PDF. The PDF is stored in the file storage keyed by
+    the template and the HTML for EXPORT_PDF_CACHE_TIMEOUT seconds, so the same HTML
+    is only converted once. The cached PDF is indexed by the given applications, so
+    that it is deleted along with any of them.
+    """
+    if not settings.EXPORT_PDF_CACHE_ENABLED:
+        return pdfkit.from_string(html, False)
+
+    digest = _get_pdf_cache_digest(template_path, html)
+    pdf = _read_cached_pdf(get_pdf_cache_name(digest))
+    if pdf is None:
+        pdf = pdfkit.from_string(html, False)
+        _cache_pdf(digest, pdf, application_ids)
+    return pdf
+
+
+def delete_cached_pdfs(application_ids: Iterable):
+    """Delete the cached PDFs that show any of the given applications"""
+    for application_id in application_ids:
+        directory = f"{PDF_CACHE_APPLICATIONS_DIRECTORY}/{application_id}"
+        try:
+            _, digests = default_storage.listdir(directory)
+        except FileNotFoundError:
+            continue
+        for digest in digests:
+            default_storage.delete(get_pdf_cache_name(digest))
+            default_storage.delete(f"{directory}/{digest}")
+
+
+def convert_to_pdfs(files: List[ExportFileInfo]) -> Iterator[ExportFileInfo]:
+    """
+    Convert the rendered HTML of the files to PDFs in parallel and yield the files in
+    order as soon as they are converted. Only one file more than there are workers is
+    converted ahead of the consumer, so the converted files do not pile up in memory.
+    """
+    workers = max(settings.EXPORT_PDF_WORKERS, 1)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+
+    def next_converted():
+        file, future = pending.popleft()
+        file.file_content = future.result()
+        return file
+
+    try:
+        for file in files:
+            pending.append(
+                (
+                    file,
+                    pool.submit(
+                        _convert_to_pdf,
+                        file.template_path,
+                        file.html_content,
+                        file.application_ids,
+                    ),
+                )
+            )
+            if len(pending) > workers:
+                yield next_converted()
+        while pending:
+            yield next_converted()
+    finally:
+        pool.shutdown(cancel_futures=True)
 
 
 def _get_granted_as_de_minimis_aid(app):
@@ -210,7 +338,9 @@ def _get_granted_as_de_minimis_aid(app):
     return False
 
 
-def gather_accepted_files(accepted_apps, accepted_groups, attachment_number):
+def gather_accepted_files(
+    accepted_apps, accepted_groups, attachment_number, convert_to_pdf=True
+):
     accepted_files: List[ExportFileInfo] = []
     for app in accepted_apps:
         accepted_groups[app.company].append(app)
@@ -231,28 +361,30 @@ def gather_accepted_files(accepted_apps, accepted_groups, attachment_number):
         if apps_pay_as_default:
             accepted_files.append(
                 generate_single_approved_file(
-                    group, apps_pay_as_default, attachment_number
+                    group, apps_pay_as_default, attachment_number, convert_to_pdf
                 )
             )
             attachment_number += 1
         if apps_pay_as_de_minimis:
             accepted_files.append(
                 generate_single_approved_file(
-                    group, apps_pay_as_de_minimis, attachment_number
+                    group, apps_pay_as_de_minimis, attachment_number, convert_to_pdf
                 )
             )
             attachment_number += 1
     return accepted_files, attachment_number
 
 
-def gather_rejected_files(rejected_apps, rejected_groups, attachment_number):
+def gather_rejected_files(
+    rejected_apps, rejected_groups, attachment_number, convert_to_pdf=True
+):
     rejected_files: List[ExportFileInfo] = []
     for app in rejected_apps:
         rejected_groups[app.company].append(app)
     for group, grouped_rejected_apps in rejected_groups.items():
         rejected_files.append(
             generate_single_declined_file(
-                group, grouped_rejected_apps, attachment_number
+                group, grouped_rejected_apps, attachment_number, convert_to_pdf
             )
         )
         attachment_number += 1
@@ -260,6 +392,14 @@ def gather_rejected_files(rejected_apps, rejected_groups, attachment_number):
 
 
 def prepare_pdf_files(apps: QuerySet[Application]) -> List[ExportFileInfo]:
+    return list(iter_pdf_files(apps))
+
+
+def iter_pdf_files(apps: QuerySet[Application]) -> Iterator[ExportFileInfo]:
+    """
+    Render the HTML of all PDF files of the applications and return an iterator that
+    converts them to PDFs while they are consumed
+    """
     pdf_files: List[ExportFileInfo] = []
 
     # SINGLE COMPANY/ASSOCIATION PER DECISION PER FILE
@@ -275,6 +415,7 @@ def prepare_pdf_files(apps: QuerySet[Application]) -> List[ExportFileInfo]:
         accepted_apps,
         rejected_apps,
         1,
+        convert_to_pdf=False,
     )
 
     # Start with three as Liite 1 and 2 is fixed for public/secret record
@@ -282,16 +423,18 @@ def prepare_pdf_files(apps: QuerySet[Application]) -> List[ExportFileInfo]:
 
     if accepted_apps:
         app_files, attachment_number = gather_accepted_files(
-            accepted_apps, defaultdict(list), attachment_number
+            accepted_apps, defaultdict(list), attachment_number, convert_to_pdf=False
         )
         pdf_files += app_files
     if rejected_apps:
         app_files, attachment_number = gather_rejected_files(
-            rejected_apps, defaultdict(list), attachment_number
+            rejected_apps, defaultdict(list), attachment_number, convert_to_pdf=False
         )
         pdf_files += app_files
 
-    return pdf_files
+    # The HTML of all files is rendered first, as rendering queries the database, and
+    # only then converted to PDFs in parallel
+    return convert_to_pdfs(pdf_files)
 
 
 def prepare_csv_file(
@@ -313,11 +456,25 @@ def prepare_csv_file(
     return csv_file_info
 
 
+def iter_csv_pdf_files(
+    ordered_queryset: QuerySet[Application],
+    remove_quotes: bool = False,
+    export_filename: str = "",
+) -> Iterator[ExportFileInfo]:
+    """
+    Prepare the CSV file and render the PDF files of the applications, and return an
+    iterator of the files that converts the PDFs while they are consumed
+    """
+    csv_file = prepare_csv_file(ordered_queryset, remove_quotes, export_filename)
+    return itertools.chain([csv_file], iter_pdf_files(ordered_queryset))
+
+
 def generate_pdf(
     apps: List[Application],
     template_config: dict,
     attachment_number: int,
     company: Optional[Company] = None,
+    convert_to_pdf: bool = True,
 ) -> ExportFileInfo:
     template = _get_template(template_config["path"])
     file_name: str = template_config["file_name"]
@@ -331,26 +488,40 @@ def generate_pdf(
             company_name="", attachment_number=attachment_number
         )
     html: str = template.render({**template_config["context"], "apps": apps})
+    application_ids = [app.pk for app in apps]
     return ExportFileInfo(
         filename=file_name,
-        file_content=pdfkit.from_string(html, False),
+        file_content=(
+            _convert_to_pdf(template_config["path"], html, application_ids)
+            if convert_to_pdf
+            else b""
+        ),
         html_content=html,
+        template_path=template_config["path"],
+        application_ids=application_ids,
     )
 
 
 def generate_single_declined_file(
-    company: Company, apps: List[Application], attachment_number: int
+    company: Company,
+    apps: List[Application],
+    attachment_number: int,
+    convert_to_pdf: bool = True,
 ) -> ExportFileInfo:
     return generate_pdf(
         apps=apps,
         template_config=JINJA_TEMPLATES_SINGLE[TEMPLATE_ID_BENEFIT_DECLINED],
         company=company,
         attachment_number=attachment_number,
+        convert_to_pdf=convert_to_pdf,
     )
 
 
 def generate_single_approved_file(
-    company: Company, apps: List[Application], attachment_number: int
+    company: Company,
+    apps: List[Application],
+    attachment_number: int,
+    convert_to_pdf: bool = True,
 ) -> ExportFileInfo:
     return generate_pdf(
         apps=apps,
@@ -363,6 +534,7 @@ def generate_single_approved_file(
         ],
         company=company,
         attachment_number=attachment_number,
+        convert_to_pdf=convert_to_pdf,
     )
 
 
@@ -370,6 +542,7 @@ def generate_composed_files(
     accepted_apps: List[Application],
     rejected_apps: List[Application],
     attachment_number: int,
+    convert_to_pdf: bool = True,
 ) -> List[ExportFileInfo]:
     return [
         generate_pdf(
@@ -377,6 +550,7 @@ def generate_composed_files(
             template_config=JINJA_TEMPLATES_COMPOSED[template_id],
             company=None,
             attachment_number=attachment_number,
+            convert_to_pdf=convert_to_pdf,
         )
         for template_id in COMPOSED_ACCEPTED_TEMPLATE_IDS
         if accepted_apps
@@ -386,20 +560,37 @@ def generate_composed_files(
             template_config=JINJA_TEMPLATES_COMPOSED[template_id],
             company=None,
             attachment_number=attachment_number,
+            convert_to_pdf=convert_to_pdf,
         )
         for template_id in COMPOSED_DECLINED_TEMPLATE_IDS
         if rejected_apps
     ]
 
 
-def generate_zip(files: List[ExportFileInfo]) -> bytes:
-    mem_zip = BytesIO()
+# Size of the chunks in which the files are deflated into a streamed zip file
+ZIP_CHUNK_SIZE = 64 * 1024
+
 
-    with zipfile.ZipFile(mem_zip, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+def stream_zip(files: Iterable[ExportFileInfo]) -> Iterator[bytes]:
+    """
+    Yield a zip file of the files in chunks. Each file is deflated and yielded as soon
+    as the iterable produces it, e.g. for a StreamingHttpResponse.
+    """
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
         for f in files:
-            zf.writestr(f.filename, f.file_content)
+            with zf.open(f.filename, mode="w") as zip_entry:
+                for start in range(0, len(f.file_content), ZIP_CHUNK_SIZE):
+                    zip_entry.write(f.file_content[start : start + ZIP_CHUNK_SIZE])
+                    if data := buffer.take():
+                        yield data
+            if data := buffer.take():
+                yield data
+    yield buffer.take()
+
 
-    return mem_zip.getvalue()
+def generate_zip(files: List[ExportFileInfo]) -> bytes:
+    return b"".join(stream_zip(files))
 
 
 def export_application_batch(batch) -> bytes:
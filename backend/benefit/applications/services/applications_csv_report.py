@@ -1,10 +1,11 @@
+import copy
 import decimal
 import logging
 from datetime import date, datetime
 from typing import List
 
 from django.conf import settings
-from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
+from django.db.models import QuerySet
 from django.utils import translation
 
 from applications.enums import ApplicationBatchStatus, ApplicationOrigin, BenefitType
@@ -15,7 +16,13 @@ from applications.services.csv_export_base import (
     get_organization_type,
     nested_queryset_attr,
 )
-from calculator.models import Instalment
+from calculator.enums import RowType
+from calculator.models import (
+    Instalment,
+    ManualOverrideTotalRow,
+    SalaryBenefitSubTotalRow,
+    SalaryBenefitTotalRow,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -41,7 +48,7 @@ def get_export_notes(application):
         notes.append("osa de minimis -tuista puuttuu raportilta")
     if application.pay_subsidies.count() > ApplicationsCsvService.MAX_PAY_SUBSIDIES:
         notes.append("osa palkkatuista puuttuu raportilta")
-    if application.ahjo_rows.count() > ApplicationsCsvService.MAX_AHJO_ROWS:
+    if len(get_ahjo_rows(application)) > ApplicationsCsvService.MAX_AHJO_ROWS:
         notes.append("osa Ahjo-riveistä puuttuu raportilta")
     return ", ".join(notes)
 
@@ -64,17 +71,55 @@ def format_bool(value):
         raise ValueError(f"Invalid value: {value}")
 
 
-def current_ahjo_row_field_getter(field_name):
+def get_ahjo_rows(application) -> list:
+    """
+    Return the Ahjo rows of the application like Calculation.ahjo_rows does, but from
+    the prefetched calculation rows when they are available.
+    """
+    if not hasattr(application, "calculation"):
+        return []
+    calculation = application.calculation
+    if "rows" not in getattr(calculation, "_prefetched_objects_cache", {}):
+        return list(calculation.ahjo_rows)
+
+    if any(
+        row.row_type == RowType.HELSINKI_BENEFIT_SUB_TOTAL_EUR
+        for row in calculation.rows.all()
+    ):
+        row_class = SalaryBenefitSubTotalRow
+    elif calculation.override_monthly_benefit_amount is not None:
+        row_class = ManualOverrideTotalRow
+    else:
+        row_class = SalaryBenefitTotalRow
+
+    ahjo_rows = []
+    for row in calculation.rows.all():
+        if row.row_type == row_class.proxy_row_type:
+            # use the proxy model, it defines how e.g. the monthly amount is shown
+            ahjo_row = copy.copy(row)
+            ahjo_row.__class__ = row_class
+            ahjo_rows.append(ahjo_row)
+    return ahjo_rows
+
+
+def ahjo_row_field_getter(row_idx, field_name):
     def getter(item):
-        if rows := list(item.ahjo_rows):
-            if item.application_row_idx - 1 < len(rows):
-                # application_row_idx is 1-based
-                return getattr(rows[item.application_row_idx - 1], field_name)
+        rows = get_ahjo_rows(item)
+        if row_idx < len(rows):
+            return getattr(rows[row_idx], field_name)
         return ""
 
     return getter
 
 
+def current_ahjo_row_field_getter(field_name):
+    def getter(item):
+        # application_row_idx is 1-based
+        return ahjo_row_field_getter(item.application_row_idx - 1, field_name)(item)
+
+    return getter
+
+
 def get_benefit_type_label(benefit_type) -> str:
     return str(BenefitType(benefit_type).label)
 
@@ -104,26 +149,45 @@ class ApplicationsCsvService(CsvExportBase):
 
     """  # noqa: E501
 
+    # The relations read by the CSV columns. They are loaded in bulk, so that an
+    # export issues a constant number of queries regardless of the number of rows.
+    select_related_fields = ["batch", "calculation", "company", "employee"]
+    prefetch_related_fields = [
+        "calculation__instalments",
+        "calculation__rows",
+        "pay_subsidies",
+        "de_minimis_aid_set",
+        "alteration_set",
+        "log_entries",
+    ]
+
     def __init__(self, applications, prune_sensitive_data=False):
         self.applications = applications
         self.export_notes = []
         self.prune_sensitive_data = prune_sensitive_data
 
+    def get_instalments(self, application: Application) -> list[Instalment]:
+        if not hasattr(application, "calculation"):
+            return []
+        return list(application.calculation.instalments.all())
+
     def query_instalment_by_number(
         self, application: Application, number: int
     ) -> Instalment:
         """Return the actual payable amount of the currently accepted and due instalment"""  # noqa: E501
-        try:
-            instalment = application.calculation.instalments.get(
-                instalment_number=number,
-            )
-            return instalment
-        except ObjectDoesNotExist:
+        instalments = [
+            instalment
+            for instalment in self.get_instalments(application)
+            if instalment.instalment_number == number
+        ]
+        if len(instalments) == 1:
+            return instalments[0]
+        if not instalments:
             LOGGER.info(
                 "Valid payable Instalment not found for application"
                 f" {application.application_number}"
             )
-        except MultipleObjectsReturned:
+        else:
             LOGGER.error(
                 "Multiple payable Instalments found for application    "
                 f" {application.application_number}, there should be only one"
@@ -391,27 +455,27 @@ class ApplicationsCsvService(CsvExportBase):
                 [
                     CsvColumn(
                         f"Ahjo-rivi {idx + 1} / tyyppi",
-                        nested_queryset_attr("ahjo_rows", idx, "row_type"),
+                        ahjo_row_field_getter(idx, "row_type"),
                     ),
                     CsvColumn(
                         f"Ahjo-rivi {idx + 1} / teksti",
-                        nested_queryset_attr("ahjo_rows", idx, "description_fi"),
+                        ahjo_row_field_getter(idx, "description_fi"),
                     ),
                     csv_default_column(
                         f"Ahjo-rivi {idx + 1} / määrä eur yht",
-                        nested_queryset_attr("ahjo_rows", idx, "amount"),
+                        ahjo_row_field_getter(idx, "amount"),
                     ),
                     csv_default_column(
                         f"Ahjo-rivi {idx + 1} / määrä eur kk",
-                        nested_queryset_attr("ahjo_rows", idx, "monthly_amount"),
+                        ahjo_row_field_getter(idx, "monthly_amount"),
                     ),
                     csv_default_column(
                         f"Ahjo-rivi {idx + 1} / alkupäivä",
-                        nested_queryset_attr("ahjo_rows", idx, "start_date"),
+                        ahjo_row_field_getter(idx, "start_date"),
                     ),
                     csv_default_column(
                         f"Ahjo-rivi {idx + 1} / päättymispäivä",
-                        nested_queryset_attr("ahjo_rows", idx, "end_date"),
+                        ahjo_row_field_getter(idx, "end_date"),
                     ),
                 ]
             )
@@ -486,13 +550,17 @@ class ApplicationsCsvService(CsvExportBase):
         return [col for col in columns if col.heading not in sensitive_col_headings]
 
     def get_applications(self):
+        if isinstance(self.applications, QuerySet):
+            return self.applications.select_related(
+                *self.select_related_fields
+            ).prefetch_related(*self.prefetch_related_fields)
         return self.applications
 
     def get_row_items(self):
         with translation.override("fi"):
             for application in self.get_applications():
                 for application_row_idx, _ in enumerate(
-                    application.ahjo_rows or [None]
+                    get_ahjo_rows(application) or [None]
                 ):
                     # The CSV output is easier to process in PowerBI
                     # if the rows belonging to the same application are numbered.
@@ -503,11 +571,16 @@ class ApplicationsCsvService(CsvExportBase):
                     yield application
 
     def get_csv_cell_list_lines_generator(self):
-        if self.get_applications():
-            yield from super().get_csv_cell_list_lines_generator()
-        else:
-            header_row = self._get_header_row()
-            yield header_row
+        # Every application produces at least one line, so the applications are
+        # loaded only once per export
+        lines = super().get_csv_cell_list_lines_generator()
+        header_row = next(lines)
+        yield header_row
+        has_applications = False
+        for line in lines:
+            has_applications = True
+            yield line
+        if not has_applications:
             yield ["Ei löytynyt ehdot täyttäviä hakemuksia"] + [""] * (
                 len(header_row) - 1
             )
@@ -1,13 +1,24 @@
 from datetime import timedelta
 
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
 from simple_history.models import ModelChange
 
 from applications.enums import ApplicationStatus
-from applications.models import Application, ApplicationLogEntry
+from applications.models import (
+    Application,
+    ApplicationChangeSet,
+    ApplicationLogEntry,
+    Attachment,
+    Employee,
+)
 from users.models import User
 
 DISABLE_DE_MINIMIS_AIDS = True
+HANDLING_STATUSES = [
+    ApplicationStatus.HANDLING,
+    ApplicationStatus.ADDITIONAL_INFORMATION_NEEDED,
+]
 EXCLUDED_APPLICATION_FIELDS = (
     "application_step",
     "pay_subsidy_percent",
@@ -70,130 +81,260 @@ def _get_change_set_base(new_record: ModelChange):
 look_up_for_application_save_in_seconds = 0.25
 
 
-def _filter_and_format_changes(
-    changes, excluded_fields, relation_name: str = None, delta_time=None
-):
-    return list(
-        map(
-            lambda change: _format_change_dict(change, relation_name),
-            filter(  # Only accept those changes that are within the threshold delta_time and/or not excluded field  # noqa: E501
-                lambda change: not _is_history_change_excluded(change, excluded_fields)
-                and (
-                    delta_time
-                    is None  # We'll ignore this check for application changes as delta_time's not present  # noqa: E501
-                    or 0 <= delta_time <= look_up_for_application_save_in_seconds
-                ),
-                changes,
-            ),
-        )
+def _filter_and_format_changes(changes, excluded_fields, relation_name: str = None):
+    return [
+        _format_change_dict(change, relation_name)
+        for change in changes
+        if not _is_history_change_excluded(change, excluded_fields)
+    ]
+
+
+def _is_human_user(user) -> bool:
+    return user is not None and not (
+        "ahjorestapi" in user.username.lower()
+        and not user.first_name
+        and not user.last_name
     )
 
 
-def _create_change_set(app_diff, employee_diffs):
-    change_set = _get_change_set_base(app_diff.new_record)
-    change_set["changes"] = _filter_and_format_changes(
-        app_diff.changes,
-        EXCLUDED_APPLICATION_FIELDS,
+def _get_human_users():
+    # Exclude any non-human users
+    return User.objects.exclude(
+        username__icontains="ahjorestapi",
+        first_name__exact="",
+        last_name__exact="",
     )
 
-    for employee_diff in employee_diffs:
-        delta_time = (
-            employee_diff.new_record.history_date - app_diff.new_record.history_date
-        ).total_seconds()
-        change_set["changes"] += _filter_and_format_changes(
-            employee_diff.changes, EXCLUDED_EMPLOYEE_FIELDS, "employee", delta_time
-        )
 
-    return (
-        change_set
-        if len(change_set["changes"]) > 0
-        or (change_set["reason"] and len(change_set["reason"]) > 0)
-        else None
+def _before(history_record) -> Q:
+    """Filter the history records created before the given record"""
+    return Q(history_date__lt=history_record.history_date) | Q(
+        history_date=history_record.history_date,
+        history_id__lt=history_record.history_id,
     )
 
 
-def get_application_change_history(application: Application) -> list:
+def _get_employee_changes(application_history_record) -> list:
     """
-    Get application change history between the point when application is received and
-    the current time.
-
-    NOTE: The de minimis aid is not tracked here.
+    Get the changes of the employee saved along with the application, i.e. within
+    the look up time after the application was saved. The employee history records
+    are diffed against the previous records saved along with the application.
     """
+    window = timedelta(seconds=look_up_for_application_save_in_seconds)
+    employee_history = Employee.history.filter(
+        application_id=application_history_record.id
+    )
+    saved_along_with_application = Exists(
+        ApplicationChangeSet.objects.filter(
+            application_id=application_history_record.id,
+            application_history_id__isnull=False,
+            history_date__gte=OuterRef("history_date") - window,
+            history_date__lte=OuterRef("history_date") + window,
+        )
+    )
 
-    # Exclude any non-human users
-    users = User.objects.exclude(
-        username__icontains="ahjorestapi",
-        first_name__exact="",
-        last_name__exact="",
-    ).values_list("id", flat=True)
-
-    application_history = (
-        application.history.filter(
-            history_user__id__in=users,
-            status__in=[
-                ApplicationStatus.HANDLING,
-                ApplicationStatus.ADDITIONAL_INFORMATION_NEEDED,
-            ],
+    changes = []
+    for employee_record in employee_history.filter(
+        history_date__range=(
+            application_history_record.history_date,
+            application_history_record.history_date + window,
+        )
+    ):
+        previous_record = (
+            employee_history.filter(_before(employee_record))
+            .filter(saved_along_with_application)
+            .first()
         )
-        | application.history.filter(status=ApplicationStatus.RECEIVED)[:1]
+        if previous_record:
+            changes += _filter_and_format_changes(
+                employee_record.diff_against(previous_record).changes,
+                EXCLUDED_EMPLOYEE_FIELDS,
+                "employee",
+            )
+    return changes
+
+
+def _store_change_set(change_set: dict, **fields) -> ApplicationChangeSet:
+    return ApplicationChangeSet.objects.create(
+        history_date=change_set["date"],
+        reason=change_set["reason"],
+        user_is_staff=change_set["user"]["staff"],
+        user_name=change_set["user"]["name"],
+        changes=change_set["changes"],
+        **fields,
     )
 
-    application_diffs = []
-
-    for i in range(len(application_history) - 1):
-        diff = application_history[i].diff_against(application_history[i + 1])
-        application_diffs.append(diff)
-
-    app_diff_dates = [diff.new_record.history_date for diff in application_diffs]
-
-    # fetch employee history changes that occured during the saving of application
-    employee_q_objects = Q()
-    for dt in app_diff_dates:
-        start_date = dt - timedelta(seconds=look_up_for_application_save_in_seconds)
-        end_date = dt + timedelta(seconds=look_up_for_application_save_in_seconds)
-        employee_q_objects |= Q(history_date__range=(start_date, end_date))
-
-    employee_history = application.employee.history.filter(employee_q_objects)
-    employee_diffs = []
-    for i in range(len(employee_history) - 1):
-        diff = employee_history[i].diff_against(employee_history[i + 1])
-        employee_diffs.append(diff)
-
-    change_sets = list(
-        filter(
-            None,
-            map(
-                lambda app_diff: _create_change_set(app_diff, employee_diffs),
-                application_diffs,
-            ),
+
+def record_application_history(history_record) -> None:
+    """
+    Store the change set of a new history record of an application being handled,
+    diffed against the previous record of the change history, which is the latest
+    earlier record of the application being handled or received.
+    """
+    if history_record.status not in HANDLING_STATUSES or not _is_human_user(
+        history_record.history_user
+    ):
+        return
+
+    previous_record = (
+        Application.history.filter(id=history_record.id)
+        .filter(_before(history_record))
+        .filter(
+            Q(status__in=HANDLING_STATUSES, history_user__in=_get_human_users())
+            | Q(status=ApplicationStatus.RECEIVED)
         )
+        .first()
     )
+    if previous_record is None:
+        return
+
+    change_set = _get_change_set_base(history_record)
+    change_set["changes"] = _filter_and_format_changes(
+        history_record.diff_against(previous_record).changes,
+        EXCLUDED_APPLICATION_FIELDS,
+    )
+    # The change set is recorded again when the employee is saved after the
+    # application
+    ApplicationChangeSet.objects.filter(
+        application_id=history_record.id,
+        application_history_id=history_record.history_id,
+    ).delete()
+    stored_change_set = _store_change_set(
+        change_set,
+        application_id=history_record.id,
+        application_history_id=history_record.history_id,
+    )
+    # The change set needs to be stored before looking up the employee changes, as
+    # the employee history records are diffed against the records saved along with
+    # the application
+    if employee_changes := _get_employee_changes(history_record):
+        stored_change_set.changes += employee_changes
+        stored_change_set.save(update_fields=["changes"])
+
+
+def record_application_history_change_reason(history_record) -> None:
+    """
+    Update the reason of the change set of a history record of an application, as
+    the reason is set after the record is created
+    """
+    ApplicationChangeSet.objects.filter(
+        application_id=history_record.id,
+        application_history_id=history_record.history_id,
+    ).update(reason=history_record.history_change_reason)
+
+
+def record_employee_history(history_record) -> None:
+    """
+    Update the change sets of the application saves the new history record of an
+    employee was saved along with
+    """
+    window = timedelta(seconds=look_up_for_application_save_in_seconds)
+    application_history_ids = ApplicationChangeSet.objects.filter(
+        application_id=history_record.application_id,
+        application_history_id__isnull=False,
+        history_date__range=(
+            history_record.history_date - window,
+            history_record.history_date,
+        ),
+    ).values_list("application_history_id", flat=True)
+    for application_history_record in Application.history.filter(
+        history_id__in=list(application_history_ids)
+    ).order_by("history_date", "history_id"):
+        record_application_history(application_history_record)
+
+
+def record_attachment_history(history_record) -> None:
+    """
+    Store the change set of an attachment added to an application after it was
+    submitted
+    """
+    if history_record.history_type != "+" or not _is_human_user(
+        history_record.history_user
+    ):
+        return
 
     submitted_at = (
         ApplicationLogEntry.objects.filter(
-            application=application, to_status=ApplicationStatus.RECEIVED
+            application_id=history_record.application_id,
+            to_status=ApplicationStatus.RECEIVED,
         )
         .order_by("-created_at")
-        .values("created_at")[:1]
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    if submitted_at is None or history_record.history_date < submitted_at:
+        return
+
+    change_set = _get_change_set_base(history_record)
+    change_set["changes"] = [
+        {
+            "field": "attachments",
+            "old": "+",
+            "new": str(history_record.attachment_file),
+            "meta": history_record.attachment_type,
+        }
+    ]
+    _store_change_set(
+        change_set,
+        application_id=history_record.application_id,
+        attachment_id=history_record.id,
+    )
+
+
+@transaction.atomic
+def rebuild_application_change_sets(application_id) -> None:
+    """
+    Rebuild the change sets of an application by recording its history records and
+    the history records of its employee and attachments in the order they were
+    created
+    """
+    ApplicationChangeSet.objects.filter(application_id=application_id).delete()
+    history_records = [
+        (record, record_application_history)
+        for record in Application.history.filter(id=application_id)
+    ]
+    history_records += [
+        (record, record_employee_history)
+        for record in Employee.history.filter(application_id=application_id)
+    ]
+    history_records += [
+        (record, record_attachment_history)
+        for record in Attachment.history.filter(application_id=application_id)
+    ]
+    history_records.sort(
+        key=lambda history_record: (
+            history_record[0].history_date,
+            history_record[0].history_id,
+        )
+    )
+    for record, record_history in history_records:
+        record_history(record)
+
+
+def backfill_application_change_sets() -> int:
+    """
+    Build the change sets of the applications that have none yet, e.g. the ones
+    created before the change sets were recorded, and return their number
+    """
+    application_ids = (
+        Application._base_manager.filter(
+            ~Exists(ApplicationChangeSet.objects.filter(application=OuterRef("pk")))
+        )
+        .order_by("created_at")
+        .values_list("pk", flat=True)
     )
+    total = 0
+    for application_id in application_ids.iterator():
+        rebuild_application_change_sets(application_id)
+        total += 1
+    return total
 
-    attachment_diffs = []
-    for attachment in application.attachments.all():
-        for new_record in attachment.history.filter(
-            history_type="+",
-            history_date__gte=submitted_at,
-            history_user_id__in=list(users),
-        ):
-            change_set_base = _get_change_set_base(new_record)
-            change_set_base["changes"] = [
-                {
-                    "field": "attachments",
-                    "old": "+",
-                    "new": new_record.attachment_file,
-                    "meta": new_record.attachment_type,
-                }
-            ]
-            attachment_diffs.append(change_set_base)
-    change_sets = change_sets + attachment_diffs
-    change_sets.sort(key=lambda x: x["date"], reverse=True)
-    return change_sets
+
+def get_application_change_history(application: Application) -> list:
+    """
+    Get application change history between the point when application is received and
+    the current time.
+
+    NOTE: The de minimis aid is not tracked here.
+    """
+    return [change_set.as_dict() for change_set in application.change_sets.visible()]
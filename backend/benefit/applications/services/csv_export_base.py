@@ -92,9 +92,10 @@ class CsvExportBase:
           and the corresponding attribute should be found in the item
         """  # noqa: E501
         yield self._get_header_row()
+        columns = self.csv_columns
         for item in self.get_row_items():
             line = []
-            for column in self.csv_columns:
+            for column in columns:
                 if callable(column.cell_data_source):
                     cell_value = column.cell_data_source(item)
                 else:
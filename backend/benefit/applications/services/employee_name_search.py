@@ -0,0 +1,181 @@
+import functools
+import hashlib
+import hmac
+import itertools
+import re
+
+import numpy as np
+from django.conf import settings
+from rapidfuzz import fuzz, process
+
+# Maximum amount of ranked candidates that are serialized and fuzzy matched for
+# a single name search
+NAME_SEARCH_MAX_CANDIDATES = 200
+
+# Length of the stored hexadecimal trigram hash. 64 bits is plenty to keep
+# collisions between the few thousand distinct name trigrams negligible.
+NAME_SEARCH_KEY_LENGTH = 16
+
+
+# Length of the last name prefix that determines the database order of the names
+NAME_SORT_KEY_LENGTH = 2
+
+# The characters up to the end of Latin Extended-B get sort keys of their own, all
+# the other characters share the highest key
+NAME_SORT_KEY_CHARACTERS = 0x250
+
+# Upper bound of the keyed random gap between the sort keys of adjacent characters
+NAME_SORT_KEY_MAX_GAP = 16
+
+
+@functools.lru_cache(maxsize=4)
+def _character_sort_keys(hash_key: str) -> tuple[int, ...]:
+    """
+    Return strictly increasing sort keys for the character codes, spaced apart by
+    gaps derived from the hash key, so that the keys can't be mapped back to the
+    characters without the key.
+    """
+    key = bytes.fromhex(hash_key)
+    gaps = b"".join(
+        hmac.new(key, f"name-sort-key:{block}".encode(), hashlib.sha256).digest()
+        for block in range(-(-NAME_SORT_KEY_CHARACTERS // hashlib.sha256().digest_size))
+    )[:NAME_SORT_KEY_CHARACTERS]
+    return tuple(itertools.accumulate(1 + gap % NAME_SORT_KEY_MAX_GAP for gap in gaps))
+
+
+def name_sort_key(last_name: str) -> int:
+    """
+    Return the key used to order applications by the encrypted employee name in the
+    database. The key follows the order of the first letters of the lowercase last
+    name and is derived with the last name hash key, so the letters can't be read
+    from it directly. It is still a one-to-one substitution of the two letter prefix
+    that keeps its order, so anyone with access to the database can recover the
+    prefixes from the order and frequency of the keys; treat the keys as revealing
+    the first letters of the last names. The exact order within a key is resolved
+    from the decrypted names.
+    """
+    character_keys = _character_sort_keys(settings.EMPLOYEE_LAST_NAME_HASH_KEY)
+    shared_key = character_keys[-1] + 1
+    key = 0
+    remaining = NAME_SORT_KEY_LENGTH
+    for character in (last_name or "").lower()[:NAME_SORT_KEY_LENGTH]:
+        code = ord(character)
+        remaining -= 1
+        key = key * (shared_key + 1)
+        if code >= NAME_SORT_KEY_CHARACTERS:
+            # the following characters can't be ordered after a shared key
+            key += shared_key
+            break
+        key += character_keys[code]
+    return key * (shared_key + 1) ** remaining
+
+
+def normalize_name(value: str) -> str:
+    """Lowercase the name and collapse everything that is not a letter or a digit"""
+    return " ".join(re.split(r"[\W_]+", (value or "").lower())).strip()
+
+
+def name_trigrams(*names: str) -> set[str]:
+    """
+    Return the trigrams of all words in the given names, padded the same way as
+    PostgreSQL's pg_trgm does, so that word order does not affect the result.
+    """
+    trigrams = set()
+    for name in names:
+        for word in normalize_name(name).split():
+            padded = f"  {word} "
+            trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def name_search_keys(*names: str) -> set[str]:
+    """
+    Return keyed hashes of the name trigrams, so that the search index does not
+    store any part of the employee name in plain text.
+    """
+    hash_key = bytes.fromhex(settings.EMPLOYEE_FIRST_NAME_HASH_KEY)
+    return {
+        hmac.new(hash_key, trigram.encode("utf-8"), hashlib.sha256).hexdigest()[
+            :NAME_SEARCH_KEY_LENGTH
+        ]
+        for trigram in name_trigrams(*names)
+    }
+
+
+class EmployeeNameMatcher:
+    """
+    Fuzzy matcher for the employee names of serialized applications.
+
+    All first/last name order variants are built once per row and scored against
+    the query in a single batch, so every threshold tier and the substring fallback
+    are answered without rebuilding or rescoring the haystack.
+    """
+
+    THRESHOLDS = (80, 70)
+
+    def __init__(self, applications: list[dict]):
+        self.applications = applications
+        self.row_variants = [
+            self.get_name_variants(application) for application in applications
+        ]
+        self.variants = [variant for row in self.row_variants for variant in row]
+
+    @staticmethod
+    def get_name_variants(application: dict) -> tuple[str, str, str, str]:
+        """Return all possible combinations of first/lastname orders for matching"""
+        first_name = application["employee"]["first_name"]
+        last_name = application["employee"]["last_name"]
+        return (
+            f"{first_name} {last_name}".lower(),
+            f"{last_name} {first_name}".lower(),
+            first_name.lower(),
+            last_name.lower(),
+        )
+
+    def get_scores(self, query: str) -> np.ndarray:
+        """Return the best score of each row, rounded like fuzzywuzzy's fuzz.ratio"""
+        if not self.applications:
+            return np.zeros(0, dtype=np.int32)
+        variant_scores = process.cdist(
+            [str(query)],
+            self.variants,
+            scorer=fuzz.ratio,
+            dtype=np.float32,
+            workers=-1,
+        )[0]
+        return (
+            np.rint(variant_scores)
+            .astype(np.int32)
+            .reshape(len(self.applications), -1)
+            .max(axis=1)
+        )
+
+    def match(self, query: str, thresholds: tuple[int, ...] = THRESHOLDS) -> dict:
+        """
+        Return the rows scoring at least the first threshold that matches anything,
+        best match first. If no threshold matches, fall back to substring matching
+        and flag the result with fallback=True.
+        """
+        scores = self.get_scores(query)
+        for threshold in thresholds:
+            (indexes,) = np.nonzero(scores >= threshold)
+            if len(indexes):
+                indexes = indexes[np.argsort(-scores[indexes], kind="stable")]
+                return {
+                    "data": [self.applications[index] for index in indexes],
+                    "scores": [
+                        {"index": int(index), "score": int(scores[index])}
+                        for index in indexes
+                    ],
+                    "fallback": False,
+                }
+
+        return {
+            "data": [
+                application
+                for application, variants in zip(self.applications, self.row_variants)
+                if any(query in variant for variant in variants)
+            ],
+            "scores": None,
+            "fallback": True,
+        }
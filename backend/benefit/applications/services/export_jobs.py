@@ -0,0 +1,204 @@
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, Tuple
+
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone, translation
+from django.utils.text import format_lazy
+from django.utils.translation import gettext_lazy as _
+
+from applications.enums import (
+    ApplicationBatchStatus,
+    ApplicationStatus,
+    ExportJobStatus,
+    ExportJobType,
+)
+from applications.models import Application, ApplicationBatch, ExportJob
+from applications.services.ahjo_integration import iter_csv_pdf_files, stream_zip
+from applications.services.generate_application_summary import (
+    generate_handler_application_pdf,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+APPLICATION_ORDERING = "application_number"
+ZIP_CONTENT_TYPE = "application/x-zip-compressed"
+PDF_CONTENT_TYPE = "application/pdf"
+# Seconds between the heartbeats of a running export job
+HEARTBEAT_INTERVAL = 30
+
+# Filename, content type and content chunks of an export result
+ExportResult = Tuple[str, str, Iterable[bytes]]
+
+
+def export_filename_without_suffix():
+    return format_lazy(
+        _("Helsinki-lisan hakemukset viety {date}"),
+        date=timezone.now().strftime("%Y%m%d_%H%M%S"),
+    )
+
+
+def create_application_batch(
+    queryset: QuerySet[Application], status: ApplicationStatus
+) -> list:
+    """
+    Create a new application batch out of the applications of the queryset in the
+    given status that are not yet assigned to a batch, and return their ids
+    """
+    queryset = queryset.filter(status=status, batch__isnull=True)
+    status_map = {
+        ApplicationStatus.ACCEPTED: ApplicationBatchStatus.DECIDED_ACCEPTED,
+        ApplicationStatus.REJECTED: ApplicationBatchStatus.DECIDED_REJECTED,
+    }
+    if status not in status_map:
+        raise AssertionError("Internal error, should not happen")
+
+    application_ids = [application.pk for application in queryset]
+    if queryset:
+        batch = ApplicationBatch.objects.create(
+            proposal_for_decision=status_map[status]
+        )
+        queryset.update(batch=batch)
+    return application_ids
+
+
+def _export_csv_pdf_files(
+    queryset: QuerySet[Application], remove_quotes: bool = False
+) -> ExportResult:
+    filename = str(export_filename_without_suffix())
+    files = iter_csv_pdf_files(
+        queryset.order_by(APPLICATION_ORDERING), remove_quotes, filename
+    )
+    return f"{filename}.zip", ZIP_CONTENT_TYPE, stream_zip(files)
+
+
+def export_batch_pdf_files(job: ExportJob) -> ExportResult:
+    return _export_csv_pdf_files(
+        Application.objects.filter(batch_id=job.parameters["batch_id"])
+    )
+
+
+def export_new_accepted_applications_csv_pdf(job: ExportJob) -> ExportResult:
+    application_ids = create_application_batch(
+        Application.objects.all(), ApplicationStatus.ACCEPTED
+    )
+    return _export_csv_pdf_files(
+        Application.objects.filter(pk__in=application_ids), remove_quotes=True
+    )
+
+
+def export_new_rejected_applications_csv_pdf(job: ExportJob) -> ExportResult:
+    application_ids = create_application_batch(
+        Application.objects.all(), ApplicationStatus.REJECTED
+    )
+    return _export_csv_pdf_files(Application.objects.filter(pk__in=application_ids))
+
+
+def export_application_pdf(job: ExportJob) -> ExportResult:
+    application = Application.objects.get(pk=job.parameters["application_id"])
+    pdf = generate_handler_application_pdf(application)
+    if not pdf:
+        raise ValueError(
+            f"Cannot generate handler PDF for application {application.pk}"
+        )
+    return (
+        f"application_{application.application_number}.pdf",
+        PDF_CONTENT_TYPE,
+        [pdf],
+    )
+
+
+EXPORTERS: dict[str, Callable[[ExportJob], ExportResult]] = {
+    ExportJobType.BATCH_PDF_FILES: export_batch_pdf_files,
+    ExportJobType.NEW_ACCEPTED_APPLICATIONS_CSV_PDF: (
+        export_new_accepted_applications_csv_pdf
+    ),
+    ExportJobType.NEW_REJECTED_APPLICATIONS_CSV_PDF: (
+        export_new_rejected_applications_csv_pdf
+    ),
+    ExportJobType.APPLICATION_PDF: export_application_pdf,
+}
+
+
+@contextmanager
+def export_job_heartbeat(job: ExportJob, interval: float = HEARTBEAT_INTERVAL):
+    """
+    Update the heartbeat of the running job every interval seconds until the block
+    exits. The export runs in a transaction, so the heartbeat is sent from a thread
+    of its own with a database connection of its own.
+    """
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval):
+                ExportJob.objects.filter(
+                    pk=job.pk, status=ExportJobStatus.RUNNING, attempts=job.attempts
+                ).update(heartbeat_at=timezone.now())
+        except Exception:
+            LOGGER.exception(f"Sending the heartbeat of export job {job.pk} failed")
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"export-job-{job.pk}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run_export_job(
+    job: ExportJob, heartbeat_interval: float = HEARTBEAT_INTERVAL
+) -> ExportJob:
+    """
+    Run the export of a claimed job and store the result file. If the export fails,
+    its database changes, e.g. a created application batch, are rolled back and the
+    error is stored instead. The result is discarded if the job has been requeued
+    and claimed again in the meantime.
+    """
+    try:
+        with (
+            export_job_heartbeat(job, heartbeat_interval),
+            transaction.atomic(),
+            translation.override(job.language),
+        ):
+            filename, content_type, chunks = EXPORTERS[job.job_type](job)
+            with tempfile.TemporaryFile() as result:
+                for chunk in chunks:
+                    result.write(chunk)
+                result.seek(0)
+                job.result_file.save(filename, File(result), save=False)
+        job.result_filename = filename
+        job.result_content_type = content_type
+        job.status = ExportJobStatus.COMPLETED
+    except Exception as e:
+        LOGGER.exception(f"Export job {job.pk} of type {job.job_type} failed")
+        job.status = ExportJobStatus.FAILED
+        job.error = str(e)
+    job.finished_at = timezone.now()
+
+    finished = ExportJob.objects.filter(
+        pk=job.pk, status=ExportJobStatus.RUNNING, attempts=job.attempts
+    ).update(
+        status=job.status,
+        result_file=job.result_file.name or None,
+        result_filename=job.result_filename,
+        result_content_type=job.result_content_type,
+        error=job.error,
+        finished_at=job.finished_at,
+        modified_at=job.finished_at,
+    )
+    if not finished:
+        LOGGER.warning(
+            f"Export job {job.pk} was requeued while it was running, its result of"
+            f" attempt {job.attempts} is discarded"
+        )
+        if job.result_file:
+            job.result_file.delete(save=False)
+    return job
@@ -0,0 +1,302 @@
+import logging
+from typing import List
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.utils import timezone
+from simple_history.utils import bulk_update_with_history
+
+from applications.enums import ApplicationBatchStatus, ApplicationTalpaStatus
+from applications.models import Application, ApplicationBatch
+from calculator.enums import InstalmentStatus
+from calculator.models import Instalment
+from shared.audit_log import audit_logging
+from shared.audit_log.enums import Operation
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TalpaCallbackService:
+    """
+    Apply the results of a Talpa payment run to the applications, their due
+    instalments and their batches. The affected rows are locked and loaded with
+    one query per model and updated in bulk, so the number of queries doesn't
+    depend on the number of applications in the callback.
+    """
+
+    def __init__(self, ip_address: str):
+        self.ip_address = ip_address
+
+    @transaction.atomic
+    def handle_successful_applications(self, application_numbers: List[int]):
+        if settings.PAYMENT_INSTALMENTS_ENABLED:
+            self.update_due_instalments(
+                application_numbers,
+                instalment_status=InstalmentStatus.PAID,
+                log_message="instalment was read by TALPA and marked as paid",
+                is_success=True,
+            )
+        else:
+            self.update_applications_and_related_batches(
+                application_numbers,
+                ApplicationTalpaStatus.SUCCESSFULLY_SENT_TO_TALPA,
+                ApplicationBatchStatus.SENT_TO_TALPA,
+                "application was read succesfully by TALPA and archived",
+                is_archived=True,
+            )
+
+    @transaction.atomic
+    def handle_failed_applications(self, application_numbers: List[int]):
+        """Update applications and related batch which could not be processed with status REJECTED_BY_TALPA"""  # noqa: E501
+        if settings.PAYMENT_INSTALMENTS_ENABLED:
+            self.update_due_instalments(
+                application_numbers,
+                instalment_status=InstalmentStatus.ERROR_IN_TALPA,
+                log_message=(
+                    "there was an error and the instalment was not read by TALPA"
+                ),
+                is_success=False,
+            )
+        else:
+            self.update_applications_and_related_batches(
+                application_numbers,
+                ApplicationTalpaStatus.REJECTED_BY_TALPA,
+                ApplicationBatchStatus.REJECTED_BY_TALPA,
+                "application was rejected by TALPA",
+            )
+
+    def update_applications_and_related_batches(
+        self,
+        application_numbers: List[int],
+        application_talpa_status: ApplicationTalpaStatus,
+        batch_status: ApplicationBatchStatus,
+        log_message: str,
+        is_archived: bool = False,
+    ):
+        """Update applications and related batch with given statuses and log the event.
+        This will be deprecated after the instalments feature is enabled for all applications.
+        """  # noqa: E501
+        applications = self._lock_applications(
+            Application.objects.filter(application_number__in=application_numbers),
+            application_numbers,
+        )
+        batch_statuses = {}
+        for application in applications:
+            self._set_application_statuses(
+                application,
+                batch_statuses,
+                application_talpa_status,
+                batch_status,
+                is_archived,
+            )
+
+        self._save(applications, [], batch_statuses)
+        self._write_to_audit_log(
+            [(application, log_message) for application in applications]
+        )
+
+    def update_due_instalments(
+        self,
+        application_numbers: List[int],
+        instalment_status: InstalmentStatus,
+        log_message: str,
+        is_success: bool = False,
+    ):
+        """
+        After receiving the callback from Talpa, update the status of the currently due
+        instalments of the applications.
+        If the instalments  1/1 or 2/2, e.g the final instalment,
+        update the application status, batch status to SENT_TO_TALPA.
+        Always set the application as archived after the first instalment is succesfully sent to talpa.
+        """  # noqa: E501
+        applications = self._lock_applications(
+            Application.objects.filter(
+                application_number__in=application_numbers,
+                pk__in=Application.objects.with_due_instalments(
+                    InstalmentStatus.ACCEPTED
+                ).values("pk"),
+            ).prefetch_related("alteration_set"),
+            application_numbers,
+        )
+        instalments_by_application = self._lock_instalments(applications)
+
+        today = timezone.now().date()
+        changed_applications = []
+        changed_instalments = []
+        batch_statuses = {}
+        audit_log_entries = []
+        for application in applications:
+            instalments = instalments_by_application.get(application.pk, [])
+            due_instalments = [
+                instalment
+                for instalment in instalments
+                if instalment.status == InstalmentStatus.ACCEPTED
+                and instalment.due_date is not None
+                and instalment.due_date <= today
+            ]
+            if not due_instalments:
+                LOGGER.error(
+                    "Valid payable Instalment not found for application"
+                    f" {application.application_number}"
+                )
+                continue
+            if len(due_instalments) > 1:
+                LOGGER.error(
+                    "Multiple payable Instalments found for application"
+                    f" {application.application_number}, there should be only one"
+                )
+                continue
+
+            instalment = due_instalments[0]
+            instalment.status = instalment_status
+            if is_success:
+                instalment.amount_paid = instalment.amount_after_recoveries
+            changed_instalments.append(instalment)
+
+            if is_success:
+                # after 1st instalment is sent to talpa,
+                # update the application status,
+                # batch status and set the application as archived
+                self._set_application_statuses(
+                    application,
+                    batch_statuses,
+                    ApplicationTalpaStatus.PARTIALLY_SENT_TO_TALPA,
+                    ApplicationBatchStatus.PARTIALLY_SENT_TO_TALPA,
+                    is_archived=True,
+                )
+                audit_log_entries.append(
+                    (
+                        application,
+                        f"instalment {instalment.instalment_number}/{len(instalments)}"
+                        " was read by TALPA and marked as paid",
+                    )
+                )
+
+                # check if this is the final instalment for the application
+                if instalment.instalment_number == len(instalments):
+                    self._set_application_statuses(
+                        application,
+                        batch_statuses,
+                        ApplicationTalpaStatus.SUCCESSFULLY_SENT_TO_TALPA,
+                        ApplicationBatchStatus.SENT_TO_TALPA,
+                        is_archived=True,
+                    )
+                changed_applications.append(application)
+
+            elif instalment.instalment_number == 1:
+                # If Talpa reports a failure for the 1st instalment
+                # update the application status, batch status to REJECTED_BY_TALPA
+                self._set_application_statuses(
+                    application,
+                    batch_statuses,
+                    ApplicationTalpaStatus.REJECTED_BY_TALPA,
+                    ApplicationBatchStatus.REJECTED_BY_TALPA,
+                    is_archived=False,
+                )
+                audit_log_entries.append(
+                    (application, "application instalment was rejected by TALPA")
+                )
+                changed_applications.append(application)
+
+            # Add audit log entries for applications which were processed by TALPA
+            audit_log_entries.append((application, log_message))
+
+        self._save(changed_applications, changed_instalments, batch_statuses)
+        self._write_to_audit_log(audit_log_entries)
+
+    @staticmethod
+    def _lock_applications(queryset, application_numbers) -> List[Application]:
+        """Lock and load the applications, ordered as they are processed"""
+        if not application_numbers:
+            return []
+        applications = list(
+            queryset.select_for_update(of=("self",)).order_by("created_at")
+        )
+        if not applications:
+            LOGGER.error(
+                f"No applications found with numbers: {application_numbers} for update"
+                " after TALPA download"
+            )
+        return applications
+
+    @staticmethod
+    def _lock_instalments(applications: List[Application]) -> dict:
+        """Lock and load all the instalments of the applications by application"""
+        applications_by_id = {
+            application.pk: application for application in applications
+        }
+        instalments = {}
+        for instalment in (
+            Instalment.objects.select_for_update(of=("self",))
+            .select_related("calculation")
+            .filter(calculation__application__in=list(applications_by_id))
+            .order_by("instalment_number")
+        ):
+            application = applications_by_id[instalment.calculation.application_id]
+            # the recoveries of the instalment are read from the prefetched
+            # alterations of the application
+            instalment.calculation.application = application
+            instalments.setdefault(application.pk, []).append(instalment)
+        return instalments
+
+    @staticmethod
+    def _set_application_statuses(
+        application: Application,
+        batch_statuses: dict,
+        application_talpa_status: ApplicationTalpaStatus,
+        batch_status: ApplicationBatchStatus,
+        is_archived: bool,
+    ):
+        application.talpa_status = application_talpa_status
+        application.archived = is_archived
+        if application.batch_id:
+            # Each batch is updated once, with the status of its last processed
+            # application
+            batch_statuses[application.batch_id] = batch_status
+
+    @staticmethod
+    def _save(
+        applications: List[Application],
+        instalments: List[Instalment],
+        batch_statuses: dict,
+    ):
+        now = timezone.now()
+        for instalment in instalments:
+            instalment.modified_at = now
+        Instalment.objects.bulk_update(
+            instalments, ["status", "amount_paid", "modified_at"]
+        )
+
+        for application in applications:
+            application.modified_at = now
+        if applications:
+            # the history records are created as they would be by saving each
+            # application
+            bulk_update_with_history(
+                applications,
+                Application,
+                ["talpa_status", "archived", "modified_at"],
+                default_date=now,
+            )
+
+        batches = list(
+            ApplicationBatch.objects.select_for_update().filter(
+                pk__in=list(batch_statuses)
+            )
+        )
+        for batch in batches:
+            batch.status = batch_statuses[batch.pk]
+            batch.modified_at = now
+        ApplicationBatch.objects.bulk_update(batches, ["status", "modified_at"])
+
+    def _write_to_audit_log(self, entries: list):
+        """Add audit log entries for applications which were processed by TALPA"""
+        if entries:
+            audit_logging.log_many(
+                AnonymousUser,
+                "",
+                Operation.READ,
+                entries,
+                ip_address=self.ip_address,
+            )
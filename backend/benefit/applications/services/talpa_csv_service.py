@@ -2,7 +2,6 @@ import decimal
 import logging
 
 from django.conf import settings
-from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
 from django.utils import timezone, translation
 
 from applications.models import Application
@@ -25,18 +24,22 @@ class TalpaCsvService(ApplicationsCsvService):
         """Return the actual payable amount of the currently accepted and due instalment"""  # noqa: E501
         # TODO remove this flag when the feature is enabled ready for production
         if settings.PAYMENT_INSTALMENTS_ENABLED:
-            try:
-                instalment = application.calculation.instalments.get(
-                    status=InstalmentStatus.ACCEPTED,
-                    due_date__lte=timezone.now().date(),
-                )
-                return instalment.amount_after_recoveries
-            except ObjectDoesNotExist:
+            today = timezone.now().date()
+            instalments = [
+                instalment
+                for instalment in self.get_instalments(application)
+                if instalment.status == InstalmentStatus.ACCEPTED
+                and instalment.due_date is not None
+                and instalment.due_date <= today
+            ]
+            if len(instalments) == 1:
+                return instalments[0].amount_after_recoveries
+            if not instalments:
                 LOGGER.error(
                     "Valid payable Instalment not found for application"
                     f" {application.application_number}"
                 )
-            except MultipleObjectsReturned:
+            else:
                 LOGGER.error(
                     "Multiple payable Instalments found for application"
                     f" {application.application_number}, there should be only one"
@@ -0,0 +1,26 @@
+from django.db import transaction
+
+from applications.services import change_history
+from applications.services.ahjo_integration import delete_cached_pdfs
+
+
+def record_application_change_set(sender, history_instance, **kwargs):
+    change_history.record_application_history(history_instance)
+
+
+def update_application_change_set_reason(sender, instance, created, **kwargs):
+    if not created:
+        change_history.record_application_history_change_reason(instance)
+
+
+def record_employee_change_set(sender, history_instance, **kwargs):
+    change_history.record_employee_history(history_instance)
+
+
+def record_attachment_change_set(sender, history_instance, **kwargs):
+    change_history.record_attachment_history(history_instance)
+
+
+def delete_application_cached_pdfs(sender, instance, **kwargs):
+    application_id = instance.pk
+    transaction.on_commit(lambda: delete_cached_pdfs([application_id]))
@@ -8,9 +8,11 @@ from unittest.mock import patch
 
 import pytest
 from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from django.core.management import call_command
 from django.http import FileResponse
 from django.urls import reverse
 from django.utils import timezone
+from freezegun import freeze_time
 
 from applications.api.v1.ahjo_integration_views import AhjoAttachmentView
 from applications.enums import (
@@ -40,6 +42,7 @@ from applications.services.ahjo_application_service import (
 )
 from applications.services.ahjo_integration import (
     ACCEPTED_TITLE,
+    PDF_CACHE_APPLICATIONS_DIRECTORY,
     REJECTED_TITLE,
     ExportFileInfo,
     export_application_batch,
@@ -48,6 +51,8 @@ from applications.services.ahjo_integration import (
     generate_single_approved_file,
     generate_single_declined_file,
     get_application_for_ahjo,
+    prepare_pdf_files,
+    stream_zip,
 )
 from applications.tests.factories import ApplicationFactory, DecidedApplicationFactory
 from calculator.models import Calculation
@@ -266,6 +271,156 @@ def test_export_application_batch(application_batch):
     )
 
 
+def test_stream_zip():
+    produced = []
+
+    def files():
+        for index in range(3):
+            produced.append(index)
+            yield ExportFileInfo(
+                filename=f"file_{index}.pdf",
+                file_content=os.urandom(100 * 1024),
+                html_content="",
+            )
+
+    chunks = stream_zip(files())
+    first_chunk = next(chunks)
+    # The first file is deflated and yielded before the next one is produced
+    assert first_chunk.startswith(b"PK")
+    assert produced == [0]
+
+    archive = zipfile.ZipFile(io.BytesIO(first_chunk + b"".join(chunks)))
+    assert produced == [0, 1, 2]
+    assert archive.testzip() is None
+    assert [info.filename for info in archive.infolist()] == [
+        "file_0.pdf",
+        "file_1.pdf",
+        "file_2.pdf",
+    ]
+    assert all(
+        info.compress_type == zipfile.ZIP_DEFLATED for info in archive.infolist()
+    )
+
+
+@pytest.mark.django_db
+@patch("applications.services.ahjo_integration.pdfkit.from_string")
+def test_prepare_pdf_files_uses_cached_pdfs(mock_pdf_convert, settings, tmp_path):
+    settings.EXPORT_PDF_CACHE_ENABLED = True
+    settings.EXPORT_PDF_WORKERS = 2
+    settings.MEDIA_ROOT = str(tmp_path)
+    mock_pdf_convert.side_effect = lambda html, _: f"%PDF {len(html)}".encode()
+    DecidedApplicationFactory(status=ApplicationStatus.ACCEPTED)
+    rejected_app = DecidedApplicationFactory(status=ApplicationStatus.REJECTED)
+
+    def apps():
+        return Application.objects.order_by("application_number")
+
+    files = prepare_pdf_files(apps())
+    # Composed public and private files of both decisions and one file per company
+    assert len(files) == 6
+    assert mock_pdf_convert.call_count == 6
+    for file in files:
+        assert file.file_content == f"%PDF {len(file.html_content)}".encode()
+    assert len(_get_cached_pdfs(tmp_path)) == 6
+
+    # Unchanged files are not converted again
+    assert [file.file_content for file in prepare_pdf_files(apps())] == [
+        file.file_content for file in files
+    ]
+    assert mock_pdf_convert.call_count == 6
+
+    # Only the files that show the changed employee name are converted again
+    rejected_app.employee.first_name = "Changed"
+    rejected_app.employee.save()
+    prepare_pdf_files(apps())
+    assert mock_pdf_convert.call_count == 8
+
+
+def _get_cached_pdfs(media_root):
+    return {
+        name for name in os.listdir(media_root / "pdf_cache") if name.endswith(".pdf")
+    }
+
+
+@pytest.fixture
+def pdf_cache(settings, tmp_path):
+    settings.EXPORT_PDF_CACHE_ENABLED = True
+    settings.EXPORT_PDF_CACHE_TIMEOUT = 3600
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db
+@patch("applications.services.ahjo_integration.pdfkit.from_string")
+def test_cached_pdfs_expire(mock_pdf_convert, pdf_cache):
+    mock_pdf_convert.side_effect = lambda html, _: b"%PDF"
+    DecidedApplicationFactory(status=ApplicationStatus.ACCEPTED)
+    prepare_pdf_files(Application.objects.all())
+    assert mock_pdf_convert.call_count == 3
+
+    with freeze_time(timezone.now() + timedelta(seconds=3599)):
+        prepare_pdf_files(Application.objects.all())
+    assert mock_pdf_convert.call_count == 3
+
+    with freeze_time(timezone.now() + timedelta(seconds=3601)):
+        prepare_pdf_files(Application.objects.all())
+        assert mock_pdf_convert.call_count == 6
+        assert len(_get_cached_pdfs(pdf_cache)) == 3
+
+
+@pytest.mark.django_db
+@patch("applications.services.ahjo_integration.pdfkit.from_string")
+def test_cached_pdfs_deleted_with_application(
+    mock_pdf_convert, pdf_cache, django_capture_on_commit_callbacks
+):
+    mock_pdf_convert.side_effect = lambda html, _: f"%PDF {len(html)}".encode()
+    company = CompanyFactory()
+    deleted_app = DecidedApplicationFactory.create_batch(
+        2, status=ApplicationStatus.ACCEPTED, company=company
+    )[0]
+    index_directory = pdf_cache / PDF_CACHE_APPLICATIONS_DIRECTORY / str(deleted_app.pk)
+    separate_app = DecidedApplicationFactory(status=ApplicationStatus.REJECTED)
+    prepare_pdf_files(Application.objects.all())
+    separate_pdfs = {
+        f"{digest}.pdf"
+        for digest in os.listdir(
+            pdf_cache / PDF_CACHE_APPLICATIONS_DIRECTORY / str(separate_app.pk)
+        )
+    }
+    assert separate_pdfs < _get_cached_pdfs(pdf_cache)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        deleted_app.delete()
+
+    # The PDFs that showed the deleted application are deleted, including the ones
+    # shared with the other application
+    assert _get_cached_pdfs(pdf_cache) == separate_pdfs
+    assert not os.listdir(index_directory)
+
+
+@pytest.mark.django_db
+@patch("applications.services.ahjo_integration.pdfkit.from_string")
+def test_clear_pdf_cache(mock_pdf_convert, pdf_cache):
+    mock_pdf_convert.side_effect = lambda html, _: b"%PDF"
+    application = DecidedApplicationFactory(status=ApplicationStatus.ACCEPTED)
+    prepare_pdf_files(Application.objects.all())
+    index_directory = pdf_cache / PDF_CACHE_APPLICATIONS_DIRECTORY / str(application.pk)
+
+    call_command("clear_pdf_cache")
+    assert len(_get_cached_pdfs(pdf_cache)) == 3
+    assert len(os.listdir(index_directory)) == 3
+
+    with freeze_time(timezone.now() + timedelta(seconds=3601)):
+        call_command("clear_pdf_cache")
+    assert not _get_cached_pdfs(pdf_cache)
+    assert not os.listdir(index_directory)
+
+    prepare_pdf_files(Application.objects.all())
+    call_command("clear_pdf_cache", all=True)
+    assert not _get_cached_pdfs(pdf_cache)
+    assert not os.listdir(index_directory)
+
+
 @pytest.mark.django_db
 @patch("applications.services.ahjo_integration.pdfkit.from_string")
 def test_multiple_benefit_per_application(mock_pdf_convert):
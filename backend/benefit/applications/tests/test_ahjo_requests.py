@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from unittest.mock import patch
 
@@ -25,9 +26,11 @@ from applications.services.ahjo_client import (
     AhjoDecisionProposalRequest,
     AhjoDeleteCaseRequest,
     AhjoOpenCaseRequest,
+    AhjoRateLimiter,
     AhjoSignerRequest,
     AhjoSubscribeDecisionRequest,
     AhjoUpdateRecordsRequest,
+    get_ahjo_session,
 )
 
 API_CASES_BASE = "/cases"
@@ -384,3 +387,58 @@ def test_requests_exceptions(
         )
         client.send_request_to_ahjo()
         mock_logger.error.assert_called()
+
+
+def test_ahjo_rate_limiter(settings):
+    settings.AHJO_REQUESTS_PER_SECOND = 10
+    rate_limiter = AhjoRateLimiter()
+
+    # the requests are not limited unless a background job enables the limiter
+    with patch("applications.services.ahjo_client.time.sleep") as mock_sleep:
+        rate_limiter.wait("https://ahjo.example.com/cases")
+        rate_limiter.wait("https://ahjo.example.com/cases/1")
+    mock_sleep.assert_not_called()
+
+    with (
+        patch("applications.services.ahjo_client.time.sleep") as mock_sleep,
+        rate_limiter.enabled(),
+    ):
+        rate_limiter.wait("https://ahjo.example.com/cases")
+        rate_limiter.wait("https://ahjo.example.com/cases/1")
+        rate_limiter.wait("https://other.example.com/cases")
+        rate_limiter.wait("https://ahjo.example.com/cases/2")
+
+    # only the requests to the same host are spaced out
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert len(delays) == 2
+    assert delays[0] == pytest.approx(0.1, abs=0.05)
+    assert delays[1] == pytest.approx(0.2, abs=0.05)
+
+    settings.AHJO_REQUESTS_PER_SECOND = 0
+    with (
+        patch("applications.services.ahjo_client.time.sleep") as mock_sleep,
+        rate_limiter.enabled(),
+    ):
+        rate_limiter.wait("https://ahjo.example.com/cases")
+    mock_sleep.assert_not_called()
+
+
+def test_ahjo_session_is_kept_per_thread_and_token(non_expired_token):
+    session = get_ahjo_session(non_expired_token)
+    assert get_ahjo_session(non_expired_token) is session
+
+    # the other threads don't share the session, so refreshing the token in them
+    # does not close it
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_session = executor.submit(get_ahjo_session, non_expired_token).result()
+    assert other_session is not session
+
+    refreshed_token = AhjoToken(
+        access_token="refreshed_access_token",
+        refresh_token="refresh_token",
+        expires_in=30000,
+        created_at=timezone.now(),
+    )
+    with patch.object(session, "close") as mock_close:
+        assert get_ahjo_session(refreshed_token) is not session
+    mock_close.assert_called_once()
@@ -1,8 +1,10 @@
 from datetime import timedelta
+from io import StringIO
 from unittest import mock
 
 import faker
 import pytest
+from django.core.management import call_command
 from freezegun import freeze_time
 from rest_framework.reverse import reverse
 
@@ -11,6 +13,8 @@ from applications.api.v1.serializers.application import (
     HandlerApplicationSerializer,
 )
 from applications.enums import ApplicationActions, ApplicationStatus, AttachmentType
+from applications.models import ApplicationChangeSet
+from applications.services.change_history import get_application_change_history
 from applications.tests.conftest import *  # noqa
 from applications.tests.test_applications_api import (
     _upload_pdf,
@@ -190,7 +194,7 @@ def check_applicant_changes(applicant_edit_payloads, changes, application):
 # Freeze so de minimis has reasonable granted_at
 @pytest.mark.freeze_time("2023-01-01")
 def test_application_history_change_sets(
-    request, handler_api_client, api_client, application
+    request, handler_api_client, api_client, application, django_assert_num_queries
 ):
     payload = HandlerApplicationSerializer(application).data
     payload["status"] = ApplicationStatus.RECEIVED
@@ -273,3 +277,30 @@ def test_application_history_change_sets(
     applicant_changes = changes[0 : len(applicant_edit_payloads) + 1]
 
     check_applicant_changes(applicant_edit_payloads, applicant_changes, application)
+
+    # The change history is read from the stored change sets with one query, and
+    # rebuilding the change sets from the history gives the same change history
+    with django_assert_num_queries(1):
+        change_history = get_application_change_history(application)
+    assert change_history == changes
+    ApplicationChangeSet.objects.filter(application=application).delete()
+    out = StringIO()
+    call_command(
+        "rebuild_application_change_sets",
+        "--application",
+        str(application.pk),
+        stdout=out,
+    )
+    assert out.getvalue() == "Rebuilt change history of 1 applications\n"
+    assert get_application_change_history(application) == change_history
+
+    # The applications without change sets, e.g. the ones created before they were
+    # recorded, are backfilled
+    ApplicationChangeSet.objects.filter(application=application).delete()
+    out = StringIO()
+    call_command("rebuild_application_change_sets", "--missing", stdout=out)
+    assert out.getvalue().startswith("Built change history of ")
+    assert get_application_change_history(application) == change_history
+    change_set_ids = set(application.change_sets.values_list("pk", flat=True))
+    call_command("rebuild_application_change_sets", "--missing", stdout=StringIO())
+    assert set(application.change_sets.values_list("pk", flat=True)) == change_set_ids
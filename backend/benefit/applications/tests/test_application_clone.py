@@ -194,6 +194,7 @@ employee_fields = {
         "encrypted_social_security_number",
         "encrypted_first_name",
         "encrypted_last_name",
+        "name_sort_key",
         "phone_number",
         "email",
         "employee_language",
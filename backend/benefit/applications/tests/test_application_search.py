@@ -9,8 +9,24 @@ from rest_framework.reverse import reverse
 
 from applications.api.v1.search_views import SearchPattern, SubsidyInEffect
 from applications.enums import ApplicationBatchStatus, ApplicationStatus
-from applications.models import ArchivalApplication
-from applications.tests.factories import ApplicationBatchFactory
+from applications.management.commands.benchmark_name_matching import (
+    three_pass_matching,
+)
+from applications.models import (
+    Application,
+    ArchivalApplication,
+    Employee,
+    EmployeeNameSearchKey,
+)
+from applications.services.employee_name_search import (
+    EmployeeNameMatcher,
+    name_search_keys,
+    name_sort_key,
+)
+from applications.tests.factories import (
+    ApplicationBatchFactory,
+    DecidedApplicationFactory,
+)
 from applications.tests.test_command_import_archival_applications import (
     ImportArchivalApplicationsTestUtility,
 )
@@ -372,3 +388,133 @@ def test_search_related_applications(handler_api_client, app_no, application):
     response = handler_api_client.get(f"{api_url}?{params}")
     data = response.json()
     assert len(data["matches"]) == 1
+
+
+@pytest.mark.django_db
+def test_name_search_keys_are_updated_on_save(application):
+    application.employee.first_name = "Mikro Tietokoneinen"
+    application.employee.last_name = "Matriisi-Artikkeli"
+    application.employee.save()
+
+    keys = set(application.name_search_keys.values_list("key", flat=True))
+    assert keys == name_search_keys("Mikro Tietokoneinen", "Matriisi-Artikkeli")
+    # Word order does not affect the keys
+    assert keys == name_search_keys("Artikkeli Matriisi Tietokoneinen Mikro")
+
+    application.employee.first_name = "Uusi"
+    application.employee.save()
+
+    assert set(
+        application.name_search_keys.values_list("key", flat=True)
+    ) == name_search_keys("Uusi", "Matriisi-Artikkeli")
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        ["", "A", "aa", "Aaltonen", "ab", "b", "Östman", "Ż", "中"],
+        ["Virtanen", "virtanen", "Vä", "Väisänen", "Ö", "Öö", "łukasz", "中b"],
+    ],
+)
+def test_name_sort_key_keeps_name_order(names):
+    sort_keys = [name_sort_key(name) for name in sorted(names, key=str.lower)]
+    assert sort_keys == sorted(sort_keys)
+
+
+def test_name_sort_key_depends_on_hash_key(settings):
+    sort_key = name_sort_key("Matriisi")
+    settings.EMPLOYEE_LAST_NAME_HASH_KEY = "00" * 32
+    assert name_sort_key("Matriisi") != sort_key
+
+
+@pytest.mark.django_db
+def test_name_sort_key_is_not_stored_in_history(application):
+    application.employee.last_name = "Matriisi"
+    application.employee.save()
+
+    assert application.employee.name_sort_key == name_sort_key("Matriisi")
+    history_fields = {
+        field.name for field in application.employee.history.model._meta.fields
+    }
+    assert "name_sort_key" not in history_fields
+
+
+@pytest.mark.django_db
+def test_name_search_ranks_candidates(application):
+    application = setup_application_data(application, False)
+    DecidedApplicationFactory.create_batch(3)
+
+    queryset = EmployeeNameSearchKey.objects.rank_candidates(
+        Application.objects.all(), "matriizi", limit=1
+    )
+    assert list(queryset) == [application]
+
+    queryset = EmployeeNameSearchKey.objects.rank_candidates(
+        Application.objects.exclude(pk=application.pk), "matriizi"
+    )
+    assert application not in queryset
+
+
+@pytest.mark.django_db
+def test_rebuild_name_search_index(application):
+    ImportArchivalApplicationsTestUtility.create_companies_for_archival_applications()
+    call_command("import_archival_applications", filename="test.xlsx", production=True)
+    archival_application = ArchivalApplication.objects.get(application_number="R001")
+    expected_keys = set(
+        archival_application.name_search_keys.values_list("key", flat=True)
+    )
+    assert expected_keys == name_search_keys(
+        archival_application.employee_first_name,
+        archival_application.employee_last_name,
+    )
+
+    EmployeeNameSearchKey.objects.all().delete()
+    Employee.objects.update(name_sort_key=0)
+    call_command("rebuild_name_search_index")
+
+    application.employee.refresh_from_db()
+    assert application.employee.name_sort_key == name_sort_key(
+        application.employee.last_name
+    )
+
+    assert (
+        set(archival_application.name_search_keys.values_list("key", flat=True))
+        == expected_keys
+    )
+    assert set(
+        application.name_search_keys.values_list("key", flat=True)
+    ) == name_search_keys(
+        application.employee.first_name, application.employee.last_name
+    )
+
+
+@pytest.mark.parametrize(
+    "query, expected_names, fallback",
+    [
+        ("mikro tietokoneinen", ["Mikro Tietokoneinen", "Mikko Tietokone"], False),
+        ("tietokoneinen mikko", ["Mikro Tietokoneinen", "Mikko Tietokone"], False),
+        ("matriisi", ["Mikro Matriisi"], False),
+        ("kone", ["Mikro Tietokoneinen", "Mikko Tietokone"], True),
+        ("nobody", [], True),
+    ],
+)
+def test_employee_name_matcher(query, expected_names, fallback):
+    applications = [
+        {"employee": {"first_name": first_name, "last_name": last_name}}
+        for first_name, last_name in [
+            ("Mikro", "Tietokoneinen"),
+            ("Mikko", "Tietokone"),
+            ("Mikro", "Matriisi"),
+        ]
+    ]
+
+    results = EmployeeNameMatcher(applications).match(query)
+
+    assert [
+        f"{app['employee']['first_name']} {app['employee']['last_name']}"
+        for app in results["data"]
+    ] == expected_names
+    assert results["fallback"] == fallback
+    expected = three_pass_matching(applications, query)
+    assert results["data"] == expected["data"]
+    assert results["scores"] == expected["scores"]
@@ -22,7 +22,10 @@ from applications.services.ahjo.response_handler import (
     AhjoDecisionDetailsResponseHandler,
 )
 from applications.services.ahjo_authentication import AhjoToken
-from applications.tests.factories import CancelledApplicationFactory
+from applications.tests.factories import (
+    CancelledApplicationFactory,
+    DecidedApplicationFactory,
+)
 
 
 @pytest.mark.django_db
@@ -286,6 +289,54 @@ def test_send_ahjo_requests(
             )
 
 
+@patch(
+    "applications.management.commands.send_ahjo_requests.send_open_case_request_to_ahjo"
+)
+@pytest.mark.django_db(transaction=True)
+def test_send_ahjo_requests_in_parallel(mock_send_request, non_expired_token):
+    from applications.management.commands.send_ahjo_requests import Command
+
+    applications = [DecidedApplicationFactory() for _ in range(5)]
+    for application in applications:
+        AhjoStatus.objects.create(
+            application=application,
+            status=AhjoStatusEnum.REQUEST_TO_OPEN_CASE_SENT,
+        )
+    failing_application = applications[0]
+
+    def send_request(application, ahjo_token):
+        if application == failing_application:
+            raise ValueError("invalid application")
+        return application, f"{{request-{application.application_number}}}"
+
+    mock_send_request.side_effect = send_request
+
+    out = StringIO()
+    command = Command(stdout=out)
+    command.run_requests(
+        Application.objects.filter(pk__in=[app.pk for app in applications]),
+        non_expired_token,
+        AhjoRequestType.OPEN_CASE,
+        workers=3,
+    )
+
+    assert mock_send_request.call_count == len(applications)
+    for application in applications[1:]:
+        assert (
+            application.ahjo_status.latest().ahjo_request_id
+            == f"request-{application.application_number}"
+        )
+    assert failing_application.ahjo_status.latest().ahjo_request_id is None
+
+    output = out.getvalue()
+    assert f"Sent {AhjoRequestType.OPEN_CASE} requests for 4 application(s)" in output
+    assert (
+        f"Failed to submit {AhjoRequestType.OPEN_CASE} 1 application(s):"
+        f" {failing_application.application_number}" in output
+    )
+    assert f"{AhjoRequestType.OPEN_CASE} request latencies in seconds: p50" in output
+
+
 @pytest.mark.django_db(transaction=True)
 class TestHandleSuccessfulRequest:
     @pytest.fixture(autouse=True)
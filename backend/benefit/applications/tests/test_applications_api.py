@@ -4,7 +4,7 @@ import os
 import re
 import tempfile
 import uuid
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from datetime import timezone as tz
 from decimal import Decimal
 from unittest import mock
@@ -21,6 +21,7 @@ from resilient_logger.models import ResilientLogEntry
 from rest_framework.reverse import reverse
 
 from applications.api.v1.application_views import BaseApplicationViewSet
+from applications.api.v1.pagination import SimplifiedListKeysetPagination
 from applications.api.v1.serializers.application import (
     ApplicantApplicationSerializer,
     HandlerApplicationSerializer,
@@ -42,7 +43,13 @@ from applications.enums import (
     PaySubsidyGranted,
 )
 from applications.management.commands.request_payslip import notify_applications
-from applications.models import Application, ApplicationLogEntry, Attachment, Employee
+from applications.models import (
+    Application,
+    ApplicationLogEntry,
+    ApplicationStatusTimestamps,
+    Attachment,
+    Employee,
+)
 from applications.tests.conftest import *  # noqa
 from applications.tests.factories import (
     ApplicationBatchFactory,
@@ -2718,6 +2725,108 @@ def test_handler_application_order_by(handler_api_client):
     assert expected_application_values == returned_application_values
 
 
+def _get_all_pages(client, url, params):
+    response = client.get(url, params)
+    assert response.status_code == 200
+    results = response.data["results"]
+    while response.data["next"]:
+        response = client.get(response.data["next"])
+        assert response.status_code == 200
+        results += response.data["results"]
+    return results
+
+
+@pytest.mark.parametrize("order_by", [None, "application_number", "-submitted_at"])
+@pytest.mark.django_db
+def test_handler_simplified_list_keyset_pagination(handler_api_client, order_by):
+    _create_random_applications()
+    url = reverse("v1:handler-application-simplified-application-list")
+    params = {"order_by": order_by} if order_by else {}
+
+    expected_ids = [elem["id"] for elem in handler_api_client.get(url, params).data]
+    paginated = _get_all_pages(handler_api_client, url, {**params, "page_size": 4})
+
+    assert [elem["id"] for elem in paginated] == expected_ids
+
+
+@pytest.mark.django_db
+def test_handler_simplified_list_keyset_pagination_by_employee_name(
+    handler_api_client,
+):
+    _create_random_applications()
+    # Share last name prefixes and full last names between the pages. The full names
+    # are unique, as the unpaginated list keeps the queryset order of equal names.
+    for index, employee in enumerate(Employee.objects.all()):
+        employee.last_name = ["Aalto", "Aaltonen", "Korhonen"][index % 3]
+        employee.first_name = ["Aino", "Eino", "Onni", "Ville", "Eeva"][index // 3]
+        employee.save()
+    url = reverse("v1:handler-application-simplified-application-list")
+
+    response = handler_api_client.get(url, {"order_by": "employee_name"})
+    expected_ids = [elem["id"] for elem in response.data]
+    paginated = _get_all_pages(
+        handler_api_client, url, {"order_by": "employee_name", "page_size": 4}
+    )
+
+    assert [elem["id"] for elem in paginated] == expected_ids
+    assert [
+        (elem["employee"]["last_name"].lower(), elem["employee"]["first_name"].lower())
+        for elem in paginated
+    ] == sorted(
+        (elem["employee"]["last_name"].lower(), elem["employee"]["first_name"].lower())
+        for elem in paginated
+    )
+
+
+@pytest.mark.django_db
+def test_handler_simplified_list_keyset_pagination_microseconds(handler_api_client):
+    # The submission timestamps differ only below one millisecond
+    submitted_at = datetime(2024, 1, 1, 12, 0, 0, 123000, tzinfo=tz.utc)
+    applications = ReceivedApplicationFactory.create_batch(3)
+    for index, application in enumerate(applications):
+        ApplicationStatusTimestamps.objects.filter(application=application).update(
+            submitted_at=submitted_at + timedelta(microseconds=index)
+        )
+    url = reverse("v1:handler-application-simplified-application-list")
+
+    paginated = _get_all_pages(
+        handler_api_client, url, {"order_by": "-submitted_at", "page_size": 1}
+    )
+
+    assert [elem["id"] for elem in paginated] == [
+        str(application.pk) for application in reversed(applications)
+    ]
+
+
+@pytest.mark.parametrize(
+    "order_by, cursor",
+    [
+        (None, "invalid"),
+        (None, [1]),
+        ("-submitted_at", ["not a timestamp", str(uuid.uuid4())]),
+        ("-submitted_at", [None, "not a uuid"]),
+        ("application_number", [{"number": 1}, str(uuid.uuid4())]),
+        ("employee_name", ["aa", "not a uuid"]),
+        ("employee_name", ["aa", str(uuid.uuid4()), "extra"]),
+    ],
+)
+@pytest.mark.django_db
+def test_handler_simplified_list_keyset_pagination_invalid_cursor(
+    handler_api_client, order_by, cursor
+):
+    if not isinstance(cursor, str):
+        cursor = SimplifiedListKeysetPagination.encode_cursor(cursor)
+    params = {"cursor": cursor}
+    if order_by:
+        params["order_by"] = order_by
+
+    response = handler_api_client.get(
+        reverse("v1:handler-application-simplified-application-list"), params
+    )
+
+    assert response.status_code == 404
+
+
 @pytest.mark.django_db
 def test_handler_application_exlude_batched(handler_api_client):
     batch = ApplicationBatchFactory()
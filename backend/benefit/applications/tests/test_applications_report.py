@@ -9,7 +9,9 @@ from zipfile import ZipFile
 
 import pytest
 from dateutil.relativedelta import relativedelta
-from django.http import HttpResponse, StreamingHttpResponse
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
@@ -19,12 +21,22 @@ from applications.enums import (
     BenefitType,
     PaySubsidyGranted,
 )
-from applications.models import AhjoSetting, ApplicationAlteration, ApplicationBatch
+from applications.models import (
+    AhjoSetting,
+    Application,
+    ApplicationAlteration,
+    ApplicationBatch,
+)
 from applications.services.applications_csv_report import (
+    ApplicationsCsvService,
     format_bool,
     format_datetime,
     get_application_origin_label,
 )
+from applications.services.applications_power_bi_csv_report import (
+    ApplicationsPowerBiCsvService,
+)
+from applications.services.talpa_csv_service import TalpaCsvService
 from applications.tests.common import (
     check_csv_cell_list_lines_generator,
     check_csv_string_lines_generator,
@@ -92,11 +104,10 @@ def _get_csv(
 ) -> List[List[str]]:
     response = handler_api_client.get(url)
     assert response.status_code == 200
+    assert isinstance(response, StreamingHttpResponse)
     if from_zip:
-        assert isinstance(response, HttpResponse)
-        csv_content: bytes = _get_csv_from_zip(response.content)
+        csv_content: bytes = _get_csv_from_zip(response.getvalue())
     else:
-        assert isinstance(response, StreamingHttpResponse)
         csv_content: bytes = response.getvalue()
     csv_lines = split_lines_at_semicolon(csv_content.decode("utf-8"))
     _test_csv(
@@ -111,7 +122,7 @@ def _get_csv(
 def _get_csv_pdf_zip(handler_api_client: APIClient, url: str) -> ZipFile:
     response = handler_api_client.get(url)
     assert response.status_code == 200
-    return ZipFile(io.BytesIO(response.content))
+    return ZipFile(io.BytesIO(response.getvalue()))
 
 
 def _create_applications_for_export():
@@ -1095,6 +1106,37 @@ def test_write_applications_csv_file(applications_csv_service, tmp_path):
         assert "äöÄÖtest" in contents
 
 
+@pytest.mark.parametrize(
+    "csv_service_class",
+    [ApplicationsCsvService, ApplicationsPowerBiCsvService, TalpaCsvService],
+)
+@pytest.mark.django_db
+def test_applications_csv_query_count_is_constant(settings, csv_service_class):
+    settings.PAYMENT_INSTALMENTS_ENABLED = True
+
+    def count_export_queries():
+        csv_service = csv_service_class(
+            Application.objects.all().order_by("application_number")
+        )
+        with CaptureQueriesContext(connection) as context:
+            csv_service.get_csv_string()
+        return len(context)
+
+    application = DecidedApplicationFactory()
+    DeMinimisAidFactory(application=application)
+    count_one = count_export_queries()
+
+    for _ in range(3):
+        application = DecidedApplicationFactory()
+        DeMinimisAidFactory(application=application)
+    count_four = count_export_queries()
+
+    assert count_one == count_four, (
+        f"N+1 query detected: {count_one} queries for 1 application, "
+        f"{count_four} queries for 4 applications."
+    )
+
+
 def test_applications_csv_pdf_zip_export_new_applications(handler_api_client):
     # create 1 rejected, 2 accepted and 1 application in handling
     _create_applications_for_export()
@@ -6,6 +6,12 @@ import pytest
 from django.utils import translation
 
 from applications.api.v1.serializers.application import ApplicantApplicationSerializer
+from applications.benefit_aggregation import (
+    FormerBenefitInfo,
+    FormerBenefitQuery,
+    get_former_benefit_info,
+    get_former_benefit_infos,
+)
 from applications.enums import BenefitType, PaySubsidyGranted
 from applications.models import Application
 from applications.tests.conftest import *  # noqa
@@ -417,3 +423,71 @@ def test_application_with_previously_accepted_applications_and_previous_benefits
             assert len(response.data["warnings"]["former_benefits"]) == 1
         else:
             assert "former_benefits" not in response.data["warnings"]
+
+
+@pytest.mark.django_db
+def test_get_former_benefit_infos_in_bulk(django_assert_num_queries):
+    """
+    Test that the former benefit info of many applications is aggregated with one
+    query of the accepted applications and one of the previous benefits, and equals
+    the info aggregated for each application alone
+    """
+    applications = DecidedApplicationFactory.create_batch(
+        4, pay_subsidy_granted=PaySubsidyGranted.NOT_GRANTED
+    )
+    # two applications of the same employee and company, and two other employees
+    applications[1].company = applications[0].company
+    applications[1].start_date = date(2021, 1, 1)
+    applications[1].end_date = date(2021, 6, 30)
+    applications[1].save()
+    applications[1].employee.social_security_number = applications[
+        0
+    ].employee.social_security_number
+    applications[1].employee.save()
+    for application in applications[::2]:
+        PreviousBenefitFactory(
+            company=application.company,
+            social_security_number=application.employee.social_security_number,
+            start_date=date(2020, 1, 1),
+            end_date=date(2020, 12, 31),
+        )
+
+    queries = [
+        FormerBenefitQuery(
+            company_id=application.company_id,
+            social_security_number=application.employee.social_security_number,
+            start_date=date(2021, 7, 1),
+            end_date=date(2021, 12, 31),
+            apprenticeship_program=apprenticeship_program,
+            application_id=application.pk,
+        )
+        for application in applications
+        for apprenticeship_program in [APPRENTICESHIP, NO_APPRENTICESHIP]
+    ]
+    # the employee info hasn't been entered yet
+    queries.append(
+        FormerBenefitQuery(
+            company_id=applications[0].company_id,
+            social_security_number="",
+            start_date=None,
+            end_date=None,
+        )
+    )
+
+    with django_assert_num_queries(2):
+        infos = get_former_benefit_infos(queries)
+
+    assert infos.keys() == set(queries)
+    for query in queries:
+        assert infos[query] == get_former_benefit_info(
+            Application.objects.get(pk=query.application_id)
+            if query.application_id
+            else None,
+            query.company_id,
+            query.social_security_number,
+            query.start_date,
+            query.end_date,
+            query.apprenticeship_program,
+        )
+    assert infos[queries[0]].months_used > infos[queries[4]].months_used
+    assert infos[queries[-1]] == FormerBenefitInfo()
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from applications.models import Application
+
+
+@pytest.mark.django_db
+def test_benchmark_csv_exports(tmp_path):
+    application_count = Application.objects.count()
+    output = tmp_path / "baseline.json"
+    call_command("benchmark_csv_exports", number=2, repeat=1, output=str(output))
+
+    # the seeded applications are rolled back
+    assert Application.objects.count() == application_count
+
+    with open(output, encoding="utf-8") as f:
+        results = json.load(f)
+    assert results["number"] == 2
+    assert set(results["exporters"]) == {
+        "applications_csv",
+        "power_bi_csv",
+        "talpa_csv",
+    }
+    for result in results["exporters"].values():
+        assert result["rows"] == 2
+        assert result["queries"] > 0
+        assert result["peak_memory_bytes"] > 0
+
+    # the same number of queries does not regress, but fewer queries in the
+    # baseline do
+    call_command(
+        "benchmark_csv_exports",
+        number=2,
+        repeat=1,
+        baseline=str(output),
+        tolerance=1,
+    )
+    for result in results["exporters"].values():
+        result["queries"] -= 1
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+    with pytest.raises(CommandError, match="queries"):
+        call_command(
+            "benchmark_csv_exports",
+            number=2,
+            repeat=1,
+            baseline=str(output),
+            tolerance=1,
+        )
@@ -0,0 +1,228 @@
+import io
+import time
+import uuid
+import zipfile
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from applications.enums import ApplicationStatus, ExportJobStatus, ExportJobType
+from applications.models import Application, ExportJob
+from applications.services.ahjo_integration import prepare_pdf_files
+from applications.services.export_jobs import export_job_heartbeat, run_export_job
+from applications.tests.factories import (
+    ApplicationBatchFactory,
+    DecidedApplicationFactory,
+)
+from helsinkibenefit.tests.conftest import *  # noqa
+from users.tests.factories import BFHandlerUserFactory
+
+export_jobs_url = reverse("v1:handler-export-job-list")
+
+
+def _export_job_url(job_id) -> str:
+    return reverse("v1:handler-export-job-detail", kwargs={"pk": job_id})
+
+
+@pytest.fixture
+def export_media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+# The worker closes the database connection between the jobs, so the tests that run
+# it cannot be wrapped in a transaction
+@pytest.mark.django_db(transaction=True)
+@patch(
+    "applications.services.ahjo_integration.pdfkit.from_string",
+    return_value=b"%PDF",
+)
+def test_batch_pdf_files_export_job(_, handler_api_client, export_media_root):
+    batch = ApplicationBatchFactory()
+
+    response = handler_api_client.post(
+        export_jobs_url,
+        {
+            "job_type": ExportJobType.BATCH_PDF_FILES,
+            "parameters": {"batch_id": str(batch.pk)},
+        },
+        format="json",
+    )
+    assert response.status_code == 201
+    job_id = response.data["id"]
+    assert response.data["status"] == ExportJobStatus.PENDING
+    assert response.data["download_url"] is None
+
+    response = handler_api_client.get(_export_job_url(job_id) + "download/")
+    assert response.status_code == 400
+
+    call_command("run_export_jobs", once=True)
+
+    response = handler_api_client.get(_export_job_url(job_id))
+    assert response.status_code == 200
+    assert response.data["status"] == ExportJobStatus.COMPLETED
+    assert response.data["result_filename"].endswith(".zip")
+
+    response = handler_api_client.get(response.data["download_url"])
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-zip-compressed"
+    archive = zipfile.ZipFile(io.BytesIO(response.getvalue()))
+    filenames = [info.filename for info in archive.infolist()]
+    assert len([name for name in filenames if name.endswith(".csv")]) == 1
+    assert [name for name in filenames if name.endswith(".pdf")] == [
+        file.filename
+        for file in prepare_pdf_files(batch.applications.order_by("application_number"))
+    ]
+
+
+@pytest.mark.django_db
+def test_export_job_parameters_are_validated(handler_api_client):
+    for parameters in [{}, {"batch_id": "invalid"}, {"batch_id": str(uuid.uuid4())}]:
+        response = handler_api_client.post(
+            export_jobs_url,
+            {"job_type": ExportJobType.BATCH_PDF_FILES, "parameters": parameters},
+            format="json",
+        )
+        assert response.status_code == 400
+        assert "parameters" in response.data
+
+    response = handler_api_client.post(
+        export_jobs_url,
+        {
+            "job_type": ExportJobType.NEW_REJECTED_APPLICATIONS_CSV_PDF,
+            "parameters": {"batch_id": "ignored"},
+        },
+        format="json",
+    )
+    assert response.status_code == 201
+    assert response.data["parameters"] == {}
+
+
+@pytest.mark.django_db
+def test_export_jobs_are_only_visible_to_their_creator(handler_api_client):
+    response = handler_api_client.post(
+        export_jobs_url,
+        {"job_type": ExportJobType.NEW_ACCEPTED_APPLICATIONS_CSV_PDF},
+        format="json",
+    )
+    assert response.status_code == 201
+
+    other_handler = BFHandlerUserFactory()
+    client = APIClient()
+    client.force_authenticate(other_handler)
+    assert client.get(_export_job_url(response.data["id"])).status_code == 404
+    assert client.get(export_jobs_url).data == []
+
+
+@pytest.mark.django_db(transaction=True)
+@patch(
+    "applications.services.ahjo_integration.pdfkit.from_string",
+    side_effect=OSError("No wkhtmltopdf executable found"),
+)
+def test_failed_export_job_is_rolled_back(_, export_media_root):
+    application = DecidedApplicationFactory(status=ApplicationStatus.ACCEPTED)
+    job = ExportJob.objects.create(
+        job_type=ExportJobType.NEW_ACCEPTED_APPLICATIONS_CSV_PDF
+    )
+
+    call_command("run_export_jobs", once=True)
+
+    job.refresh_from_db()
+    assert job.status == ExportJobStatus.FAILED
+    assert "wkhtmltopdf" in job.error
+    assert not job.result_file
+    # The application batch created for the export is rolled back
+    assert Application.objects.get(pk=application.pk).batch is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_export_jobs_requeues_stale_and_deletes_finished_jobs(export_media_root):
+    now = timezone.now()
+    stale_job = ExportJob.objects.create(
+        job_type=ExportJobType.APPLICATION_PDF,
+        parameters={"application_id": str(uuid.uuid4())},
+        status=ExportJobStatus.RUNNING,
+        started_at=now - timedelta(hours=2),
+        heartbeat_at=now - timedelta(minutes=10),
+        attempts=1,
+    )
+    # A long running job is not requeued while its worker sends heartbeats
+    running_job = ExportJob.objects.create(
+        job_type=ExportJobType.APPLICATION_PDF,
+        status=ExportJobStatus.RUNNING,
+        started_at=now - timedelta(hours=2),
+        heartbeat_at=now,
+        attempts=1,
+    )
+    # A job that was abandoned on every attempt is not retried anymore
+    abandoned_job = ExportJob.objects.create(
+        job_type=ExportJobType.APPLICATION_PDF,
+        status=ExportJobStatus.RUNNING,
+        started_at=now - timedelta(hours=2),
+        heartbeat_at=now - timedelta(minutes=10),
+        attempts=3,
+    )
+    finished_job = ExportJob.objects.create(
+        job_type=ExportJobType.NEW_REJECTED_APPLICATIONS_CSV_PDF,
+        status=ExportJobStatus.COMPLETED,
+        finished_at=now - timedelta(days=8),
+    )
+
+    call_command("run_export_jobs", once=True)
+
+    assert not ExportJob.objects.filter(pk=finished_job.pk).exists()
+    stale_job.refresh_from_db()
+    # The stale job is run again, and fails as the application does not exist
+    assert stale_job.status == ExportJobStatus.FAILED
+    assert stale_job.attempts == 2
+    assert stale_job.finished_at is not None
+    running_job.refresh_from_db()
+    assert running_job.status == ExportJobStatus.RUNNING
+    abandoned_job.refresh_from_db()
+    assert abandoned_job.status == ExportJobStatus.FAILED
+    assert "abandoned" in abandoned_job.error
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_job_heartbeat(export_media_root):
+    ExportJob.objects.create(
+        job_type=ExportJobType.APPLICATION_PDF,
+        parameters={"application_id": str(uuid.uuid4())},
+    )
+    job = ExportJob.objects.claim_next()
+    claimed_at = job.heartbeat_at
+    assert job.attempts == 1
+
+    # The heartbeat is committed while the export transaction is still open
+    with export_job_heartbeat(job, interval=0.01), transaction.atomic():
+        time.sleep(0.1)
+    assert ExportJob.objects.get(pk=job.pk).heartbeat_at > claimed_at
+
+
+@pytest.mark.django_db(transaction=True)
+@patch(
+    "applications.services.export_jobs.generate_handler_application_pdf",
+    return_value=b"%PDF",
+)
+def test_requeued_export_job_result_is_discarded(_, export_media_root):
+    application = DecidedApplicationFactory()
+    ExportJob.objects.create(
+        job_type=ExportJobType.APPLICATION_PDF,
+        parameters={"application_id": str(application.pk)},
+    )
+    job = ExportJob.objects.claim_next()
+    # Another worker claimed the job after it was considered abandoned
+    ExportJob.objects.filter(pk=job.pk).update(attempts=2)
+
+    run_export_job(job)
+
+    job.refresh_from_db()
+    assert job.status == ExportJobStatus.RUNNING
+    assert not job.result_file
+    assert not list((export_media_root / "export_jobs").iterdir())
@@ -1,17 +1,31 @@
+import decimal
+import re
+from datetime import date
 from unittest import mock
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+
 from applications.api.v1.serializers.application import HandlerApplicationSerializer
+from applications.enums import AhjoStatus as AhjoStatusEnum
 from applications.enums import (
     ApplicationOrigin,
     ApplicationStatus,
     BenefitType,
     PaySubsidyGranted,
 )
+from applications.models import AhjoStatus
+from applications.tests.factories import (
+    DecidedApplicationFactory,
+    RejectedApplicationFactory,
+)
 from applications.tests.test_applications_api import (
     add_attachments_to_application,
     get_handler_detail_url,
 )
 from calculator.models import Calculation, PaySubsidy
+from calculator.tests.factories import InstalmentFactory, PreviousBenefitFactory
 
 
 def test_application_submit_creates_calculation_and_two_paysubsidies(
@@ -70,3 +84,102 @@ def _submit_handler_application(api_client, data, application):
             get_handler_detail_url(application),
             data,
         )
+
+
+LOADED_FIELDS = [
+    "status_last_changed_at",
+    "latest_decision_comment",
+    "calculated_benefit_amount",
+    "ahjo_error",
+    "first_instalment",
+    "second_instalment",
+    "applicant_terms_in_effect",
+    "applicant_terms_approval_needed",
+    "former_benefit_info",
+    "warnings",
+]
+
+
+def _count_queries_of_tables(context, tables):
+    """Count the queries that select the rows of the given tables"""
+    return sum(
+        1
+        for query in context.captured_queries
+        if (match := re.match(r'SELECT (DISTINCT ON \(.*?\) )?"(\w+)"\.', query["sql"]))
+        and match.group(2) in tables
+    )
+
+
+def test_handler_application_list_loads_method_fields_in_batch(handler_api_client):
+    """
+    Test that the method fields of the listed applications load their relations
+    with one query per relation regardless of the number of applications, and
+    return the same values as when an application is serialized alone
+    """
+    applications = [
+        DecidedApplicationFactory(),
+        DecidedApplicationFactory(),
+        RejectedApplicationFactory(),
+    ]
+    for index, application in enumerate(applications):
+        application.log_entries.update(comment=f"decision comment {index}")
+        AhjoStatus.objects.create(
+            application=application,
+            status=AhjoStatusEnum.SUBMITTED_BUT_NOT_SENT_TO_AHJO,
+        )
+        AhjoStatus.objects.create(
+            application=application,
+            status=AhjoStatusEnum.DECISION_PROPOSAL_SENT,
+            error_from_ahjo=[{"message": f"error {index}"}],
+        )
+        InstalmentFactory(
+            calculation=application.calculation,
+            instalment_number=1,
+            amount=decimal.Decimal("1000") * (index + 1),
+            due_date=date.today(),
+        )
+        # the benefits of the same employee and company are the former benefits of
+        # each other
+        application.company = applications[0].company
+        application.save()
+        application.employee.social_security_number = applications[
+            0
+        ].employee.social_security_number
+        application.employee.save()
+    PreviousBenefitFactory(
+        company=applications[0].company,
+        social_security_number=applications[0].employee.social_security_number,
+        start_date=applications[0].start_date,
+        end_date=applications[0].end_date,
+    )
+    loaded_tables = [
+        "bf_applications_applicationlogentry",
+        "bf_applications_ahjo_status",
+        "bf_calculator_instalment",
+        "bf_calculator_previousbenefit",
+    ]
+
+    with CaptureQueriesContext(connection) as context:
+        response = handler_api_client.get(reverse("v1:handler-application-list"))
+    assert response.status_code == 200
+    assert len(response.data) == len(applications)
+    assert _count_queries_of_tables(context, loaded_tables) == len(loaded_tables)
+
+    for data in response.data:
+        detail_response = handler_api_client.get(
+            reverse("v1:handler-application-detail", kwargs={"pk": data["id"]})
+        )
+        for field in LOADED_FIELDS:
+            assert data[field] == detail_response.data[field], field
+        assert data["latest_decision_comment"].startswith("decision comment")
+        assert data["ahjo_error"]["error_from_ahjo"][0]["message"].startswith("error")
+        assert data["first_instalment"] is not None
+        assert data["second_instalment"] is None
+
+    with CaptureQueriesContext(connection) as context:
+        response = handler_api_client.get(
+            reverse("v1:handler-application-simplified-application-list")
+        )
+    assert response.status_code == 200
+    assert len(response.data) == len(applications)
+    assert _count_queries_of_tables(context, loaded_tables) <= len(loaded_tables)
@@ -1,10 +1,18 @@
-from datetime import date
+from datetime import date, datetime, timezone
 
 import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
 
-from applications.enums import AhjoDecision, ApplicationBatchStatus
+from applications.enums import AhjoDecision, ApplicationBatchStatus, ApplicationStatus
 from applications.exceptions import BatchCompletionRequiredFieldsError
-from applications.models import Application, ApplicationBatch, Employee
+from applications.models import (
+    Application,
+    ApplicationBatch,
+    ApplicationLogEntry,
+    ApplicationStatusTimestamps,
+    Employee,
+)
 from applications.tests.factories import BaseApplicationBatchFactory
 from applications.tests.test_application_batch_api import (
     fill_as_valid_batch_completion_and_save,
@@ -194,3 +202,60 @@ def test_encrypted_searchable_social_security_number(employee):
     assert employee.social_security_number == ""
     assert Employee.objects.filter(social_security_number=initial_ssn).count() == 0
     assert Employee.objects.filter(social_security_number="").count() == 1
+
+
+@pytest.mark.django_db
+def test_application_status_timestamps(application):
+    first = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    second = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+    log_entry = ApplicationLogEntry.objects.create(
+        application=application,
+        from_status=ApplicationStatus.DRAFT,
+        to_status=ApplicationStatus.RECEIVED,
+    )
+    timestamps = Application.objects.get(pk=application.pk)
+    assert timestamps.submitted_at == log_entry.created_at
+    assert timestamps.handled_at is None
+
+    ApplicationLogEntry.objects.create(
+        application=application,
+        from_status=ApplicationStatus.HANDLING,
+        to_status=ApplicationStatus.ACCEPTED,
+    )
+    application.log_entries.filter(to_status=ApplicationStatus.RECEIVED).update(
+        created_at=first
+    )
+    application.log_entries.filter(to_status=ApplicationStatus.ACCEPTED).update(
+        created_at=second
+    )
+    timestamps = Application.objects.get(pk=application.pk)
+    assert timestamps.submitted_at == first
+    assert timestamps.handled_at == second
+
+    application.log_entries.filter(to_status=ApplicationStatus.ACCEPTED).delete()
+    assert Application.objects.get(pk=application.pk).handled_at is None
+
+    log_entry.delete()
+    assert Application.objects.get(pk=application.pk).submitted_at is None
+
+
+@pytest.mark.django_db
+def test_application_status_timestamps_command(application):
+    ApplicationLogEntry.objects.create(
+        application=application,
+        from_status=ApplicationStatus.DRAFT,
+        to_status=ApplicationStatus.RECEIVED,
+    )
+    call_command("application_status_timestamps", check=True)
+
+    ApplicationStatusTimestamps.objects.all().delete()
+    with pytest.raises(CommandError):
+        call_command("application_status_timestamps", check=True)
+
+    call_command("application_status_timestamps")
+    call_command("application_status_timestamps", check=True)
+    assert (
+        Application.objects.get(pk=application.pk).submitted_at
+        == application.log_entries.get().created_at
+    )
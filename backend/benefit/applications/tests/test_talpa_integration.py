@@ -3,6 +3,8 @@ from datetime import timedelta
 
 import pytest
 from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from resilient_logger.models import ResilientLogEntry
@@ -18,6 +20,10 @@ from applications.tests.common import (
     check_csv_string_lines_generator,
 )
 from applications.tests.conftest import split_lines_at_semicolon
+from applications.tests.factories import (
+    ApplicationBatchFactory,
+    DecidedApplicationFactory,
+)
 from calculator.enums import InstalmentStatus
 from calculator.models import Instalment
 
@@ -465,3 +471,102 @@ def test_talpa_csv_applications_query(
         assert applications_for_csv.count() == len(multiple_decided_applications)
     else:
         assert applications_for_csv.count() == 0
+
+
+def _create_applications_with_due_instalment(batch, number_of_applications):
+    applications = DecidedApplicationFactory.create_batch(
+        number_of_applications, batch=batch
+    )
+    for application in applications:
+        application.calculation.instalments.all().delete()
+        Instalment.objects.create(
+            calculation=application.calculation,
+            amount=decimal.Decimal("123.45"),
+            instalment_number=1,
+            status=InstalmentStatus.ACCEPTED,
+            due_date=timezone.now().date(),
+        )
+        Instalment.objects.create(
+            calculation=application.calculation,
+            amount=decimal.Decimal("123.45"),
+            instalment_number=2,
+            status=InstalmentStatus.WAITING,
+            due_date=timezone.now().date() + timedelta(days=181),
+        )
+    return applications
+
+
+@pytest.mark.parametrize("instalments_enabled", [False, True])
+@pytest.mark.parametrize("callback_status", ["Success", "Failure"])
+@pytest.mark.django_db
+def test_talpa_callback_processes_applications_in_bulk(
+    talpa_client, settings, instalments_enabled, callback_status
+):
+    """
+    Test that a callback is processed with the same number of queries regardless
+    of the number of applications, and that every application, its due instalment
+    and its batch are updated and audit logged
+    """
+    settings.TALPA_CALLBACK_ENABLED = True
+    settings.PAYMENT_INSTALMENTS_ENABLED = instalments_enabled
+    if callback_status == "Success":
+        talpa_status = ApplicationTalpaStatus.SUCCESSFULLY_SENT_TO_TALPA
+        batch_status = ApplicationBatchStatus.SENT_TO_TALPA
+        instalment_status = InstalmentStatus.PAID
+        if instalments_enabled:
+            talpa_status = ApplicationTalpaStatus.PARTIALLY_SENT_TO_TALPA
+            batch_status = ApplicationBatchStatus.PARTIALLY_SENT_TO_TALPA
+    else:
+        talpa_status = ApplicationTalpaStatus.REJECTED_BY_TALPA
+        batch_status = ApplicationBatchStatus.REJECTED_BY_TALPA
+        instalment_status = InstalmentStatus.ERROR_IN_TALPA
+
+    query_counts = []
+    for number_of_applications in [1, 4]:
+        batch = ApplicationBatchFactory()
+        applications = _create_applications_with_due_instalment(
+            batch, number_of_applications
+        )
+        application_numbers = [
+            application.application_number for application in applications
+        ]
+        log_entry_count = ResilientLogEntry.objects.count()
+
+        with CaptureQueriesContext(connection) as context:
+            response = talpa_client.post(
+                reverse("talpa_callback_url"),
+                data={
+                    "status": callback_status,
+                    "successful_applications": (
+                        application_numbers if callback_status == "Success" else []
+                    ),
+                    "failed_applications": (
+                        application_numbers if callback_status == "Failure" else []
+                    ),
+                },
+            )
+        assert response.status_code == 200
+        query_counts.append(len(context.captured_queries))
+
+        batch.refresh_from_db()
+        assert batch.status == batch_status
+        for application in applications:
+            application.refresh_from_db()
+            assert application.talpa_status == talpa_status
+            assert application.archived is (callback_status == "Success")
+            # the history records are created as when saving the applications
+            assert application.history.latest().talpa_status == talpa_status
+            instalment = application.calculation.instalments.get(instalment_number=1)
+            if instalments_enabled:
+                assert instalment.status == instalment_status
+                if callback_status == "Success":
+                    assert instalment.amount_paid == decimal.Decimal("123.45")
+            else:
+                assert instalment.status == InstalmentStatus.ACCEPTED
+        # the instalment callbacks log the status of the instalment and the status
+        # of the application
+        assert ResilientLogEntry.objects.count() - log_entry_count == (
+            number_of_applications * (2 if instalments_enabled else 1)
+        )
+
+    assert query_counts[0] == query_counts[1]
@@ -703,14 +703,26 @@ class TotalRowMixin:
     @property
     def monthly_amount(self):
         # For each total row, there needs to be a row that defines the monthly amount
-        row = (
-            self.calculation.rows.filter(
-                ordering__lt=self.ordering,
-                row_type=RowType.HELSINKI_BENEFIT_MONTHLY_EUR,
+        if "rows" in getattr(self.calculation, "_prefetched_objects_cache", {}):
+            row = max(
+                (
+                    row
+                    for row in self.calculation.rows.all()
+                    if row.ordering < self.ordering
+                    and row.row_type == RowType.HELSINKI_BENEFIT_MONTHLY_EUR
+                ),
+                key=lambda row: row.ordering,
+                default=None,
+            )
+        else:
+            row = (
+                self.calculation.rows.filter(
+                    ordering__lt=self.ordering,
+                    row_type=RowType.HELSINKI_BENEFIT_MONTHLY_EUR,
+                )
+                .order_by("-ordering")
+                .first()
             )
-            .order_by("-ordering")
-            .first()
-        )
         assert row is not None, (
             "Application logic error - misconstructed application rows"
         )
@@ -893,10 +905,19 @@ class Instalment(UUIDModel, TimeStampedModel):
         if self.instalment_number == 1:
             return max(self.amount, 0)
 
-        alteration_set = self.calculation.application.alteration_set.filter(
-            state=ApplicationAlterationState.HANDLED,
-        )
-        if alteration_set.count() == 0:
+        application = self.calculation.application
+        if "alteration_set" in getattr(application, "_prefetched_objects_cache", {}):
+            # the alterations were prefetched, e.g. for listing the applications
+            alteration_set = [
+                alteration
+                for alteration in application.alteration_set.all()
+                if alteration.state == ApplicationAlterationState.HANDLED
+            ]
+        else:
+            alteration_set = application.alteration_set.filter(
+                state=ApplicationAlterationState.HANDLED,
+            )
+        if len(alteration_set) == 0:
             return max(self.amount, 0)
 
         return max(
@@ -23,6 +23,8 @@ def setup_test_environment(settings):
     settings.LANGUAGE_CODE = "fi"
     settings.DISABLE_TOS_APPROVAL_CHECK = False
     settings.NEXT_PUBLIC_MOCK_FLAG = False
+    settings.EXPORT_PDF_CACHE_ENABLED = False
+    settings.TERMS_CACHE_TIMEOUT = 0
     activate("en")
 
 
@@ -182,6 +182,12 @@ env = environ.Env(
     AHJO_TEST_USER_LAST_NAME=(str, ""),
     AHJO_TEST_USER_AD_USERNAME=(str, ""),
     AHJO_REQUEST_TIMEOUT=(int, 60),
+    AHJO_REQUEST_WORKERS=(int, 1),
+    AHJO_REQUESTS_PER_SECOND=(float, 10.0),
+    EXPORT_PDF_CACHE_ENABLED=(bool, False),
+    EXPORT_PDF_CACHE_TIMEOUT=(int, 86400),
+    EXPORT_PDF_WORKERS=(int, 4),
+    TERMS_CACHE_TIMEOUT=(int, 3600),
     ENABLE_CLAMAV=(bool, False),
     CLAMAV_URL=(str, ""),
     ENABLE_AHJO_AUTOMATION=(bool, False),
@@ -218,6 +224,11 @@ if DEBUG and not SECRET_KEY:
 ENCRYPTION_KEY = env.str("ENCRYPTION_KEY")
 SOCIAL_SECURITY_NUMBER_HASH_KEY = env.str("SOCIAL_SECURITY_NUMBER_HASH_KEY")
 
+# The keys of the employee name search index and the name sort keys of the
+# application lists. The name sort keys keep the order of the first two letters of
+# the last names, so those letters can be recovered from the database by frequency
+# analysis, with or without the key. Run rebuild_name_search_index after changing
+# either key.
 EMPLOYEE_FIRST_NAME_HASH_KEY = env.str("EMPLOYEE_FIRST_NAME_HASH_KEY")
 EMPLOYEE_LAST_NAME_HASH_KEY = env.str("EMPLOYEE_LAST_NAME_HASH_KEY")
 
@@ -672,6 +683,23 @@ AHJO_TEST_USER_FIRST_NAME = env("AHJO_TEST_USER_FIRST_NAME")
 AHJO_TEST_USER_LAST_NAME = env("AHJO_TEST_USER_LAST_NAME")
 AHJO_TEST_USER_AD_USERNAME = env("AHJO_TEST_USER_AD_USERNAME")
 AHJO_REQUEST_TIMEOUT = env("AHJO_REQUEST_TIMEOUT")
+# Number of parallel workers used by the send_ahjo_requests command
+AHJO_REQUEST_WORKERS = env.int("AHJO_REQUEST_WORKERS")
+# Maximum rate of requests sent to each Ahjo host by the send_ahjo_requests command,
+# 0 disables the limit
+AHJO_REQUESTS_PER_SECOND = env.float("AHJO_REQUESTS_PER_SECOND")
+# Store the exported decision PDFs in the file storage keyed by their content, so
+# that unchanged PDFs are not converted again on every download. The PDFs show
+# employee names, so they are converted again after EXPORT_PDF_CACHE_TIMEOUT seconds,
+# deleted along with their applications and cleaned up by the clear_pdf_cache command.
+EXPORT_PDF_CACHE_ENABLED = env.bool("EXPORT_PDF_CACHE_ENABLED")
+EXPORT_PDF_CACHE_TIMEOUT = env.int("EXPORT_PDF_CACHE_TIMEOUT")
+# Number of PDFs converted in parallel when exporting applications
+EXPORT_PDF_WORKERS = env.int("EXPORT_PDF_WORKERS")
+# Seconds the terms in effect and their serialized form are cached, 0 disables the
+# cache. Saving terms or their consents invalidates the cache, so the terms are only
+# cached if CACHE_URL points to a cache shared by all the processes, not locmemcache.
+TERMS_CACHE_TIMEOUT = env.int("TERMS_CACHE_TIMEOUT")
 
 ENABLE_CLAMAV = env.bool("ENABLE_CLAMAV")
 CLAMAV_URL = env.str("CLAMAV_URL")
@@ -11,7 +11,11 @@ from drf_spectacular.views import (
 )
 from rest_framework_nested import routers
 
-from applications.api.v1 import application_batch_views, application_views
+from applications.api.v1 import (
+    application_batch_views,
+    application_views,
+    export_job_views,
+)
 from applications.api.v1.ahjo_decision_views import (
     DecisionProposalDraftUpdate,
     DecisionProposalTemplateSectionList,
@@ -78,6 +82,11 @@ handler_app_router.register(
 handler_app_router.register(r"notes", HandlerNoteViewSet, basename="handler-note")
 
 router.register(r"applicationbatches", application_batch_views.ApplicationBatchViewSet)
+router.register(
+    r"handlerexportjobs",
+    export_job_views.HandlerExportJobViewSet,
+    basename="handler-export-job",
+)
 router.register(r"previousbenefits", calculator_views.PreviousBenefitViewSet)
 
 router.register(
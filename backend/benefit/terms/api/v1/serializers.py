@@ -113,6 +113,23 @@ class TermsSerializer(serializers.ModelSerializer):
         ]
 
 
+def get_serialized_terms_in_effect(terms_type, request=None):
+    """
+    Get the serialized terms in effect of the given type. The output is cached along
+    with the terms, separately for each host the PDF download URLs are built for.
+    """
+    base_url = request.build_absolute_uri("/") if request else ""
+    return Terms.objects.get_cached_in_effect(
+        terms_type,
+        f"serialized:{base_url}",
+        lambda terms: (
+            dict(TermsSerializer(terms, context={"request": request}).data)
+            if terms
+            else None
+        ),
+    )
+
+
 class ApplicantTermsApprovalSerializer(serializers.ModelSerializer):
     selected_applicant_consents = ApplicantConsentSerializer(
         many=True, help_text="Applicant consents that were selected"
@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class AppConfig(AppConfig):
     name = "terms"
+
+    def ready(self):
+        from terms import signals
+        from terms.models import ApplicantConsent, Terms
+
+        for model in [Terms, ApplicantConsent]:
+            post_save.connect(signals.invalidate_terms_cache, sender=model)
+            post_delete.connect(signals.invalidate_terms_cache, sender=model)
@@ -1,6 +1,11 @@
+import uuid
 from datetime import date
+from typing import Callable, Dict, Iterable
 
 from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.forms import ValidationError
@@ -17,14 +22,79 @@ from users.models import User
 
 
 class TermsManager(models.Manager):
-    def get_terms_in_effect(self, terms_type):
+    CACHE_KEY_PREFIX = "terms_in_effect"
+    CACHE_VERSION_KEY = f"{CACHE_KEY_PREFIX}_version"
+    # The cache is invalidated by the process that saves the terms, so it can't be
+    # used with a cache of its own in each process
+    PROCESS_LOCAL_CACHE_BACKENDS = (LocMemCache, DummyCache)
+
+    def _query_terms_in_effect(self, terms_type, today):
         return (
             self.get_queryset()
-            .filter(terms_type=terms_type, effective_from__lte=date.today())
+            .filter(terms_type=terms_type, effective_from__lte=today)
             .order_by("-effective_from")
             .first()
         )  # unique constraint in ensures there's at most only one
 
+    def _get_cache_version(self):
+        version = cache.get(self.CACHE_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.add(self.CACHE_VERSION_KEY, version, None)
+            version = cache.get(self.CACHE_VERSION_KEY, version)
+        return version
+
+    def invalidate_cache(self):
+        """
+        Invalidate the cached terms in effect of all the types by starting a new cache
+        version, the entries of the earlier versions expire by themselves
+        """
+        if self.is_cache_enabled():
+            cache.set(self.CACHE_VERSION_KEY, uuid.uuid4().hex, None)
+
+    def is_cache_enabled(self) -> bool:
+        return bool(settings.TERMS_CACHE_TIMEOUT) and not isinstance(
+            caches[DEFAULT_CACHE_ALIAS], self.PROCESS_LOCAL_CACHE_BACKENDS
+        )
+
+    def get_cached_in_effect(self, terms_type, name: str, compute: Callable):
+        """
+        Get a value computed from the terms in effect of the given type, cached until
+        the terms change or the next terms of the type come into effect. The value is
+        only cached if TERMS_CACHE_TIMEOUT is set and the cache is shared by all the
+        processes.
+
+        :param name: Name of the value, to separate the values computed from the same
+            terms in the cache.
+        :param compute: Function computing the value from the terms in effect, or from
+            None if there are no terms in effect.
+        """
+        today = date.today()
+        if not self.is_cache_enabled():
+            return compute(self._query_terms_in_effect(terms_type, today))
+
+        key = f"{self.CACHE_KEY_PREFIX}:{self._get_cache_version()}:{terms_type}:{name}"
+        entry = cache.get(key)
+        if entry is None or (entry["valid_until"] and entry["valid_until"] <= today):
+            # The day the next terms come into effect is looked up ahead, so that
+            # the cached value is not used after it
+            valid_until = (
+                self.get_queryset()
+                .filter(terms_type=terms_type, effective_from__gt=today)
+                .order_by("effective_from")
+                .values_list("effective_from", flat=True)
+                .first()
+            )
+            entry = {
+                "value": compute(self._query_terms_in_effect(terms_type, today)),
+                "valid_until": valid_until,
+            }
+            cache.set(key, entry, settings.TERMS_CACHE_TIMEOUT)
+        return entry["value"]
+
+    def get_terms_in_effect(self, terms_type):
+        return self.get_cached_in_effect(terms_type, "terms", lambda terms: terms)
+
 
 class Terms(UUIDModel, TimeStampedModel):
     objects = TermsManager()
@@ -251,6 +321,15 @@ class ApplicantTermsApproval(AbstractTermsApproval):
             f" {self.approved_at}"
         )
 
+    @staticmethod
+    def get_terms_type(application_origin) -> TermsType:
+        """Get the type of the terms the applicant approves when submitting"""
+        return (
+            TermsType.HANDLER_TERMS
+            if application_origin == ApplicationOrigin.HANDLER
+            else TermsType.APPLICANT_TERMS
+        )
+
     @staticmethod
     def terms_approval_needed(application):
         try:
@@ -258,16 +337,42 @@ class ApplicantTermsApproval(AbstractTermsApproval):
         except ObjectDoesNotExist:
             return True
         else:
-            terms_type = (
-                TermsType.HANDLER_TERMS
-                if application.application_origin == ApplicationOrigin.HANDLER
-                else TermsType.APPLICANT_TERMS
+            terms_type = ApplicantTermsApproval.get_terms_type(
+                application.application_origin
             )
             return (
                 Terms.objects.get_terms_in_effect(terms_type)
                 != application.applicant_terms_approval.terms
             )
 
+    @staticmethod
+    def terms_approvals_needed(application_ids: Iterable) -> Dict[object, bool]:
+        """
+        Check with one query whether the terms in effect need to be approved for each
+        of the applications, as terms_approval_needed does for one application
+        """
+        terms_in_effect = {}
+        approvals_needed = {}
+        for (
+            application_id,
+            application_origin,
+            approved_terms_id,
+        ) in Application.objects.filter(pk__in=application_ids).values_list(
+            "pk", "application_origin", "applicant_terms_approval__terms_id"
+        ):
+            terms_type = ApplicantTermsApproval.get_terms_type(application_origin)
+            if terms_type not in terms_in_effect:
+                terms_in_effect[terms_type] = Terms.objects.get_terms_in_effect(
+                    terms_type
+                )
+            terms = terms_in_effect[terms_type]
+            approvals_needed[application_id] = (
+                approved_terms_id is None
+                or terms is None
+                or terms.pk != approved_terms_id
+            )
+        return approvals_needed
+
     class Meta:
         db_table = "bf_applicanttermsapproval"
         verbose_name = _("applicant terms approval")
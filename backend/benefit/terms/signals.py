@@ -0,0 +1,9 @@
+from terms.models import Terms
+
+
+def invalidate_terms_cache(sender, **kwargs):
+    """
+    Invalidate the cached terms in effect when terms or their applicant consents are
+    saved or deleted
+    """
+    Terms.objects.invalidate_cache()
@@ -1,14 +1,41 @@
 from datetime import date, timedelta
 
 import pytest
+from django.core.cache import cache
 from django.db import transaction
 from django.db.utils import IntegrityError
+from freezegun import freeze_time
 
+from applications.enums import ApplicationOrigin
+from applications.tests.factories import ApplicationFactory
 from helsinkibenefit.tests.conftest import *  # noqa
+from terms.api.v1.serializers import TermsSerializer, get_serialized_terms_in_effect
 from terms.enums import TermsType
-from terms.models import Terms
+from terms.models import ApplicantTermsApproval, Terms
 from terms.tests.conftest import *  # noqa
-from terms.tests.factories import TermsFactory
+from terms.tests.factories import (
+    ApplicantConsentFactory,
+    ApplicantTermsApprovalFactory,
+    TermsFactory,
+)
+
+
+def use_shared_cache(settings, tmp_path, terms_cache_timeout=3600):
+    # The file based cache is shared by the processes, unlike the local memory cache
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "cache"),
+        }
+    }
+    settings.TERMS_CACHE_TIMEOUT = terms_cache_timeout
+
+
+@pytest.fixture
+def terms_cache(settings, tmp_path):
+    use_shared_cache(settings, tmp_path)
+    yield
+    cache.clear()
 
 
 @pytest.mark.django_db
@@ -50,8 +77,11 @@ def test_terms_duplicate_effective_from():
     TermsFactory(effective_from=date.today(), terms_type=TermsType.TERMS_OF_SERVICE)
 
 
+@pytest.mark.parametrize("terms_cache_timeout", [0, 3600])
 @pytest.mark.django_db
-def test_current_terms(applicant_terms):
+def test_current_terms(settings, tmp_path, applicant_terms, terms_cache_timeout):
+    use_shared_cache(settings, tmp_path, terms_cache_timeout)
+
     # effective_from is None
     applicant_terms.effective_from = None
     applicant_terms.save()
@@ -96,3 +126,161 @@ def test_current_terms(applicant_terms):
     assert (
         Terms.objects.get_terms_in_effect(TermsType.APPLICANT_TERMS) == applicant_terms
     )
+
+
+@pytest.mark.django_db
+def test_terms_in_effect_cached(
+    terms_cache, applicant_terms, django_assert_num_queries
+):
+    assert (
+        Terms.objects.get_terms_in_effect(TermsType.APPLICANT_TERMS) == applicant_terms
+    )
+    with django_assert_num_queries(0):
+        assert (
+            Terms.objects.get_terms_in_effect(TermsType.APPLICANT_TERMS)
+            == applicant_terms
+        )
+
+    # deleting the terms invalidates the cache
+    applicant_terms.delete()
+    assert Terms.objects.get_terms_in_effect(TermsType.APPLICANT_TERMS) is None
+
+
+@pytest.mark.parametrize(
+    "cache_backend",
+    [
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    ],
+)
+@pytest.mark.django_db
+def test_terms_in_effect_not_cached_in_process_local_cache(
+    settings, applicant_terms, cache_backend, django_assert_num_queries
+):
+    # Saving the terms in one process could not invalidate the cache of the others
+    settings.CACHES = {"default": {"BACKEND": cache_backend}}
+    settings.TERMS_CACHE_TIMEOUT = 3600
+    assert not Terms.objects.is_cache_enabled()
+
+    Terms.objects.get_terms_in_effect(TermsType.APPLICANT_TERMS)
+    with django_assert_num_queries(1):
+        assert (
+            Terms.objects.get_terms_in_effect(TermsType.APPLICANT_TERMS)
+            == applicant_terms
+        )
+    assert not cache.get(Terms.objects.CACHE_VERSION_KEY)
+
+
+@pytest.mark.django_db
+def test_terms_in_effect_cached_until_next_terms_come_into_effect(terms_cache):
+    today = date.today()
+    current_terms = TermsFactory(
+        effective_from=today, terms_type=TermsType.APPLICANT_TERMS
+    )
+    next_terms = TermsFactory(
+        effective_from=today + timedelta(days=2),
+        terms_type=TermsType.APPLICANT_TERMS,
+    )
+    assert Terms.objects.get_terms_in_effect(TermsType.APPLICANT_TERMS) == current_terms
+
+    with freeze_time(today + timedelta(days=1)):
+        assert (
+            Terms.objects.get_terms_in_effect(TermsType.APPLICANT_TERMS)
+            == current_terms
+        )
+    with freeze_time(today + timedelta(days=2)):
+        assert (
+            Terms.objects.get_terms_in_effect(TermsType.APPLICANT_TERMS) == next_terms
+        )
+
+
+@pytest.mark.django_db
+def test_serialized_terms_in_effect_cached(
+    terms_cache, rf, applicant_terms, django_assert_num_queries
+):
+    request = rf.get("/")
+    expected = TermsSerializer(applicant_terms, context={"request": request}).data
+    assert (
+        get_serialized_terms_in_effect(TermsType.APPLICANT_TERMS, request) == expected
+    )
+    with django_assert_num_queries(0):
+        assert (
+            get_serialized_terms_in_effect(TermsType.APPLICANT_TERMS, request)
+            == expected
+        )
+    assert expected["terms_pdf_fi"].startswith("http://testserver/")
+
+    # saving the consents of the terms invalidates the cache
+    ApplicantConsentFactory(terms=applicant_terms)
+    assert (
+        len(
+            get_serialized_terms_in_effect(TermsType.APPLICANT_TERMS, request)[
+                "applicant_consents"
+            ]
+        )
+        == 3
+    )
+
+    # the download URLs are built for the host of the request
+    other_host_request = rf.get("/", HTTP_HOST="example.org")
+    assert get_serialized_terms_in_effect(
+        TermsType.APPLICANT_TERMS, other_host_request
+    )["terms_pdf_fi"].startswith("http://example.org/")
+
+    assert get_serialized_terms_in_effect(TermsType.HANDLER_TERMS, request) is None
+
+
+@pytest.mark.parametrize("terms_cache_timeout", [0, 3600])
+@pytest.mark.django_db
+def test_terms_approvals_needed(
+    settings,
+    tmp_path,
+    applicant_terms,
+    terms_cache_timeout,
+    django_assert_max_num_queries,
+):
+    use_shared_cache(settings, tmp_path, terms_cache_timeout)
+    handler_terms = TermsFactory(
+        effective_from=date.today(), terms_type=TermsType.HANDLER_TERMS
+    )
+    old_terms = TermsFactory(
+        effective_from=date.today() - timedelta(days=1),
+        terms_type=TermsType.APPLICANT_TERMS,
+    )
+    applications = [
+        ApplicationFactory(),
+        ApplicantTermsApprovalFactory(terms=applicant_terms).application,
+        ApplicantTermsApprovalFactory(terms=old_terms).application,
+        ApplicantTermsApprovalFactory(
+            terms=handler_terms,
+            application__application_origin=ApplicationOrigin.HANDLER,
+        ).application,
+        ApplicantTermsApprovalFactory(
+            terms=applicant_terms,
+            application__application_origin=ApplicationOrigin.HANDLER,
+        ).application,
+    ]
+
+    if terms_cache_timeout:
+        # the terms in effect are read from the cache
+        for terms_type in [TermsType.APPLICANT_TERMS, TermsType.HANDLER_TERMS]:
+            Terms.objects.get_terms_in_effect(terms_type)
+        max_num_queries = 1
+    else:
+        # one query for the approvals and one for each terms type in effect
+        max_num_queries = 3
+    with django_assert_max_num_queries(max_num_queries):
+        approvals_needed = ApplicantTermsApproval.terms_approvals_needed(
+            [application.pk for application in applications]
+        )
+    assert approvals_needed == {
+        application.pk: ApplicantTermsApproval.terms_approval_needed(application)
+        for application in applications
+    }
+    assert [approvals_needed[application.pk] for application in applications] == [
+        True,
+        False,
+        True,
+        False,
+        True,
+    ]
@@ -2,9 +2,13 @@ from django.conf import settings
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from terms.api.v1.serializers import TermsOfServiceApprovalSerializer, TermsSerializer
+from terms.api.v1.serializers import (
+    TermsOfServiceApprovalSerializer,
+    TermsSerializer,
+    get_serialized_terms_in_effect,
+)
 from terms.enums import TermsType
-from terms.models import Terms, TermsOfServiceApproval
+from terms.models import TermsOfServiceApproval
 from users.models import User
 from users.utils import get_company_from_request
 
@@ -57,11 +61,9 @@ class UserSerializer(serializers.ModelSerializer):
             if request and request.query_params
             else None
         )
-        terms = Terms.objects.get_terms_in_effect(TermsType.TERMS_OF_SERVICE)
-        if terms and include_terms:
-            # If given the request in context, DRF will output the URL for FileFields
-            context = {"request": self.context.get("request")}
-            return TermsSerializer(terms, context=context).data
+        if include_terms:
+            # If given the request, the URLs of the FileFields are included
+            return get_serialized_terms_in_effect(TermsType.TERMS_OF_SERVICE, request)
         else:
             return None
 
@@ -36,6 +36,7 @@ from applications.models import (
 )
 from applications.services import (
     AuditAccessLogService,
+    EmailBatchSender,
     EmailTemplateService,
     SchoolService,
 )
@@ -216,6 +217,18 @@ class SchoolAdmin(AuditlogAdminViewAccessLogMixin, admin.ModelAdmin):
         "modified_at",
     ]
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        SchoolService.clear_school_list_cache()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        SchoolService.clear_school_list_cache()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        SchoolService.clear_school_list_cache()
+
     def get_urls(self):
         urls = super().get_urls()
         my_urls = [
@@ -787,13 +800,15 @@ class YouthSummerVoucherAdmin(
     def resend_voucher(self, request, queryset):
         sent_count = 0
         failed_count = 0
-        for youth_summer_voucher in queryset:
-            if youth_summer_voucher.send_youth_summer_voucher_email(
-                language=youth_summer_voucher.youth_application.language
-            ):
-                sent_count += 1
-            else:
-                failed_count += 1
+        with EmailBatchSender() as email_sender:
+            for youth_summer_voucher in queryset.select_related("youth_application"):
+                if youth_summer_voucher.send_youth_summer_voucher_email(
+                    language=youth_summer_voucher.youth_application.language,
+                    email_sender=email_sender,
+                ):
+                    sent_count += 1
+                else:
+                    failed_count += 1
 
         if sent_count > 0:
             self.message_user(
@@ -817,6 +832,20 @@ class YouthSummerVoucherAdmin(
                 level=logging.ERROR,
             )
 
+        if email_sender.failures:
+            recipients = dict.fromkeys(
+                recipient
+                for failure in email_sender.failures
+                for recipient in [*failure.recipient_list, *failure.bcc]
+            )
+            self.message_user(
+                request,
+                _("Failed to send the email to: {recipients}").format(
+                    recipients=", ".join(recipients)
+                ),
+                level=logging.ERROR,
+            )
+
 
 class EmployerSummerVoucherInline(ReadOnlyAdminMixin, admin.TabularInline):
     """
@@ -1,9 +1,8 @@
 """DRF views for handler Excel exports"""
 
 import collections
-import io
+from typing import List
 
-import xlsx_streaming
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.http import HttpResponse, StreamingHttpResponse
@@ -14,8 +13,6 @@ from rest_framework.permissions import AllowAny
 from rest_framework.request import Request
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
-from xlsxwriter import Workbook
-from xlsxwriter.worksheet import Format, Worksheet
 
 from applications.api.handler_excel_openapi import (
     openapi_employer_excel_export_schema,
@@ -28,6 +25,8 @@ from applications.employer_excel_export import (
     excel_download_error_redirect,
     parse_export_parameters,
 )
+from applications.exporters.excel_exporter import ExcelField
+from applications.exporters.xlsx_writer import stream_xlsx, XLSX_CONTENT_TYPE
 from applications.models import EmployerSummerVoucher, YouthApplication
 from applications.services import AuditAccessLogService
 from common.decorators import enforce_handler_view_adfs_login
@@ -148,6 +147,23 @@ class YouthApplicationExcelExportViewSet(ModelViewSet):
     def output_column_names(cls) -> list:
         return list(cls.source_fields_and_output_names().values())
 
+    @classmethod
+    def excel_fields(cls) -> List[ExcelField]:
+        output_names = cls.source_fields_and_output_names()
+        return [
+            ExcelField(
+                output_name,
+                "%s",
+                [source_field],
+                None,
+                None,
+                YouthApplicationExcelExportSerializer.get_excel_field_type(
+                    source_field
+                ),
+            )
+            for source_field, output_name in output_names.items()
+        ]
+
     def get_queryset(self):
         return YouthApplication.objects.active().order_by("created_at", "pk")
 
@@ -167,16 +183,12 @@ class YouthApplicationExcelExportViewSet(ModelViewSet):
         if not queryset.exists():
             return HttpResponse(_("Hakemuksia ei löytynyt."))
 
+        rows = self.serializer(
+            queryset.iterator(chunk_size=settings.EXCEL_DOWNLOAD_BATCH_SIZE)
+        )
         response = StreamingHttpResponse(
-            xlsx_streaming.stream_queryset_as_xlsx(
-                qs=queryset,
-                xlsx_template=self.xlsx_template(queryset),
-                serializer=self.serializer,
-                batch_size=settings.EXCEL_DOWNLOAD_BATCH_SIZE,
-            ),
-            content_type=(
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            ),
+            stream_xlsx(self.excel_fields(), rows, sheet_name=self.worksheet_name),
+            content_type=XLSX_CONTENT_TYPE,
         )
         response["Content-Disposition"] = f"attachment; filename={self.xlsx_filename}"
         return response
@@ -185,50 +197,10 @@ class YouthApplicationExcelExportViewSet(ModelViewSet):
     def worksheet_name(self) -> str:
         return str(_("Nuorten kesäsetelihakemukset"))
 
-    @property
-    def header_format_properties(self):
-        return {"bold": True, "text_wrap": False}
-
     @property
     def xlsx_filename(self) -> str:
         return f"{self.worksheet_name}-{timezone.localdate()}.xlsx"
 
-    def generate_data_row(self, app: YouthApplication, is_template: bool = False):
+    def generate_data_row(self, app: YouthApplication):
         data = self.serializer_class(app).data
-        return [
-            (
-                YouthApplicationExcelExportSerializer.get_placeholder_value(
-                    source_field
-                )
-                if is_template and not data.get(source_field)
-                else data.get(source_field)
-            )
-            for source_field in self.source_fields()
-        ]
-
-    def write_data_row(
-        self,
-        worksheet: Worksheet,
-        row_number: int,
-        app: YouthApplication,
-        is_template: bool = False,
-    ):
-        data_row = self.generate_data_row(app, is_template)
-        for column_number, cell_value in enumerate(data_row):
-            worksheet.write(row_number, column_number, cell_value)
-
-    def write_header(self, worksheet: Worksheet, header_format: Format):
-        for column_number, column_name in enumerate(self.output_column_names()):
-            worksheet.write(0, column_number, column_name, header_format)
-
-    def xlsx_template(self, queryset):
-        result = io.BytesIO()
-        workbook = Workbook(result)
-        worksheet = workbook.add_worksheet(self.worksheet_name)
-        header_format = workbook.add_format(self.header_format_properties)
-        self.write_header(worksheet, header_format)
-        self.write_data_row(
-            worksheet=worksheet, row_number=1, app=queryset[0], is_template=True
-        )
-        workbook.close()
-        return result
+        return [data.get(source_field) for source_field in self.source_fields()]
@@ -1,7 +1,7 @@
 import json
 import logging
 from datetime import date, datetime
-from typing import Optional, Union
+from typing import Optional
 
 import filetype
 from django.conf import settings
@@ -25,7 +25,10 @@ from applications.enums import (
     TimelineItemType,
     YouthApplicationStatus,
 )
-from applications.exporters.excel_exporter import resolve_target_group_and_status
+from applications.exporters.excel_exporter import (
+    ExcelFieldType,
+    resolve_target_group_and_status,
+)
 from applications.models import (
     Attachment,
     EmployerApplication,
@@ -1438,11 +1441,11 @@ class YouthApplicationExcelExportSerializer(serializers.ModelSerializer):
             return str(_("Kyllä") if obj.is_unlisted_school else _("Ei"))
 
     @staticmethod
-    def get_placeholder_value(field: str) -> Union[int, str]:
+    def get_excel_field_type(field: str) -> ExcelFieldType:
         if field in ["application_year", "birth_year"]:
-            return 1  # Placeholder integer value
+            return "int"
         else:
-            return "placeholder_value"
+            return "str"
 
     class Meta:
         model = YouthApplication
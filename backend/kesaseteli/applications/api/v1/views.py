@@ -1,10 +1,12 @@
+import hashlib
+import json
 import logging
 import uuid
-from functools import cached_property
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core import exceptions
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
 from django.db.models import F, Func, Prefetch
@@ -12,7 +14,9 @@ from django.db.utils import ProgrammingError
 from django.http import FileResponse, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import redirect
 from django.utils import translation
+from django.utils.cache import patch_cache_control
 from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags, quote_etag
 from django.utils.text import format_lazy
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.csrf import csrf_protect
@@ -77,7 +81,12 @@ from applications.models import (
     YouthApplication,
     YouthSummerVoucher,
 )
-from applications.services import AuditAccessLogService, TimelineService, VTJService
+from applications.services import (
+    AuditAccessLogService,
+    SchoolService,
+    TimelineService,
+    VTJService,
+)
 from applications.target_groups import (
     AbstractTargetGroup,
     get_target_group_data,
@@ -124,8 +133,7 @@ class SchoolListView(ListAPIView):
             self.get_sorter("name", collation) for collation in self.get_collations()
         ]
 
-    @cached_property
-    def preferred_sorter(self):
+    def detect_preferred_sorter(self):
         for sorter in self.get_sorters():
             # Try out different order by functions until a functional one is found
             try:
@@ -133,13 +141,22 @@ class SchoolListView(ListAPIView):
                 # "current transaction is aborted, commands ignored until end of
                 # transaction block"
                 with transaction.atomic():
-                    # Force evaluation of queryset to test sorting function
-                    list(School.objects.order_by(sorter.asc()))
+                    # Test the sorting function without fetching the schools
+                    list(School.objects.order_by(sorter.asc())[:1])
                 return sorter
             except ProgrammingError:  # Collation for encoding does not exist
                 pass
         raise ProgrammingError("Unable to determine working collation for school list")
 
+    @property
+    def preferred_sorter(self):
+        # The working collation depends only on the database, so it is detected
+        # once per process instead of on every request
+        view_class = type(self)
+        if "_preferred_sorter" not in view_class.__dict__:
+            view_class._preferred_sorter = self.detect_preferred_sorter()
+        return view_class._preferred_sorter
+
     def get_queryset(self):
         return School.objects.order_by(self.preferred_sorter.asc())
 
@@ -147,6 +164,38 @@ class SchoolListView(ListAPIView):
         permission_classes = [AllowAny]
         return [permission() for permission in permission_classes]
 
+    def get_cached_school_list(self) -> dict:
+        """
+        Return the serialized school list and its ETag. The list is cached until the
+        schools are changed or settings.SCHOOL_LIST_CACHE_TIMEOUT expires.
+        """
+        school_list = cache.get(SchoolService.LIST_CACHE_KEY)
+        if school_list is None:
+            data = list(self.get_serializer(self.get_queryset(), many=True).data)
+            content = json.dumps(data, ensure_ascii=False).encode()
+            school_list = {
+                "data": data,
+                "etag": quote_etag(hashlib.sha256(content).hexdigest()),
+            }
+            cache.set(
+                SchoolService.LIST_CACHE_KEY,
+                school_list,
+                timeout=settings.SCHOOL_LIST_CACHE_TIMEOUT,
+            )
+        return school_list
+
+    def list(self, request, *args, **kwargs):
+        school_list = self.get_cached_school_list()
+        if school_list["etag"] in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(school_list["data"])
+        response["ETag"] = school_list["etag"]
+        patch_cache_control(
+            response, public=True, max_age=settings.SCHOOL_LIST_CACHE_MAX_AGE
+        )
+        return response
+
 
 @extend_schema(responses=TargetGroupSerializer(many=True))
 class TargetGroupListView(ListAPIView):
@@ -357,7 +406,6 @@ class YouthApplicationViewSet(ModelViewSet):
         )
         return Response(serializer.data)
 
-    @transaction.atomic
     @enforce_handler_view_adfs_login
     @extend_schema(responses=YouthApplicationSerializer)
     def retrieve(self, request: Request, *args, **kwargs) -> Response | HttpResponse:
@@ -367,27 +415,45 @@ class YouthApplicationViewSet(ModelViewSet):
         Only accessible by authenticated handlers. Refreshes the VTJ validation
         cache for unhandled applications and includes linked employer applications.
         """
-        youth_application: YouthApplication = self.get_object().lock_for_update()
+        youth_application: YouthApplication = self.get_object()
         # Update unhandled youth applications' encrypted_handler_vtj_json so
         # handlers can accept/reject using it
         if (
             youth_application.has_social_security_number
             and not youth_application.is_handled
         ):
-            # Fetch VTJ data and update encrypted_handler_vtj_json
-            youth_application.encrypted_handler_vtj_json = VTJService.fetch_vtj_json(
+            # Fetch VTJ data before the transaction, so that a slow VTJ response
+            # doesn't keep the youth application locked
+            vtj_json = VTJService.fetch_vtj_json(
                 youth_application, end_user=VTJClient.get_end_user(request)
             )
+            self._update_handler_vtj_json(youth_application, vtj_json)
+        return super().retrieve(request, *args, **kwargs)
 
-            # Update VTJ data restriction status
-            youth_application.update_vtj_restriction_status(
-                youth_application.encrypted_handler_vtj_json
-            )
+    @staticmethod
+    @transaction.atomic
+    def _update_handler_vtj_json(
+        youth_application: YouthApplication, vtj_json: str | None
+    ) -> None:
+        """
+        Update the encrypted_handler_vtj_json and the VTJ data restriction status
+        of the youth application, unless it has been handled after the VTJ data was
+        fetched.
+        """
+        youth_application = youth_application.lock_for_update()
+        if youth_application.is_handled:
+            return
 
-            youth_application.save(
-                update_fields=["encrypted_handler_vtj_json", "is_vtj_data_restricted"]
-            )
-        return super().retrieve(request, *args, **kwargs)
+        youth_application.encrypted_handler_vtj_json = vtj_json
+
+        # Update VTJ data restriction status
+        youth_application.update_vtj_restriction_status(
+            youth_application.encrypted_handler_vtj_json
+        )
+
+        youth_application.save(
+            update_fields=["encrypted_handler_vtj_json", "is_vtj_data_restricted"]
+        )
 
     @extend_schema(
         responses={
@@ -781,7 +847,6 @@ class YouthApplicationViewSet(ModelViewSet):
         )
         return JsonResponse(status=response_status, data=response_data)
 
-    @transaction.atomic
     @extend_schema(
         request=YouthApplicationSerializer,
         responses={
@@ -790,7 +855,7 @@ class YouthApplicationViewSet(ModelViewSet):
             500: OpenApiResponse(description="Failed to send email"),
         },
     )
-    def create(self, request: Request, *args, **kwargs):  # noqa: C901
+    def create(self, request: Request, *args, **kwargs):
         """
         Create a VTJ-backed youth application and notify the applicant.
 
@@ -806,106 +871,115 @@ class YouthApplicationViewSet(ModelViewSet):
             email = serializer.validated_data["email"]
             social_security_number = serializer.validated_data["social_security_number"]
 
-            if YouthApplication.objects.is_email_or_social_security_number_active_this_year(  # noqa: E501
-                email, social_security_number
-            ):
-                return self.error_response_with_logging(
-                    YouthApplicationRejectedReason.ALREADY_ASSIGNED
-                )
-            elif YouthApplication.objects.is_email_used_this_year(email):
-                return self.error_response_with_logging(
-                    YouthApplicationRejectedReason.EMAIL_IN_USE
+            rejected_reason = (
+                YouthApplication.objects.get_duplicate_rejected_reason_this_year(
+                    email, social_security_number
                 )
+            )
+            if rejected_reason is not None:
+                return self.error_response_with_logging(rejected_reason)
+
+            # Fetch the VTJ JSON data before the transaction, so that a slow VTJ
+            # response doesn't keep the transaction open
+            vtj_json = VTJService.fetch_vtj_json(
+                YouthApplication(
+                    first_name=serializer.validated_data["first_name"],
+                    last_name=serializer.validated_data["last_name"],
+                    social_security_number=social_security_number,
+                ),
+                end_user="",
+            )
+            return self._create_with_vtj_json(request, serializer, vtj_json)
+        except ValidationError as e:
+            LOGGER.error(
+                "Youth application submission rejected because of validation error. "
+                f"Validation error codes: {str(e.get_codes())}"
+            )
+            raise
 
-            # Data was valid and other criteria passed too, so let's create the object
-            self.perform_create(serializer)
+    @transaction.atomic
+    def _create_with_vtj_json(  # noqa: C901
+        self, request: Request, serializer, vtj_json: str | None
+    ) -> HttpResponse:
+        """
+        Create the validated youth application with the fetched VTJ JSON data and
+        send the activation or additional info request email in a transaction,
+        which is rolled back if the youth application is not accepted.
+        """
+        # Data was valid and other criteria passed too, so let's create the object
+        self.perform_create(serializer)
 
-            youth_application = serializer.instance
+        youth_application = serializer.instance
 
-            # Fetch the VTJ JSON data and save it
-            youth_application.encrypted_original_vtj_json = VTJService.fetch_vtj_json(
-                youth_application, end_user=""
-            )
-            youth_application.encrypted_handler_vtj_json = (
-                youth_application.encrypted_original_vtj_json
-            )
-            youth_application.update_vtj_restriction_status(
-                youth_application.encrypted_original_vtj_json
+        # Save the VTJ JSON data
+        youth_application.encrypted_original_vtj_json = vtj_json
+        youth_application.encrypted_handler_vtj_json = (
+            youth_application.encrypted_original_vtj_json
+        )
+        youth_application.update_vtj_restriction_status(
+            youth_application.encrypted_original_vtj_json
+        )
+        youth_application.save(
+            update_fields=[
+                "encrypted_original_vtj_json",
+                "encrypted_handler_vtj_json",
+                "is_vtj_data_restricted",
+            ]
+        )
+
+        # Send the localized activation or additional-info email.
+        if settings.NEXT_PUBLIC_DISABLE_VTJ:
+            was_email_sent = youth_application.send_activation_email(
+                request, youth_application.language
             )
-            youth_application.save(
-                update_fields=[
-                    "encrypted_original_vtj_json",
-                    "encrypted_handler_vtj_json",
-                    "is_vtj_data_restricted",
-                ]
+        else:  # VTJ integration is enabled
+            request_additional_info = serializer.validated_data.get(
+                "request_additional_information", False
             )
+            if request_additional_info and not youth_application.need_additional_info:
+                transaction.set_rollback(True)
+                with translation.override(youth_application.language):
+                    return HttpResponse(
+                        _("Send anyway was used needlessly"),
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
 
-            # Send the localized activation or additional-info email.
-            if settings.NEXT_PUBLIC_DISABLE_VTJ:
-                was_email_sent = youth_application.send_activation_email(
-                    request, youth_application.language
-                )
-            else:  # VTJ integration is enabled
-                request_additional_info = serializer.validated_data.get(
-                    "request_additional_information", False
-                )
+            if not request_additional_info:
                 if (
-                    request_additional_info
-                    and not youth_application.need_additional_info
+                    not youth_application.is_social_security_number_valid_according_to_vtj  # noqa: E501
+                    or youth_application.is_applicant_dead_according_to_vtj
                 ):
                     transaction.set_rollback(True)
-                    with translation.override(youth_application.language):
-                        return HttpResponse(
-                            _("Send anyway was used needlessly"),
-                            status=status.HTTP_400_BAD_REQUEST,
-                        )
-
-                if not request_additional_info:
-                    if (
-                        not youth_application.is_social_security_number_valid_according_to_vtj  # noqa: E501
-                        or youth_application.is_applicant_dead_according_to_vtj
-                    ):
-                        transaction.set_rollback(True)
-                        return self.error_response_with_logging(
-                            YouthApplicationRejectedReason.INADMISSIBLE_DATA
-                        )
-                    elif not youth_application.is_last_name_as_in_vtj:
-                        transaction.set_rollback(True)
-                        return self.error_response_with_logging(
-                            YouthApplicationRejectedReason.PLEASE_RECHECK_DATA
-                        )
-
-                if youth_application.need_additional_info:
-                    was_email_sent = (
-                        youth_application.send_additional_info_request_email(
-                            request, youth_application.language
-                        )
+                    return self.error_response_with_logging(
+                        YouthApplicationRejectedReason.INADMISSIBLE_DATA
                     )
-                else:
-                    was_email_sent = youth_application.send_activation_email(
-                        request, youth_application.language
+                elif not youth_application.is_last_name_as_in_vtj:
+                    transaction.set_rollback(True)
+                    return self.error_response_with_logging(
+                        YouthApplicationRejectedReason.PLEASE_RECHECK_DATA
                     )
 
-            if not was_email_sent:
-                transaction.set_rollback(True)
-                with translation.override(youth_application.language):
-                    return HttpResponse(
-                        _("Failed to send activation/additional info request email"),
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
+            if youth_application.need_additional_info:
+                was_email_sent = youth_application.send_additional_info_request_email(
+                    request, youth_application.language
+                )
+            else:
+                was_email_sent = youth_application.send_activation_email(
+                    request, youth_application.language
+                )
 
-            # Return success creating the object
-            output_data = YouthApplicationOutputSerializer(serializer.instance).data
-            headers = self.get_success_headers(output_data)
-            return Response(
-                output_data, status=status.HTTP_201_CREATED, headers=headers
-            )
-        except ValidationError as e:
-            LOGGER.error(
-                "Youth application submission rejected because of validation error. "
-                f"Validation error codes: {str(e.get_codes())}"
-            )
-            raise
+        if not was_email_sent:
+            transaction.set_rollback(True)
+            with translation.override(youth_application.language):
+                return HttpResponse(
+                    _("Failed to send activation/additional info request email"),
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+
+        # Return success creating the object
+        output_data = YouthApplicationOutputSerializer(serializer.instance).data
+        headers = self.get_success_headers(output_data)
+        return Response(output_data, status=status.HTTP_201_CREATED, headers=headers)
 
     @extend_schema(
         responses={
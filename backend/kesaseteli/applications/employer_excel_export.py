@@ -2,9 +2,7 @@
 
 from dataclasses import dataclass
 from datetime import date
-from functools import partial
 
-import xlsx_streaming
 from django.conf import settings
 from django.db import models
 from django.db.models import F, QuerySet, Window
@@ -21,11 +19,11 @@ from applications.enums import (
 )
 from applications.exporters.excel_exporter import (
     generate_data_rows,
-    generate_xlsx_template,
     get_exportable_fields,
     get_xlsx_filename,
 )
-from applications.models import EmployerSummerVoucher
+from applications.exporters.xlsx_writer import stream_xlsx, XLSX_CONTENT_TYPE
+from applications.models import EmployerSummerVoucher, SummerVoucherConfiguration
 
 
 class EmployerExcelExportErrorCode(models.TextChoices):
@@ -198,6 +196,9 @@ class EmployerExcelExportService:
     ) -> StreamingHttpResponse:
         """Stream an xlsx attachment for the given queryset.
 
+        The vouchers are fetched in batches of EXCEL_DOWNLOAD_BATCH_SIZE and written
+        to the spreadsheet as they are fetched.
+
         Args:
             queryset: Vouchers to include in the export.
             columns: Column layout to use in the spreadsheet.
@@ -205,21 +206,17 @@ class EmployerExcelExportService:
         Returns:
             Streaming HTTP response with spreadsheet content type.
         """
-        serializer = partial(
-            generate_data_rows,
-            fields=get_exportable_fields(columns),
+        # Every row needs the configuration of its year for the voucher value
+        SummerVoucherConfiguration.objects.preload()
+        fields = get_exportable_fields(columns)
+        rows = generate_data_rows(
+            queryset.iterator(chunk_size=settings.EXCEL_DOWNLOAD_BATCH_SIZE),
+            fields=fields,
             request=self.request,
         )
         response = StreamingHttpResponse(
-            xlsx_streaming.stream_queryset_as_xlsx(
-                qs=queryset,
-                xlsx_template=generate_xlsx_template(queryset, columns, self.request),
-                serializer=serializer,
-                batch_size=settings.EXCEL_DOWNLOAD_BATCH_SIZE,
-            ),
-            content_type=(
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            ),
+            stream_xlsx(fields, rows, sheet_name=str(_("Setelit"))),
+            content_type=XLSX_CONTENT_TYPE,
         )
         response["Content-Disposition"] = "attachment; filename={}".format(
             get_xlsx_filename(columns)
@@ -1,17 +1,27 @@
-import io
-from typing import Iterable, List, Literal, NamedTuple
+import operator
+from collections import defaultdict
+from datetime import date
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 from django.conf import settings
-from django.db.models import QuerySet
+from django.core.exceptions import FieldDoesNotExist
 from django.http import HttpRequest
 from django.shortcuts import reverse
 from django.utils import timezone, translation
 from django.utils.translation import gettext_lazy as _
-from xlsxwriter import Workbook
-from xlsxwriter.worksheet import Worksheet
 
 from applications.enums import AdditionalInfoUserReason, ExcelColumns
-from applications.models import EmployerSummerVoucher
+from applications.models import Attachment, EmployerSummerVoucher
 from applications.target_groups import get_target_group_class_by_age
 from common.utils import get_age, getattr_nested
 
@@ -22,8 +32,8 @@ class ExcelField(NamedTuple):
     title: str
     value: str
     model_fields: List[str]
-    width: int
-    background_color: str
+    width: Optional[int]
+    background_color: Optional[str]
     type: ExcelFieldType = "str"
 
 
@@ -153,8 +163,8 @@ TALPA_END_FIELD_TITLES = [
 
 FIELDS = [
     # Field title, field value, field names in summer voucher model, column width,
-    # background color
-    ExcelField(ORDER_FIELD_TITLE, "", [], 15, "white"),  # Specially handled
+    # background color, cell type
+    ExcelField(ORDER_FIELD_TITLE, "", [], 15, "white", "int"),  # Specially handled
     ExcelField(
         RECEIVED_DATE_FIELD_TITLE, "%s", ["submitted_at"], 15, "white"
     ),  # Specially handled
@@ -405,23 +415,33 @@ def get_xlsx_filename(columns: ExcelColumns) -> str:
     return filename
 
 
-def set_header_and_formatting(
-    wb: Workbook, ws: Worksheet, column: int, field: ExcelField, header_format
-):
-    ws.write(0, column, str(_(field.title)), header_format)
-
-    cell_format = wb.add_format()
-    cell_format.set_border(1)
-    cell_format.set_bg_color(field.background_color)
-    ws.set_column(column, column, field.width, cell_format)
-
+def get_attachments_by_type(
+    summer_voucher: EmployerSummerVoucher, attachments
+) -> Dict[str, List[Attachment]]:
+    """
+    Group the attachments of the summer voucher by attachment type in creation order.
 
-def get_attachment_uri(
-    summer_voucher: EmployerSummerVoucher,
-    field: ExcelField,
-    value,
-    request: HttpRequest,
-):
+    The attachments prefetched by EmployerExcelExportService.base_queryset are used
+    and the grouping is cached on the summer voucher, so that all attachment columns
+    of a row are resolved without any further queries.
+    """
+    attachments_by_type = getattr(summer_voucher, "_excel_attachments_by_type", None)
+    if attachments_by_type is None:
+        attachments_by_type = defaultdict(list)
+        for attachment in sorted(
+            attachments.all(),
+            key=lambda attachment: (attachment.created_at, attachment.pk),
+        ):
+            attachments_by_type[attachment.attachment_type].append(attachment)
+        summer_voucher._excel_attachments_by_type = attachments_by_type
+    return attachments_by_type
+
+
+def get_attachment_type_and_number(field: ExcelField) -> Tuple[str, int]:
+    """
+    Return the attachment type and the number of the attachment of that type of an
+    attachment field, e.g. ("payslip", 2) for "Liite: Palkkalaskelma 2"
+    """
     field_name = field.title
     attachment_number = int(field_name.split(" ")[-1])
     attachment_type = field_name.split(" ")[1]
@@ -430,17 +450,23 @@ def get_attachment_uri(
         attachment_type = "employment_contract"
     elif attachment_type == "Palkkalaskelma":
         attachment_type = "payslip"
+    return attachment_type, attachment_number
+
 
-    # Get attachment of type `attachment_type` and use the OFFSET and LIMIT to get only
-    # the n'th entry
-    # where n is `attachment_number`.
-    attachment = (
-        value.filter(attachment_type=attachment_type)
-        .order_by("created_at")[attachment_number - 1 : attachment_number]  # noqa
-        .first()
+def get_attachment_uri(
+    summer_voucher: EmployerSummerVoucher,
+    value,
+    attachment_type: str,
+    attachment_number: int,
+    request: HttpRequest,
+):
+    # Get the n'th attachment of type `attachment_type` where n is `attachment_number`
+    attachments = get_attachments_by_type(summer_voucher, value).get(
+        attachment_type, []
     )
-    if not attachment:
+    if len(attachments) < attachment_number:
         return ""
+    attachment = attachments[attachment_number - 1]
 
     path = reverse(
         "v1:employersummervoucher-handle-attachment",
@@ -449,141 +475,219 @@ def get_attachment_uri(
     return request.build_absolute_uri(path)
 
 
-def handle_special_cases(
-    value,
-    attr_str,
-    summer_voucher: EmployerSummerVoucher,
-    field: ExcelField,
-    request: HttpRequest,
-):
-    if isinstance(value, bool):
-        value = str(_("Kyllä")) if value else str(_("Ei"))
-    elif attr_str == "attachments":
-        value = get_attachment_uri(summer_voucher, field, value, request)
-    elif "application__invoicer" in attr_str and getattr(
-        summer_voucher, "application", None
+def get_youth_application(summer_voucher: EmployerSummerVoucher):
+    return (
+        summer_voucher.youth_summer_voucher.youth_application
+        if getattr(summer_voucher, "youth_summer_voucher", None)
+        else None
+    )
+
+
+def _get_received_date(summer_voucher: EmployerSummerVoucher) -> str:
+    submitted_at = getattr(summer_voucher, "submitted_at", None)
+    return submitted_at.astimezone().strftime("%d/%m/%Y") if submitted_at else ""
+
+
+def get_model_field(model, attr_names: List[str]):
+    """
+    Return the model field that the attribute path ends at, or None if any of the
+    attributes is not a model field, e.g. a property
+    """
+    for attr_name in attr_names[:-1]:
+        try:
+            model = model._meta.get_field(attr_name).related_model
+        except FieldDoesNotExist:
+            return None
+        if model is None:
+            return None
+    try:
+        return model._meta.get_field(attr_names[-1])
+    except FieldDoesNotExist:
+        return None
+
+
+def compile_attribute_getter(attr_str: str) -> Callable[[EmployerSummerVoucher], Any]:
+    """
+    Compile a getter that returns the same value as
+    getattr_nested(summer_voucher, attr_str.split("__")).
+
+    The display values of the model fields with choices are looked up from a mapping
+    translated once, instead of calling get_<field>_display in Finnish for every
+    cell. The attributes that are not concrete model fields, e.g. properties, may
+    have a display method of their own, so getattr_nested is used for them.
+    """
+    attr_names = attr_str.split("__")
+    *path, attr_name = attr_names
+    model_field = get_model_field(EmployerSummerVoucher, attr_names)
+    if (
+        model_field is None
+        or not model_field.concrete
+        or model_field.is_relation
+        or (
+            not model_field.choices
+            and hasattr(model_field.model, f"get_{attr_name}_display")
+        )
     ):
-        value = value if summer_voucher.application.is_separate_invoicer else ""
-    elif attr_str == "target_group":
-        if not value:
-            youth_app = (
-                summer_voucher.youth_summer_voucher.youth_application
-                if getattr(summer_voucher, "youth_summer_voucher", None)
-                else None
-            )
-            value = resolve_target_group_and_status(youth_app)[0]
-    elif attr_str == "target_group_calculation_status":
-        youth_app = (
-            summer_voucher.youth_summer_voucher.youth_application
-            if getattr(summer_voucher, "youth_summer_voucher", None)
-            else None
+        return lambda summer_voucher: getattr_nested(
+            summer_voucher, attr_str.split("__")
+        )
+
+    display_values = None
+    if model_field.choices:
+        with translation.override("fi"):
+            display_values = {
+                value: str(display_value)
+                for value, display_value in model_field.flatchoices
+            }
+
+    def get_value(summer_voucher: EmployerSummerVoucher):
+        obj = summer_voucher
+        for name in path:
+            obj = getattr(obj, name, None)
+            if obj is None:
+                return ""
+        value = getattr(obj, attr_name, None)
+        if value is None or value == "":
+            return ""
+        if isinstance(value, date):
+            return value.strftime("%d.%m.%Y")
+        if display_values is not None:
+            return display_values.get(value, value)
+        return value
+
+    return get_value
+
+
+def compile_special_case(
+    attr_str: str, field: ExcelField, request: HttpRequest
+) -> Optional[Callable[[EmployerSummerVoucher, Any], Any]]:
+    """
+    Compile the special case handling of the attribute, e.g. the attachment URIs or
+    the resolved target group, or return None if the value is used as is
+    """
+    if attr_str == "attachments":
+        attachment_type, attachment_number = get_attachment_type_and_number(field)
+        return lambda summer_voucher, value: get_attachment_uri(
+            summer_voucher, value, attachment_type, attachment_number, request
         )
-        value = resolve_target_group_and_status(youth_app)[1]
-    return value
+    if "application__invoicer" in attr_str:
+
+        def get_invoicer_value(summer_voucher, value):
+            application = getattr(summer_voucher, "application", None)
+            if application and not application.is_separate_invoicer:
+                return ""
+            return value
+
+        return get_invoicer_value
+    if attr_str == "target_group":
+
+        def get_target_group(summer_voucher, value):
+            if value:
+                return value
+            youth_application = get_youth_application(summer_voucher)
+            return resolve_target_group_and_status(youth_application)[0]
+
+        return get_target_group
+    if attr_str == "target_group_calculation_status":
+        return lambda summer_voucher, value: resolve_target_group_and_status(
+            get_youth_application(summer_voucher)
+        )[1]
+    return None
+
+
+def compile_cell_value_getter(
+    attr_str: str, field: ExcelField, request: HttpRequest
+) -> Callable[[EmployerSummerVoucher], Any]:
+    """
+    Compile a getter that returns the cell value of the attribute of the field, with
+    the booleans translated and the special cases of the attribute handled
+    """
+    get_value = compile_attribute_getter(attr_str)
+    special_case = compile_special_case(attr_str, field, request)
+    yes, no = str(_("Kyllä")), str(_("Ei"))
 
+    def get_cell_value(summer_voucher: EmployerSummerVoucher):
+        value = get_value(summer_voucher)
+        if isinstance(value, bool):
+            return yes if value else no
+        if special_case is not None:
+            return special_case(summer_voucher, value)
+        return value
 
-def generate_data_row(
-    summer_voucher: EmployerSummerVoucher,
-    fields: List[ExcelField],
-    request: HttpRequest,
-    is_template: bool = False,
-) -> list:
-    result = []
-    for field in fields:
-        if field.title == ORDER_FIELD_TITLE:
-            cell_value = summer_voucher.row_number
-        elif field.title == RECEIVED_DATE_FIELD_TITLE:
-            submitted_at = getattr(summer_voucher, "submitted_at", None)
-            cell_value = (
-                submitted_at.astimezone().strftime("%d/%m/%Y") if submitted_at else ""
-            )
-        else:
-            attr_names = field.model_fields
-            values = []
-            for attr_str in attr_names:
-                value = getattr_nested(summer_voucher, attr_str.split("__"))
-                value = handle_special_cases(
-                    value, attr_str, summer_voucher, field, request
-                )
-                values.append(value)
+    return get_cell_value
 
-            cell_value = field.value % tuple(values)
-            if field.type == "int" and cell_value.isdigit():
-                cell_value = int(cell_value)
 
-        if is_template and cell_value in [None, ""]:
-            # Place a placeholder for xlsx-streaming package to infer cell type from
-            if field.type == "int":
-                cell_value = 0  # Integer placeholder
-            else:
-                cell_value = "placeholder value"  # String placeholder
+def compile_field(
+    field: ExcelField, request: HttpRequest
+) -> Callable[[EmployerSummerVoucher], Any]:
+    """
+    Compile the field into an accessor that returns the cell value of the field for
+    a summer voucher. The attribute paths, the special cases and the formatting of
+    the field are resolved once, so that generating a row is a loop over the
+    accessors.
+    """
+    if field.title == ORDER_FIELD_TITLE:
+        return operator.attrgetter("row_number")
+    if field.title == RECEIVED_DATE_FIELD_TITLE:
+        return _get_received_date
+
+    getters = [
+        compile_cell_value_getter(attr_str, field, request)
+        for attr_str in field.model_fields
+    ]
+    to_cell_value = (
+        (lambda value: int(value) if value.isdigit() else value)
+        if field.type == "int"
+        else None
+    )
 
-        result.append(cell_value)
+    if not getters:
+        cell_value = field.value % ()
+        if to_cell_value is not None:
+            cell_value = to_cell_value(cell_value)
+        return lambda summer_voucher: cell_value
 
-    return result
+    if len(getters) == 1 and field.value == "%s":
+        (get_cell_value,) = getters
 
+        def format_cell_value(summer_voucher: EmployerSummerVoucher) -> str:
+            return str(get_cell_value(summer_voucher))
 
-def generate_data_rows(
-    summer_vouchers: Iterable[EmployerSummerVoucher],
-    fields: List[ExcelField],
-    request: HttpRequest,
-    is_template: bool = False,
-):
-    return (
-        generate_data_row(summer_voucher, fields, request, is_template)
-        for summer_voucher in summer_vouchers
-    )
+    else:
 
+        def format_cell_value(summer_voucher: EmployerSummerVoucher) -> str:
+            return field.value % tuple(get(summer_voucher) for get in getters)
 
-def write_data_row(
-    ws: Worksheet,
-    row_number: int,
+    if to_cell_value is None:
+        return format_cell_value
+    return lambda summer_voucher: to_cell_value(format_cell_value(summer_voucher))
+
+
+def compile_fields(
+    fields: List[ExcelField], request: HttpRequest
+) -> List[Callable[[EmployerSummerVoucher], Any]]:
+    return [compile_field(field, request) for field in fields]
+
+
+def generate_data_row(
     summer_voucher: EmployerSummerVoucher,
     fields: List[ExcelField],
     request: HttpRequest,
-    is_template: bool = False,
-):
-    data_row = generate_data_row(summer_voucher, fields, request, is_template)
-    for column_number, cell_value in enumerate(data_row):
-        ws.write(row_number, column_number, cell_value)
+) -> list:
+    return [accessor(summer_voucher) for accessor in compile_fields(fields, request)]
 
 
-def populate_workbook(
-    wb: Workbook,
-    summer_vouchers: QuerySet[EmployerSummerVoucher],
-    columns: ExcelColumns,
+def generate_data_rows(
+    summer_vouchers: Iterable[EmployerSummerVoucher],
+    fields: List[ExcelField],
     request: HttpRequest,
-    is_template: bool = False,
 ):
     """
-    Fill the workbook with information from the summer vouchers queryset.
-
-    Field names and values are fetched from the FIELDS tuple.
+    Generate the rows of the summer vouchers. The fields are compiled once for all
+    the rows.
     """
-    ws = wb.add_worksheet(name=str(_("Setelit")))
-    wrapped_cell_format = wb.add_format()
-    wrapped_cell_format.set_text_wrap()
-
-    header_format = wb.add_format({"bold": True})
-    exportable_fields = get_exportable_fields(columns)
-    for column, field in enumerate(exportable_fields):
-        set_header_and_formatting(wb, ws, column, field, header_format)
-    for row_number, summer_voucher in enumerate(summer_vouchers, 1):
-        write_data_row(
-            ws, row_number, summer_voucher, exportable_fields, request, is_template
-        )
-    wb.close()
-
-
-def generate_xlsx_template(
-    summer_vouchers: QuerySet[EmployerSummerVoucher],
-    columns: ExcelColumns,
-    request: HttpRequest,
-):
-    output = io.BytesIO()
-    wb = Workbook(output)
-    # Use the first row in the queryset to generate the .xlsx template for the
-    # xlsx-streaming package which uses the template for determining column names and
-    # types (supports at least boolean, integer and string types) in Excel output
-    populate_workbook(wb, summer_vouchers[0:1], columns, request, is_template=True)
-    return output
+    accessors = compile_fields(fields, request)
+    return (
+        [accessor(summer_voucher) for accessor in accessors]
+        for summer_voucher in summer_vouchers
+    )
@@ -0,0 +1,315 @@
+"""
+Streaming xlsx writer for the handler Excel exports.
+
+The worksheet is generated row by row from column definitions (see
+applications.exporters.excel_exporter.ExcelField) and deflated into the xlsx
+archive as it is produced, so an export of any size is written with constant memory
+and without a template workbook.
+"""
+
+import re
+import zipfile
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional, Protocol, Sequence
+from xml.sax.saxutils import escape, quoteattr
+
+from shared.common.zip_stream import ZipStreamBuffer
+
+# Rows are written to the deflated worksheet in chunks of this many rows
+XLSX_ROWS_PER_CHUNK = 500
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Named colors supported in the column definitions, as in xlsxwriter
+NAMED_COLORS = {
+    "black": "000000",
+    "blue": "0000FF",
+    "brown": "800000",
+    "cyan": "00FFFF",
+    "gray": "808080",
+    "green": "008000",
+    "lime": "00FF00",
+    "magenta": "FF00FF",
+    "navy": "000080",
+    "orange": "FF6600",
+    "pink": "FF00FF",
+    "purple": "800080",
+    "red": "FF0000",
+    "silver": "C0C0C0",
+    "white": "FFFFFF",
+    "yellow": "FFFF00",
+}
+
+# Characters that are not allowed in XML and are escaped as in Office Open XML
+ILLEGAL_XML_CHARACTERS_RE = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F\uFFFE\uFFFF]")
+ESCAPED_CHARACTER_RE = re.compile(r"_x[0-9a-fA-F]{4}_")
+
+DEFAULT_STYLE = 0
+HEADER_STYLE = 1
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels"'
+    ' ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "</Types>"
+)
+
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+
+WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    "</Relationships>"
+)
+
+WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    "<sheets><sheet name={sheet_name} sheetId="
+    '"1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+
+WORKSHEET_START_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+)
+
+
+class XlsxColumn(Protocol):
+    """Column definition of the writer, e.g. an ExcelField"""
+
+    title: str
+    width: Optional[int]
+    background_color: Optional[str]
+    type: str
+
+
+def get_column_letter(column_index: int) -> str:
+    """Return the letter of the zero based column index, e.g. 0 -> A, 26 -> AA"""
+    letters = ""
+    column_number = column_index + 1
+    while column_number > 0:
+        column_number, remainder = divmod(column_number - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def get_rgb_color(color: str) -> str:
+    """Return the ARGB value of a named or a hex color, e.g. #7F7F7F -> FF7F7F7F"""
+    rgb = NAMED_COLORS.get(color.lower(), color.lstrip("#"))
+    if not re.fullmatch(r"[0-9a-fA-F]{6}", rgb):
+        raise ValueError(f"Invalid color value: {color}")
+    return f"FF{rgb.upper()}"
+
+
+def _escape_text(value: str) -> str:
+    if "_x" in value:
+        # Escape the strings that look like escaped characters
+        value = ESCAPED_CHARACTER_RE.sub(r"_x005F\g<0>", value)
+    value = ILLEGAL_XML_CHARACTERS_RE.sub(
+        lambda match: f"_x{ord(match.group(0)):04X}_", value
+    )
+    return escape(value)
+
+
+def _string_cell(reference: str, style: int, value: str) -> str:
+    space = ' xml:space="preserve"' if value != value.strip() else ""
+    return (
+        f'<c r="{reference}" s="{style}" t="inlineStr">'
+        f"<is><t{space}>{_escape_text(value)}</t></is></c>"
+    )
+
+
+def _cell(reference: str, style: int, column_type: str, value) -> str:
+    if value is None:
+        return f'<c r="{reference}" s="{style}"/>'
+    if column_type == "int" and (
+        isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+    ):
+        return f'<c r="{reference}" s="{style}"><v>{value}</v></c>'
+    return _string_cell(reference, style, str(value))
+
+
+def get_background_colors(columns: Sequence[XlsxColumn]) -> List[str]:
+    """Return the distinct background colors of the columns in column order"""
+    return list(
+        dict.fromkeys(
+            column.background_color for column in columns if column.background_color
+        )
+    )
+
+
+def get_column_styles(columns: Sequence[XlsxColumn]) -> List[int]:
+    """
+    Return the style index of each column. The styles after the default and the
+    header style have a thin border and a fill of each distinct background color.
+    """
+    colors = get_background_colors(columns)
+    return [
+        (
+            HEADER_STYLE + 1 + colors.index(column.background_color)
+            if column.background_color
+            else DEFAULT_STYLE
+        )
+        for column in columns
+    ]
+
+
+def render_styles(columns: Sequence[XlsxColumn]) -> str:
+    colors = get_background_colors(columns)
+    fills = "".join(
+        '<fill><patternFill patternType="solid">'
+        f'<fgColor rgb="{get_rgb_color(color)}"/><bgColor indexed="64"/>'
+        "</patternFill></fill>"
+        for color in colors
+    )
+    color_styles = "".join(
+        f'<xf numFmtId="0" fontId="0" fillId="{fill_id}" borderId="1" xfId="0"'
+        ' applyFill="1" applyBorder="1"/>'
+        # The first two fills are reserved by Excel
+        for fill_id in range(2, len(colors) + 2)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/'
+        'main">'
+        '<fonts count="2">'
+        '<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+        "</fonts>"
+        f'<fills count="{len(colors) + 2}">'
+        '<fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill>'
+        f"{fills}</fills>"
+        '<borders count="2">'
+        "<border><left/><right/><top/><bottom/><diagonal/></border>"
+        '<border><left style="thin"><color auto="1"/></left>'
+        '<right style="thin"><color auto="1"/></right>'
+        '<top style="thin"><color auto="1"/></top>'
+        '<bottom style="thin"><color auto="1"/></bottom><diagonal/></border>'
+        "</borders>"
+        '<cellStyleXfs count="1">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>'
+        "</cellStyleXfs>"
+        f'<cellXfs count="{len(colors) + 2}">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0"'
+        ' applyFont="1"/>'
+        f"{color_styles}</cellXfs>"
+        '<cellStyles count="1">'
+        '<cellStyle name="Normal" xfId="0" builtinId="0"/>'
+        "</cellStyles>"
+        "</styleSheet>"
+    )
+
+
+def render_columns(columns: Sequence[XlsxColumn], styles: List[int]) -> str:
+    cols = "".join(
+        f'<col min="{index}" max="{index}"'
+        + (
+            f' width="{column.width}" customWidth="1"'
+            if column.width
+            else ' width="9.140625"'
+        )
+        + (f' style="{style}"' if style != DEFAULT_STYLE else "")
+        + "/>"
+        for index, (column, style) in enumerate(zip(columns, styles), 1)
+    )
+    return f"<cols>{cols}</cols>" if cols else ""
+
+
+def _stream_xlsx(
+    columns: Sequence[XlsxColumn],
+    header: str,
+    rows: Iterable[Sequence],
+    sheet_name: str,
+    rows_per_chunk: int,
+) -> Iterator[bytes]:
+    styles = get_column_styles(columns)
+    letters = [get_column_letter(index) for index in range(len(columns))]
+    cell_types = [column.type for column in columns]
+
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
+        zf.writestr("_rels/.rels", ROOT_RELS_XML)
+        zf.writestr("xl/workbook.xml", WORKBOOK_XML.format(sheet_name=sheet_name))
+        zf.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS_XML)
+        zf.writestr("xl/styles.xml", render_styles(columns))
+        yield buffer.take()
+
+        with zf.open("xl/worksheets/sheet1.xml", mode="w") as worksheet:
+            worksheet.write(
+                (
+                    f"{WORKSHEET_START_XML}{render_columns(columns, styles)}"
+                    f'<sheetData><row r="1">{header}</row>'
+                ).encode()
+            )
+
+            chunk = []
+            for row_number, row in enumerate(rows, 2):
+                cells = "".join(
+                    _cell(f"{letter}{row_number}", style, cell_type, value)
+                    for letter, style, cell_type, value in zip(
+                        letters, styles, cell_types, row
+                    )
+                )
+                chunk.append(f'<row r="{row_number}">{cells}</row>')
+                if len(chunk) >= rows_per_chunk:
+                    worksheet.write("".join(chunk).encode())
+                    chunk.clear()
+                    if data := buffer.take():
+                        yield data
+            chunk.append("</sheetData></worksheet>")
+            worksheet.write("".join(chunk).encode())
+    yield buffer.take()
+
+
+def stream_xlsx(
+    columns: Sequence[XlsxColumn],
+    rows: Iterable[Sequence],
+    sheet_name: str,
+    rows_per_chunk: int = XLSX_ROWS_PER_CHUNK,
+) -> Iterator[bytes]:
+    """
+    Return an xlsx file of a single worksheet as an iterator of chunks, e.g. for a
+    StreamingHttpResponse.
+
+    The first row of the worksheet is a bold header of the column titles. The values
+    of each row are written in the order of the columns. The width and the
+    background color of each column are applied to the whole column, and the values
+    of the "int" columns are written as numbers. Everything else is written as
+    text, and None as an empty cell.
+
+    The column titles and the sheet name are translated right away in the active
+    language, while the rows are consumed only as the chunks are iterated.
+    """
+    header = "".join(
+        _string_cell(f"{get_column_letter(index)}1", HEADER_STYLE, str(column.title))
+        for index, column in enumerate(columns)
+    )
+    return _stream_xlsx(
+        columns, header, rows, quoteattr(str(sheet_name)), rows_per_chunk
+    )
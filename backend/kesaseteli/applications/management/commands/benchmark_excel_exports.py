@@ -0,0 +1,193 @@
+import io
+import time
+import tracemalloc
+from functools import partial
+
+import factory
+import xlsx_streaming
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils.translation import gettext_lazy as _
+from xlsxwriter import Workbook
+
+from applications.api.handler_excel_views import YouthApplicationExcelExportViewSet
+from applications.employer_excel_export import EmployerExcelExportService
+from applications.enums import EmployerApplicationStatus, ExcelColumns
+from applications.exporters.excel_exporter import (
+    generate_data_rows,
+    get_exportable_fields,
+)
+from applications.exporters.xlsx_writer import stream_xlsx
+from applications.models import SummerVoucherConfiguration
+from common.tests.factories import (
+    EmployerApplicationFactory,
+    EmployerSummerVoucherFactory,
+)
+
+
+def seed_summer_vouchers(number: int) -> list:
+    """
+    Create submitted employer summer vouchers, each with its own accepted youth
+    application
+    """
+    return EmployerSummerVoucherFactory.create_batch(
+        size=number,
+        application=factory.SubFactory(
+            EmployerApplicationFactory, status=EmployerApplicationStatus.SUBMITTED
+        ),
+    )
+
+
+def xlsx_streaming_template(fields, first_row, sheet_name) -> io.BytesIO:
+    """
+    Build the template of the xlsx_streaming package: a workbook with the header
+    and a single row, whose values the package infers the cell types from
+    """
+    output = io.BytesIO()
+    workbook = Workbook(output)
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({"bold": True})
+    for column, field in enumerate(fields):
+        worksheet.write(0, column, str(field.title), header_format)
+        if field.background_color:
+            cell_format = workbook.add_format(
+                {"border": 1, "bg_color": field.background_color}
+            )
+            worksheet.set_column(column, column, field.width, cell_format)
+        value = first_row[column]
+        if value in [None, ""]:
+            value = 0 if field.type == "int" else "placeholder value"
+        worksheet.write(1, column, value)
+    workbook.close()
+    return output
+
+
+def run_writer(export, repeat: int) -> dict:
+    """
+    Run the export and return the size, the best wall time, the peak memory use and
+    the throughput of it
+    """
+
+    def run():
+        rows, chunks = export()
+        size = sum(len(chunk) for chunk in chunks)
+        return rows, size
+
+    rows, size = run()
+    seconds = None
+    for _repeat in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    # Measured separately, as tracing the allocations slows down the export
+    tracemalloc.start()
+    try:
+        run()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "rows": rows,
+        "bytes": size,
+        "seconds": round(seconds, 4),
+        "peak_memory_bytes": peak_memory,
+        "rows_per_second": round(rows / seconds, 1) if seconds else None,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the employer and youth Excel exports with the streaming xlsx"
+        " writer against the template based xlsx_streaming package. The seeded"
+        " summer vouchers and applications are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number",
+            type=int,
+            default=500,
+            help="Number of employer summer vouchers and youth applications to seed",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of times each export is run, the best time is reported",
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/")
+        batch_size = settings.EXCEL_DOWNLOAD_BATCH_SIZE
+
+        with transaction.atomic():
+            summer_vouchers = seed_summer_vouchers(options["number"])
+            SummerVoucherConfiguration.objects.preload()
+
+            employer_queryset = EmployerExcelExportService.base_queryset(
+                filter_pks={summer_voucher.pk for summer_voucher in summer_vouchers}
+            )
+            employer_fields = get_exportable_fields(ExcelColumns.REPORTING)
+            employer_serializer = partial(
+                generate_data_rows, fields=employer_fields, request=request
+            )
+
+            youth_view = YouthApplicationExcelExportViewSet()
+            youth_queryset = youth_view.get_queryset().filter(
+                pk__in=[
+                    summer_voucher.youth_summer_voucher.youth_application_id
+                    for summer_voucher in summer_vouchers
+                ]
+            )
+            youth_fields = youth_view.excel_fields()
+
+            def xlsx_streaming_export(queryset, fields, serializer, sheet_name):
+                first_row = next(iter(serializer(queryset[0:1])))
+                chunks = xlsx_streaming.stream_queryset_as_xlsx(
+                    qs=queryset,
+                    xlsx_template=xlsx_streaming_template(
+                        fields, first_row, sheet_name
+                    ),
+                    serializer=serializer,
+                    batch_size=batch_size,
+                )
+                return queryset.count(), chunks
+
+            def xlsx_writer_export(queryset, fields, serializer, sheet_name):
+                rows = serializer(queryset.iterator(chunk_size=batch_size))
+                return queryset.count(), stream_xlsx(fields, rows, sheet_name)
+
+            exports = {
+                "employer": (
+                    employer_queryset,
+                    employer_fields,
+                    employer_serializer,
+                    str(_("Setelit")),
+                ),
+                "youth": (
+                    youth_queryset,
+                    youth_fields,
+                    youth_view.serializer,
+                    youth_view.worksheet_name,
+                ),
+            }
+            for name, arguments in exports.items():
+                for writer_name, writer in [
+                    ("xlsx_streaming", xlsx_streaming_export),
+                    ("xlsx_writer", xlsx_writer_export),
+                ]:
+                    result = run_writer(partial(writer, *arguments), options["repeat"])
+                    self.stdout.write(
+                        f"{name:>8} {writer_name:>14}: {result['rows']} rows,"
+                        f" {result['bytes'] / 1024:.0f} KiB,"
+                        f" {result['seconds'] * 1000:.1f} ms,"
+                        f" {result['rows_per_second']} rows/s,"
+                        f" peak memory {result['peak_memory_bytes'] / 1024:.0f} KiB"
+                    )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,172 @@
+import time
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.http import HttpRequest
+from django.test import RequestFactory
+from django.utils.translation import gettext_lazy as _
+
+from applications.employer_excel_export import EmployerExcelExportService
+from applications.enums import ExcelColumns
+from applications.exporters.excel_exporter import (
+    ExcelField,
+    generate_data_rows,
+    get_attachment_type_and_number,
+    get_attachment_uri,
+    get_exportable_fields,
+    get_youth_application,
+    ORDER_FIELD_TITLE,
+    RECEIVED_DATE_FIELD_TITLE,
+    resolve_target_group_and_status,
+)
+from applications.management.commands.benchmark_excel_exports import (
+    seed_summer_vouchers,
+)
+from applications.models import EmployerSummerVoucher, SummerVoucherConfiguration
+from common.utils import getattr_nested
+
+
+def resolve_cell_value(
+    value,
+    attr_str: str,
+    summer_voucher: EmployerSummerVoucher,
+    field: ExcelField,
+    request: HttpRequest,
+):
+    """
+    Resolve the special cases of the attribute value of a single cell, as the export
+    did before the fields were compiled
+    """
+    if isinstance(value, bool):
+        value = str(_("Kyllä")) if value else str(_("Ei"))
+    elif attr_str == "attachments":
+        attachment_type, attachment_number = get_attachment_type_and_number(field)
+        value = get_attachment_uri(
+            summer_voucher, value, attachment_type, attachment_number, request
+        )
+    elif "application__invoicer" in attr_str and getattr(
+        summer_voucher, "application", None
+    ):
+        value = value if summer_voucher.application.is_separate_invoicer else ""
+    elif attr_str == "target_group":
+        if not value:
+            youth_application = get_youth_application(summer_voucher)
+            value = resolve_target_group_and_status(youth_application)[0]
+    elif attr_str == "target_group_calculation_status":
+        youth_application = get_youth_application(summer_voucher)
+        value = resolve_target_group_and_status(youth_application)[1]
+    return value
+
+
+def generate_data_rows_per_cell(summer_vouchers, fields, request):
+    """
+    Generate the rows by resolving the attributes, the special cases and the
+    formatting of each field for every cell, as the export did before the fields
+    were compiled
+    """
+    for summer_voucher in summer_vouchers:
+        row = []
+        for field in fields:
+            if field.title == ORDER_FIELD_TITLE:
+                cell_value = summer_voucher.row_number
+            elif field.title == RECEIVED_DATE_FIELD_TITLE:
+                submitted_at = getattr(summer_voucher, "submitted_at", None)
+                cell_value = (
+                    submitted_at.astimezone().strftime("%d/%m/%Y")
+                    if submitted_at
+                    else ""
+                )
+            else:
+                values = []
+                for attr_str in field.model_fields:
+                    value = getattr_nested(summer_voucher, attr_str.split("__"))
+                    value = resolve_cell_value(
+                        value, attr_str, summer_voucher, field, request
+                    )
+                    values.append(value)
+                cell_value = field.value % tuple(values)
+                if field.type == "int" and cell_value.isdigit():
+                    cell_value = int(cell_value)
+            row.append(cell_value)
+        yield row
+
+
+def best_time(generate_rows, repeat: int) -> float:
+    seconds = None
+    for _repeat in range(repeat):
+        start = time.perf_counter()
+        for _row in generate_rows():
+            pass
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    return seconds
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the CPU time of generating the employer Excel export rows with the"
+        " compiled field accessors against resolving each cell separately. The rows"
+        " are generated from summer vouchers loaded in memory, so the database is not"
+        " measured. The seeded summer vouchers are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number",
+            type=int,
+            default=200,
+            help="Number of employer summer vouchers to seed",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of times the rows are generated, the best time is reported",
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/")
+
+        with transaction.atomic():
+            summer_vouchers = seed_summer_vouchers(options["number"])
+            SummerVoucherConfiguration.objects.preload()
+            summer_vouchers = list(
+                EmployerExcelExportService.base_queryset(
+                    filter_pks={summer_voucher.pk for summer_voucher in summer_vouchers}
+                )
+            )
+
+            for columns in ExcelColumns:
+                fields = get_exportable_fields(columns.value)
+                per_cell_rows = list(
+                    generate_data_rows_per_cell(summer_vouchers, fields, request)
+                )
+                compiled_rows = list(
+                    generate_data_rows(summer_vouchers, fields, request)
+                )
+                if compiled_rows != per_cell_rows:
+                    raise CommandError(
+                        f"The compiled {columns.value} rows differ from the rows"
+                        " resolved per cell"
+                    )
+
+                per_cell_seconds = best_time(
+                    partial(
+                        generate_data_rows_per_cell, summer_vouchers, fields, request
+                    ),
+                    options["repeat"],
+                )
+                compiled_seconds = best_time(
+                    partial(generate_data_rows, summer_vouchers, fields, request),
+                    options["repeat"],
+                )
+                rows = len(summer_vouchers)
+                self.stdout.write(
+                    f"{columns.value:>9}: {rows} rows, {len(fields)} columns,"
+                    f" per cell {per_cell_seconds / rows * 1e6:.1f} µs/row,"
+                    f" compiled {compiled_seconds / rows * 1e6:.1f} µs/row,"
+                    f" {per_cell_seconds / compiled_seconds:.1f}x faster"
+                )
+
+            transaction.set_rollback(True)
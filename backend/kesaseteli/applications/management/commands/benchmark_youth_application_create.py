@@ -0,0 +1,137 @@
+import math
+import secrets
+import threading
+import time
+from collections import Counter
+
+import factory
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from applications.api.v1.serializers import YouthApplicationSerializer
+from applications.models import YouthApplication
+from common.tests.factories import YouthApplicationFactory
+
+
+def get_percentile(sorted_values: list, percentile: int) -> float:
+    """
+    Return the nearest-rank percentile of the given sorted values
+    """
+    return sorted_values[max(0, math.ceil(len(sorted_values) * percentile / 100) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the youth application create endpoint by posting new applications"
+        " from concurrent clients, with VTJ disabled and the emails kept in memory."
+        " Reports the throughput, the latency percentiles and the response status"
+        " codes. The requests commit their applications, so the seeded and created"
+        " applications are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Number of youth applications to post",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Number of clients posting the youth applications concurrently",
+        )
+        parser.add_argument(
+            "--existing",
+            type=int,
+            default=1000,
+            help="Number of youth applications to seed before the benchmark",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive")
+
+        # All the seeded and posted applications use this prefix in their email, so
+        # they can be deleted afterwards
+        email_prefix = f"benchmark-{secrets.token_hex(4)}-"
+        try:
+            YouthApplicationFactory.create_batch(
+                size=options["existing"],
+                email=factory.Sequence(
+                    lambda n: f"{email_prefix}existing-{n}@example.org"
+                ),
+            )
+            payloads = [
+                YouthApplicationSerializer(
+                    YouthApplicationFactory.build(
+                        email=f"{email_prefix}{number}@example.org"
+                    )
+                ).data
+                for number in range(options["requests"])
+            ]
+            with override_settings(
+                NEXT_PUBLIC_DISABLE_VTJ=True,
+                NEXT_PUBLIC_MOCK_FLAG=False,
+                EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+            ):
+                seconds, results = self.post_concurrently(
+                    payloads, options["concurrency"]
+                )
+        finally:
+            YouthApplication.objects.filter(email__startswith=email_prefix).delete()
+
+        latencies = sorted(latency for _status_code, latency in results)
+        status_codes = Counter(status_code for status_code, _latency in results)
+        self.stdout.write(
+            f"{len(results)} requests, concurrency {options['concurrency']},"
+            f" {options['existing']} existing applications:"
+            f" {len(results) / seconds:.1f} requests/s,"
+            f" p50 {get_percentile(latencies, 50) * 1000:.1f} ms,"
+            f" p95 {get_percentile(latencies, 95) * 1000:.1f} ms,"
+            f" max {latencies[-1] * 1000:.1f} ms"
+        )
+        for status_code, count in sorted(status_codes.items()):
+            self.stdout.write(f"HTTP {status_code}: {count}")
+
+    @staticmethod
+    def post_concurrently(payloads: list, concurrency: int):
+        """
+        Post the payloads to the create endpoint from concurrent clients, each
+        using its own database connection.
+
+        :return: Wall time of posting all the payloads and the status code and the
+            latency of each request.
+        """
+        url = reverse("v1:youthapplication-list")
+        pending = iter(payloads)
+        lock = threading.Lock()
+        results = []
+
+        def post():
+            client = APIClient()
+            try:
+                while True:
+                    with lock:
+                        payload = next(pending, None)
+                    if payload is None:
+                        return
+                    start = time.perf_counter()
+                    response = client.post(url, payload, format="json")
+                    latency = time.perf_counter() - start
+                    with lock:
+                        results.append((response.status_code, latency))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post) for _thread in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start, results
@@ -1,7 +1,10 @@
+from contextlib import nullcontext
+
 from django.core.management.base import BaseCommand
 
 from applications.enums import YouthApplicationStatus
 from applications.models import YouthApplication
+from applications.services import EmailBatchSender
 
 
 class Command(BaseCommand):
@@ -23,26 +26,35 @@ class Command(BaseCommand):
             # Only a single voucher is sent
             apps = apps.filter(id=id)
 
-        for app in apps:
-            if app.has_youth_summer_voucher:
-                if dry_run:
-                    ok = True
-                else:
-                    ok = app.youth_summer_voucher.send_youth_summer_voucher_email(
-                        language=app.language, send_to_youth=False, send_to_handler=True
-                    )
-
-                if ok:
-                    self.stdout.write(self.style.SUCCESS(f"Sent {app.id}"))
+        # No mail server connection is opened on a dry run
+        with nullcontext() if dry_run else EmailBatchSender() as email_sender:
+            for app in apps.select_related("youth_summer_voucher"):
+                if app.has_youth_summer_voucher:
+                    if dry_run:
+                        ok = True
+                    else:
+                        voucher = app.youth_summer_voucher
+                        ok = voucher.send_youth_summer_voucher_email(
+                            language=app.language,
+                            send_to_youth=False,
+                            send_to_handler=True,
+                            email_sender=email_sender,
+                        )
+
+                    if ok:
+                        self.stdout.write(self.style.SUCCESS(f"Sent {app.id}"))
+                    else:
+                        self.stdout.write(
+                            self.style.ERROR(
+                                f"EMAIL ERROR: {app.pk} failed when sending!"
+                            )
+                        )
                 else:
                     self.stdout.write(
-                        self.style.ERROR(f"EMAIL ERROR: {app.pk} failed when sending!")
-                    )
-            else:
-                self.stdout.write(
-                    self.style.ERROR(
-                        f"VOUCHER ERROR: {app.pk} does not have a youth summer voucher!"
+                        self.style.ERROR(
+                            f"VOUCHER ERROR: {app.pk} does not have a youth summer"
+                            " voucher!"
+                        )
                     )
-                )
 
         self.stdout.write(self.style.SUCCESS(f"Processed {apps.count()} vouchers"))
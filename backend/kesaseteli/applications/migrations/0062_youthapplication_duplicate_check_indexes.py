@@ -0,0 +1,28 @@
+# Generated by Django 5.2.15 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0061_timelineactivitylog"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="youthapplication",
+            index=models.Index(
+                condition=models.Q(("status", "rejected"), _negated=True),
+                fields=["email", "created_at"],
+                name="youth_app_email_created_at_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="youthapplication",
+            index=models.Index(
+                condition=models.Q(("status", "rejected"), _negated=True),
+                fields=["social_security_number", "created_at"],
+                name="youth_app_ssn_created_at_idx",
+            ),
+        ),
+    ]
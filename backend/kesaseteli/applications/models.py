@@ -1,8 +1,11 @@
 import json
 import logging
 import secrets
+import threading
+import time
 from datetime import date, datetime, timedelta
 from email.mime.image import MIMEImage
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from urllib.parse import quote, urljoin
@@ -14,7 +17,7 @@ from django.contrib.postgres.fields import ArrayField
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.validators import MinValueValidator
 from django.db import IntegrityError, models, transaction
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.urls import reverse
 from django.utils import timezone, translation
 from django.utils.translation import gettext_lazy as _
@@ -31,6 +34,7 @@ from applications.enums import (
     EmployerApplicationStatus,
     HiredWithoutVoucherAssessment,
     JobType,
+    YouthApplicationRejectedReason,
     YouthApplicationStatus,
 )
 from applications.target_groups import get_target_group_choices
@@ -75,6 +79,101 @@ class School(TimeStampedModel, UUIDModel):
         ordering = ["name"]
 
 
+class SummerVoucherConfigurationCache:
+    """
+    Process-level cache of the summer voucher configurations by year.
+
+    A configuration that does not exist is cached as None. The cache is cleared by
+    the save and delete signals of SummerVoucherConfiguration, and expires after
+    settings.SUMMER_VOUCHER_CONFIGURATION_CACHE_TIMEOUT seconds so that changes made
+    in other processes are picked up as well.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._reset()
+
+    def _reset(self):
+        self._generation += 1
+        self._configurations_by_year = {}
+        self._all_years_loaded = False
+        self._expires_at = None
+
+    def _expire(self):
+        if self._expires_at is not None and time.monotonic() >= self._expires_at:
+            self._reset()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    @property
+    def generation(self) -> int:
+        """
+        Counter that is increased whenever the cache is cleared. It is read before
+        fetching configurations and passed to set() along with them.
+        """
+        with self._lock:
+            self._expire()
+            return self._generation
+
+    def get(self, year: int):
+        """
+        Return a (is_cached, configuration) tuple for the given year.
+        """
+        with self._lock:
+            self._expire()
+            if year in self._configurations_by_year or self._all_years_loaded:
+                return True, self._configurations_by_year.get(year)
+            return False, None
+
+    def set(self, configurations_by_year: dict, generation: int, all_years=False):
+        """
+        Cache the configurations unless the cache has been cleared after they were
+        fetched.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            if self._expires_at is None:
+                timeout = settings.SUMMER_VOUCHER_CONFIGURATION_CACHE_TIMEOUT
+                self._expires_at = time.monotonic() + timeout
+            if all_years:
+                self._configurations_by_year = dict(configurations_by_year)
+                self._all_years_loaded = True
+            else:
+                self._configurations_by_year.update(configurations_by_year)
+
+
+class SummerVoucherConfigurationManager(models.Manager):
+    cache = SummerVoucherConfigurationCache()
+
+    def get_for_year(self, year: int) -> Optional["SummerVoucherConfiguration"]:
+        """
+        Return the cached configuration of the given year, or None if there is none.
+        """
+        generation = self.cache.generation
+        is_cached, configuration = self.cache.get(year)
+        if is_cached:
+            return configuration
+        configuration = self.filter(year=year).first()
+        self.cache.set({year: configuration}, generation=generation)
+        return configuration
+
+    def preload(self):
+        """
+        Load the configurations of all the years into the cache with one query, so
+        that e.g. exporting summer vouchers does not query them one year at a time.
+        """
+        generation = self.cache.generation
+        self.cache.set(
+            {configuration.year: configuration for configuration in self.all()},
+            generation=generation,
+            all_years=True,
+        )
+
+
 class SummerVoucherConfiguration(TimeStampedModel, UUIDModel):
     year = models.IntegerField(
         unique=True, verbose_name=_("year"), validators=[MinValueValidator(2020)]
@@ -97,6 +196,8 @@ class SummerVoucherConfiguration(TimeStampedModel, UUIDModel):
         verbose_name=_("minimum work hours"),
     )
 
+    objects = SummerVoucherConfigurationManager()
+
     def __str__(self):
         return f"{self.year} ({', '.join(self.target_group)})"
 
@@ -207,6 +308,43 @@ class YouthApplicationQuerySet(MatchesAnyOfQuerySet, models.QuerySet):
             .exists()
         )
 
+    def get_duplicate_rejected_reason_this_year(
+        self, email, social_security_number
+    ) -> Optional[YouthApplicationRejectedReason]:
+        """
+        Get the reason to reject a new youth application with the given email and
+        social security number because of the youth applications created this year
+        present in this queryset, checking both
+        is_email_or_social_security_number_active_this_year and
+        is_email_used_this_year in a single query.
+
+        The query is served by the partial (email, created_at) and
+        (social_security_number, created_at) indexes of non-rejected youth
+        applications.
+
+        :return: YouthApplicationRejectedReason.ALREADY_ASSIGNED if the email
+            and/or social security number is used by an active non-rejected youth
+            application created this year,
+            YouthApplicationRejectedReason.EMAIL_IN_USE if the email is used by an
+            unexpired non-rejected youth application created this year, otherwise
+            None.
+        """
+        counts = (
+            self.matches_email_or_social_security_number(email, social_security_number)
+            .created_this_year()
+            .unexpired_or_active()
+            .non_rejected()
+            .aggregate(
+                active=Count("pk", filter=self._active_q_filter()),
+                email_used=Count("pk", filter=Q(email=email)),
+            )
+        )
+        if counts["active"]:
+            return YouthApplicationRejectedReason.ALREADY_ASSIGNED
+        if counts["email_used"]:
+            return YouthApplicationRejectedReason.EMAIL_IN_USE
+        return None
+
 
 def get_social_security_number_hash_key():
     """
@@ -740,12 +878,23 @@ class YouthApplication(LockForUpdateMixin, TimeStampedModel, UUIDModel):
     def vtj_json(self) -> Optional[dict]:
         """
         Return the decrypted VTJ JSON data as a dictionary.
+
+        The parsed data is cached on the instance until the VTJ JSON fields are
+        changed, so the returned dictionary must not be modified.
         """
         vtj_json = self.encrypted_handler_vtj_json or self.encrypted_original_vtj_json
+        cached_vtj_json, cached_vtj_json_dict = getattr(
+            self, "_vtj_json_cache", (None, None)
+        )
+        # Strings are immutable, so the same object means that the JSON is unchanged
+        if vtj_json is not None and vtj_json is cached_vtj_json:
+            return cached_vtj_json_dict
         try:
-            return json.loads(vtj_json)
+            vtj_json_dict = json.loads(vtj_json)
         except (json.decoder.JSONDecodeError, TypeError):
-            return None
+            vtj_json_dict = None
+        self._vtj_json_cache = (vtj_json, vtj_json_dict)
+        return vtj_json_dict
 
     @property
     def is_social_security_number_valid_according_to_vtj(self) -> bool:
@@ -933,6 +1082,16 @@ class YouthApplication(LockForUpdateMixin, TimeStampedModel, UUIDModel):
             models.Index(fields=["email"]),
             models.Index(fields=["receipt_confirmed_at"]),
             models.Index(fields=["social_security_number"]),
+            models.Index(
+                fields=["email", "created_at"],
+                condition=~Q(status=YouthApplicationStatus.REJECTED.value),
+                name="youth_app_email_created_at_idx",
+            ),
+            models.Index(
+                fields=["social_security_number", "created_at"],
+                condition=~Q(status=YouthApplicationStatus.REJECTED.value),
+                name="youth_app_ssn_created_at_idx",
+            ),
         ]
         ordering = ["-created_at"]
 
@@ -1089,7 +1248,10 @@ class YouthSummerVoucher(TimeStampedModel, UUIDModel):
         return self.youth_application.created_at.year
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def _template_image(filename, content_id) -> MIMEImage:
+        # The images are read only once, and the same MIME part is attached to
+        # every email using it
         source_folder = Path(__file__).resolve().parent / "templates" / "images"
         with open(source_folder / filename, "rb") as file:
             data = file.read()
@@ -1137,16 +1299,14 @@ class YouthSummerVoucher(TimeStampedModel, UUIDModel):
         NOTE: API view raises an error if configuration is missing while creating
         youth application.
         """
-        try:
-            return SummerVoucherConfiguration.objects.get(
-                year=year
-            ).voucher_value_in_euros
-        except SummerVoucherConfiguration.DoesNotExist:
+        config = SummerVoucherConfiguration.objects.get_for_year(year)
+        if config is None:
             LOGGER.warning(
                 "No SummerVoucherConfiguration found for year %s",
                 year,
             )
             return settings.SUMMER_VOUCHER_DEFAULT_VOUCHER_VALUE
+        return config.voucher_value_in_euros
 
     @property
     def voucher_value_in_euros(self) -> int:
@@ -1192,14 +1352,14 @@ class YouthSummerVoucher(TimeStampedModel, UUIDModel):
         NOTE: API view raises an error if configuration is missing while creating
         youth application.
         """
-        try:
-            return SummerVoucherConfiguration.objects.get(year=self.year).min_work_hours
-        except SummerVoucherConfiguration.DoesNotExist:
+        config = SummerVoucherConfiguration.objects.get_for_year(self.year)
+        if config is None:
             LOGGER.warning(
                 "No SummerVoucherConfiguration found for year %s",
                 self.year,
             )
             return settings.SUMMER_VOUCHER_DEFAULT_MIN_WORK_HOURS
+        return config.min_work_hours
 
     @staticmethod
     def min_work_compensation_in_euros_in_year(year: int) -> int:
@@ -1210,16 +1370,14 @@ class YouthSummerVoucher(TimeStampedModel, UUIDModel):
         NOTE: API view raises an error if configuration is missing while creating
         youth application.
         """
-        try:
-            return SummerVoucherConfiguration.objects.get(
-                year=year
-            ).min_work_compensation_in_euros
-        except SummerVoucherConfiguration.DoesNotExist:
+        config = SummerVoucherConfiguration.objects.get_for_year(year)
+        if config is None:
             LOGGER.warning(
                 "No SummerVoucherConfiguration found for year %s",
                 year,
             )
             return settings.SUMMER_VOUCHER_DEFAULT_MIN_WORK_COMPENSATION
+        return config.min_work_compensation_in_euros
 
     @property
     def min_work_compensation_in_euros(self) -> int:
@@ -1238,7 +1396,7 @@ class YouthSummerVoucher(TimeStampedModel, UUIDModel):
         return self._value_with_euro_sign(self.min_work_compensation_in_euros)
 
     def send_youth_summer_voucher_email(
-        self, language, send_to_youth=True, send_to_handler=True
+        self, language, send_to_youth=True, send_to_handler=True, email_sender=None
     ) -> bool:
         """
         Send youth summer voucher email with given language to the applicant.
@@ -1246,6 +1404,8 @@ class YouthSummerVoucher(TimeStampedModel, UUIDModel):
         :param language: The language to be used in the email
         :param send_to_youth: Send the voucher to youth's email
         :param send_to_handler: Send a copy of the voucher to the handler email
+        :param email_sender: Optional EmailBatchSender to send the email with as a
+            part of a batch
         :return: True if email was sent, otherwise False.
         """
         recipient_list = [self.youth_application.email] if send_to_youth else None
@@ -1289,6 +1449,7 @@ class YouthSummerVoucher(TimeStampedModel, UUIDModel):
                     self.helsinki_logo(language=language),
                     self.youth_summer_voucher_logo(language=language),
                 ],
+                email_sender=email_sender,
             )
 
     def __str__(self):
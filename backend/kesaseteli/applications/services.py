@@ -1,7 +1,10 @@
 import json
 import logging
+import threading
+from concurrent.futures import Future
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
 import jsonpath_ng
@@ -10,6 +13,8 @@ from auditlog.models import LogEntry
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.mail import get_connection
 from django.template import Context, Template
 from django.template.exceptions import TemplateDoesNotExist
 from django.template.loader import get_template
@@ -39,7 +44,12 @@ from applications.tests.data.mock_vtj import (
     mock_vtj_person_id_query_not_found_content,
     mock_vtj_person_id_query_restricted_content,
 )
-from common.utils import are_same_texts, html_to_text, send_mail_with_error_logging
+from common.utils import (
+    are_same_texts,
+    build_email,
+    html_to_text,
+    send_mail_with_error_logging,
+)
 from shared.vtj.vtj_client import VTJClient
 
 LOGGER = logging.getLogger(__name__)
@@ -65,19 +75,115 @@ class TargetGroupValidationService:
             return False
 
         # Check if the target group is enabled for the year
-        try:
-            config = SummerVoucherConfiguration.objects.get(
-                year=application.created_at.year
-            )
-            if application.target_group not in config.target_group:
-                return False
-        except SummerVoucherConfiguration.DoesNotExist:
+        config = SummerVoucherConfiguration.objects.get_for_year(
+            application.created_at.year
+        )
+        if config is None or application.target_group not in config.target_group:
             return False
 
         # Check if the applicant actually belongs to this target group
         return target_group_class().is_valid(application)
 
 
+# Compiled subject, text body and html body templates by EmailTemplate id, along
+# with the modified_at timestamp of the compiled version
+_compiled_email_templates: dict = {}
+
+
+def _compile_email_template(template: EmailTemplate) -> tuple:
+    """
+    Return the compiled (subject, text_body, html_body) templates of the email
+    template, compiling them only once per template version.
+    """
+    modified_at, compiled = _compiled_email_templates.get(template.pk, (None, None))
+    if compiled is None or modified_at != template.modified_at:
+        compiled = (
+            Template(template.subject),
+            Template(template.text_body),
+            Template(template.html_body),
+        )
+        _compiled_email_templates[template.pk] = (template.modified_at, compiled)
+    return compiled
+
+
+@dataclass(frozen=True)
+class EmailFailure:
+    recipient_list: list
+    bcc: list
+    error: str
+
+
+class EmailBatchSender:
+    """
+    Send a batch of emails from the database templates over one mail server
+    connection.
+
+    The email templates are loaded once per batch and failures are collected per
+    message into failures. Use as a context manager to open and close the
+    connection:
+
+        with EmailBatchSender() as email_sender:
+            for voucher in vouchers:
+                voucher.send_youth_summer_voucher_email(
+                    language, email_sender=email_sender
+                )
+    """
+
+    def __init__(self):
+        self.connection = get_connection()
+        self.failures: list[EmailFailure] = []
+        self._templates: dict = {}
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        try:
+            self.connection.open()
+        except Exception:
+            # The connection is opened again for each message until it succeeds
+            LOGGER.exception("Unable to open email connection")
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception:
+            LOGGER.exception("Unable to close email connection")
+
+    def get_template(self, template_type: str, language: str) -> EmailTemplate:
+        key = (template_type, language)
+        if key not in self._templates:
+            self._templates[key] = EmailTemplate.objects.get(
+                type=template_type, language=language
+            )
+        return self._templates[key]
+
+    def send(self, mail, error_message) -> bool:
+        """
+        Send the email over the shared connection and record a failure with the
+        given error message if it is not sent.
+        """
+        try:
+            sent = self.connection.send_messages([mail]) > 0
+            error = "" if sent else str(error_message)
+        except Exception as e:
+            # Start over with a new connection in case the failure broke it
+            self.close()
+            self.open()
+            sent = False
+            error = f"{error_message}: {e}"
+        if not sent:
+            LOGGER.error(error)
+            self.failures.append(
+                EmailFailure(recipient_list=mail.to, bcc=mail.bcc, error=error)
+            )
+        return sent
+
+
 class EmailTemplateService:
     @staticmethod
     def get_template_lines_from_file(template: EmailTemplate) -> list[str] | None:
@@ -231,9 +337,19 @@ class EmailTemplateService:
         error_message: str,
         bcc=None,
         images=None,
+        email_sender: Optional[EmailBatchSender] = None,
     ) -> bool:
+        """
+        Render the email template of given type and language with the context and
+        send it. If email_sender is given, the email is sent as a part of its batch.
+        """
         try:
-            template = EmailTemplate.objects.get(type=template_type, language=language)
+            if email_sender:
+                template = email_sender.get_template(template_type, language)
+            else:
+                template = EmailTemplate.objects.get(
+                    type=template_type, language=language
+                )
         except EmailTemplate.DoesNotExist:
             LOGGER.error(
                 f"EmailTemplate not found for type {template_type} and "
@@ -242,10 +358,26 @@ class EmailTemplateService:
             return False
 
         django_context = Context(context)
-        subject = Template(template.subject).render(django_context)
-        body = Template(template.text_body).render(django_context)
-        html_body = Template(template.html_body).render(django_context)
-
+        subject_template, body_template, html_body_template = _compile_email_template(
+            template
+        )
+        subject = subject_template.render(django_context)
+        body = body_template.render(django_context)
+        html_body = html_body_template.render(django_context)
+
+        if email_sender:
+            return email_sender.send(
+                build_email(
+                    subject=subject,
+                    message=body,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=recipient_list,
+                    bcc=bcc,
+                    html_message=html_body,
+                    images=images,
+                ),
+                error_message=error_message,
+            )
         return send_mail_with_error_logging(
             subject=subject,
             message=body,
@@ -259,6 +391,16 @@ class EmailTemplateService:
 
 
 class SchoolService:
+    LIST_CACHE_KEY = "applications:school_list"
+
+    @staticmethod
+    def clear_school_list_cache():
+        """
+        Clear the cached school list served by SchoolListView after the schools
+        have been changed.
+        """
+        cache.delete(SchoolService.LIST_CACHE_KEY)
+
     @staticmethod
     def import_schools(school_names: list[str]) -> tuple[int, int]:
         """
@@ -276,6 +418,8 @@ class SchoolService:
                     created_count += 1
                 else:
                     existing_count += 1
+        if created_count:
+            SchoolService.clear_school_list_cache()
         return created_count, existing_count
 
 
@@ -327,12 +471,25 @@ class AuditAccessLogService:
         )
 
 
+@lru_cache(maxsize=128)
+def _parse_jsonpath(expression: str):
+    """Compile the JSONPath expression only once, as parsing it is slow."""
+    return jsonpath_ng.parse(expression)
+
+
 class VTJService:
     """
     Service for interacting with the Finnish Population Information System (VTJ)
     and processing its responses.
     """
 
+    QUERY_CACHE_KEY_PREFIX = "applications:vtj_json"
+
+    # Results of the VTJ queries in progress in this process by their cache key, so
+    # that concurrent identical queries wait for the same query to finish
+    _queries_in_progress: dict[str, Future] = {}
+    _queries_in_progress_lock = threading.Lock()
+
     @classmethod
     def get_vtj_test_case(cls, last_name: str) -> str:
         """Find the matching VTJ test case based on last name."""
@@ -404,13 +561,69 @@ class VTJService:
             return mock_vtj_person_id_query_not_found_content()
 
         try:
-            vtj_data = VTJClient().get_personal_info(
-                application.social_security_number, end_user
-            )
+            return cls.query_vtj_json(application.social_security_number, end_user)
         except (RequestException, ValueError) as e:
             sentry_sdk.capture_exception(e)
             raise VTJServiceUnavailableError() from e
-        return json.dumps(vtj_data)
+
+    @classmethod
+    def _get_query_cache_key(cls, social_security_number: str, end_user: str) -> str:
+        """
+        Get the cache key of the VTJ query, which uses the keyed hash of the social
+        security number like YouthApplication.social_security_number does.
+        """
+        social_security_number_hash = YouthApplication._meta.get_field(
+            "social_security_number"
+        ).get_prep_value(social_security_number)
+        return f"{cls.QUERY_CACHE_KEY_PREFIX}:{social_security_number_hash}:{end_user}"
+
+    @classmethod
+    def query_vtj_json(cls, social_security_number: str, end_user: str) -> str:
+        """
+        Query the VTJ JSON of the given social security number for the given end
+        user from VTJ.
+
+        The result is cached encrypted for settings.VTJ_CACHE_TIMEOUT seconds, and
+        concurrent identical queries in this process wait for the result of the
+        first one instead of querying VTJ again. So the vtj_queried and
+        vtj_query_failed signals are sent only for the queries actually made to VTJ.
+        """
+        cache_key = cls._get_query_cache_key(social_security_number, end_user)
+        encrypted_field = YouthApplication._meta.get_field(
+            "encrypted_original_vtj_json"
+        )
+        if settings.VTJ_CACHE_TIMEOUT:
+            encrypted_vtj_json = cache.get(cache_key)
+            if encrypted_vtj_json is not None:
+                return encrypted_field.decrypt(encrypted_vtj_json)
+
+        with cls._queries_in_progress_lock:
+            query = cls._queries_in_progress.get(cache_key)
+            is_query_in_progress = query is not None
+            if not is_query_in_progress:
+                query = cls._queries_in_progress[cache_key] = Future()
+        if is_query_in_progress:
+            return query.result()
+
+        try:
+            vtj_json = json.dumps(
+                VTJClient().get_personal_info(social_security_number, end_user)
+            )
+            if settings.VTJ_CACHE_TIMEOUT:
+                cache.set(
+                    cache_key,
+                    encrypted_field.encrypt(vtj_json),
+                    settings.VTJ_CACHE_TIMEOUT,
+                )
+        except Exception as e:
+            query.set_exception(e)
+            raise
+        else:
+            query.set_result(vtj_json)
+            return vtj_json
+        finally:
+            with cls._queries_in_progress_lock:
+                del cls._queries_in_progress[cache_key]
 
     @classmethod
     def is_response_restricted(cls, vtj_json_dict: dict) -> bool:
@@ -502,7 +715,7 @@ class VTJService:
         """Internal helper to find values in VTJ JSON using JSONPath."""
         if not vtj_json_dict:
             return []
-        matches = jsonpath_ng.parse(expression).find(vtj_json_dict)
+        matches = _parse_jsonpath(expression).find(vtj_json_dict)
         return [match.value for match in matches]
 
 
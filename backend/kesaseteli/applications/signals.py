@@ -1,10 +1,12 @@
 from auditlog_extra.context import get_actor
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from applications.models import (
     EmployerApplication,
+    SummerVoucherConfiguration,
     TimelineActivityLog,
     YouthApplication,
 )
@@ -114,3 +116,15 @@ def track_application_status_change(
     if update_fields is not None and "status" not in update_fields:
         return
     _track_status_change(sender._meta.model_name, instance)
+
+
+@receiver(post_save, sender=SummerVoucherConfiguration)
+@receiver(post_delete, sender=SummerVoucherConfiguration)
+def clear_summer_voucher_configuration_cache(sender, **kwargs):
+    """
+    Clear the cached configurations when a configuration changes. The cache is
+    cleared again after the transaction commits, so that a value read between the
+    change and the commit is not kept.
+    """
+    sender.objects.cache.clear()
+    transaction.on_commit(sender.objects.cache.clear)
@@ -10,7 +10,7 @@ from django.conf import settings
 from django.urls import clear_url_caches
 from langdetect import DetectorFactory
 
-from applications.services import EmailTemplateService
+from applications.services import EmailTemplateService, SchoolService
 from applications.tests.factories import SummerVoucherConfigurationFactory
 from common.tests.conftest import *  # noqa
 
@@ -20,6 +20,9 @@ def setup_test_environment(settings):
     DetectorFactory.seed = 0
     factory.random.reseed_random("888")
     random.seed(888)
+    SchoolService.clear_school_list_cache()
+    # The factories create the same social security numbers in every test
+    settings.VTJ_CACHE_TIMEOUT = 0
 
 
 @pytest.fixture
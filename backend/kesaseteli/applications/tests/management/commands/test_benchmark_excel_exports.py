@@ -0,0 +1,30 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from applications.models import EmployerSummerVoucher, YouthApplication
+
+
+@pytest.mark.django_db
+def test_benchmark_excel_exports():
+    summer_voucher_count = EmployerSummerVoucher.objects.count()
+    youth_application_count = YouthApplication.objects.count()
+
+    out = StringIO()
+    call_command(
+        "benchmark_excel_exports", "--number", "2", "--repeat", "1", stdout=out
+    )
+
+    # The seeded summer vouchers and applications are rolled back
+    assert EmployerSummerVoucher.objects.count() == summer_voucher_count
+    assert YouthApplication.objects.count() == youth_application_count
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 4
+    for export in ["employer", "youth"]:
+        for writer in ["xlsx_streaming", "xlsx_writer"]:
+            assert any(
+                line.split()[:2] == [export, f"{writer}:"] and "2 rows" in line
+                for line in lines
+            ), (export, writer)
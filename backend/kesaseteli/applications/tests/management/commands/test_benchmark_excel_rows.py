@@ -0,0 +1,23 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from applications.enums import ExcelColumns
+from applications.models import EmployerSummerVoucher
+
+
+@pytest.mark.django_db
+def test_benchmark_excel_rows():
+    summer_voucher_count = EmployerSummerVoucher.objects.count()
+
+    out = StringIO()
+    # The command fails if the compiled rows differ from the rows resolved per cell
+    call_command("benchmark_excel_rows", "--number", "3", "--repeat", "1", stdout=out)
+
+    # The seeded summer vouchers are rolled back
+    assert EmployerSummerVoucher.objects.count() == summer_voucher_count
+
+    lines = out.getvalue().splitlines()
+    assert [line.split(":")[0].strip() for line in lines] == ExcelColumns.values
+    assert all("3 rows" in line for line in lines)
@@ -0,0 +1,31 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from applications.models import YouthApplication
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_youth_application_create():
+    youth_application_count = YouthApplication.objects.count()
+
+    out = StringIO()
+    call_command(
+        "benchmark_youth_application_create",
+        "--requests",
+        "6",
+        "--concurrency",
+        "3",
+        "--existing",
+        "2",
+        stdout=out,
+    )
+
+    # The seeded and created applications are deleted
+    assert YouthApplication.objects.count() == youth_application_count
+
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("6 requests, concurrency 3, 2 existing applications:")
+    assert "requests/s" in lines[0]
+    assert lines[1:] == ["HTTP 201: 6"]
@@ -0,0 +1,27 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+from common.tests.factories import YouthSummerVoucherFactory
+
+
+@pytest.mark.django_db
+def test_send_vouchers_to_handlers_dry_run_does_not_connect():
+    voucher = YouthSummerVoucherFactory()
+
+    out = StringIO()
+    with mock.patch("applications.services.get_connection") as mock_get_connection:
+        call_command(
+            "send_vouchers_to_handlers",
+            "--dry-run",
+            "--id",
+            str(voucher.youth_application.pk),
+            stdout=out,
+        )
+
+    mock_get_connection.assert_not_called()
+    assert len(mail.outbox) == 0
+    assert f"Sent {voucher.youth_application.pk}" in out.getvalue()
@@ -1,8 +1,12 @@
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from unittest import mock
 
 import pytest
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.core.cache import cache
 from django.test import override_settings, RequestFactory
 from requests.exceptions import ConnectionError as RequestsConnectionError
 from resilient_logger.models import ResilientLogEntry
@@ -14,6 +18,7 @@ from common.tests.factories import (
     YouthApplicationFactory,
 )
 from kesaseteli.auth_logging import AuthEventType, VtjQueryType
+from shared.vtj.signals import vtj_queried
 
 pytestmark = pytest.mark.django_db
 
@@ -35,7 +40,7 @@ def test_fetch_vtj_json_logs_vtj_query():
         "Henkilo": {"Henkilotunnus": {"value": application.social_security_number}}
     }
 
-    with mock.patch("shared.vtj.vtj_client.requests.post") as mock_post:
+    with mock.patch("shared.vtj.vtj_client.requests.Session.post") as mock_post:
         mock_response = mock.Mock()
         mock_response.json.return_value = vtj_response
         mock_post.return_value = mock_response
@@ -69,7 +74,7 @@ def test_fetch_vtj_json_logs_vtj_query_failure_on_api_error():
     end_user = "test-handler-uuid"
 
     with mock.patch(
-        "shared.vtj.vtj_client.requests.post",
+        "shared.vtj.vtj_client.requests.Session.post",
         side_effect=RequestsConnectionError("Connection refused"),
     ):
         with pytest.raises(VTJServiceUnavailableError):
@@ -102,7 +107,7 @@ def test_fetch_vtj_json_no_log_when_logging_disabled():
     application = YouthApplicationFactory()
     vtj_response = {"Henkilo": {}}
 
-    with mock.patch("shared.vtj.vtj_client.requests.post") as mock_post:
+    with mock.patch("shared.vtj.vtj_client.requests.Session.post") as mock_post:
         mock_response = mock.Mock()
         mock_response.json.return_value = vtj_response
         mock_post.return_value = mock_response
@@ -166,3 +171,127 @@ def test_on_user_logged_out_does_not_log_if_anonymous_or_none(user):
         ).count()
         == 0
     )
+
+
+VTJ_QUERY_SETTINGS = {
+    "NEXT_PUBLIC_MOCK_FLAG": False,
+    "NEXT_PUBLIC_DISABLE_VTJ": False,
+    "ENABLE_AUTH_LOGGING": True,
+    "VTJ_USERNAME": "test_user",
+    "VTJ_PASSWORD": "test_password",
+    "VTJ_TIMEOUT": 30,
+    "VTJ_PERSONAL_ID_QUERY_URL": "https://example.com/vtj",
+    "VTJ_CACHE_TIMEOUT": 60,
+}
+
+
+def get_vtj_query_log_entries():
+    return ResilientLogEntry.objects.filter(context__operation=AuthEventType.VTJ_QUERY)
+
+
+@override_settings(**VTJ_QUERY_SETTINGS)
+def test_fetch_vtj_json_caches_vtj_query_encrypted():
+    """Repeated VTJ queries are served encrypted from the cache and logged once."""
+    cache.clear()
+    application = YouthApplicationFactory()
+    vtj_response = {
+        "Henkilo": {"Henkilotunnus": {"value": application.social_security_number}}
+    }
+
+    with mock.patch("shared.vtj.vtj_client.requests.Session.post") as mock_post:
+        mock_post.return_value.json.return_value = vtj_response
+        vtj_jsons = [
+            VTJService.fetch_vtj_json(application, end_user="handler") for _ in range(3)
+        ]
+        assert mock_post.call_count == 1
+
+        # Queries of other end users are not served from the cache
+        VTJService.fetch_vtj_json(application, end_user="other-handler")
+        assert mock_post.call_count == 2
+
+    assert vtj_jsons == [json.dumps(vtj_response)] * 3
+    assert get_vtj_query_log_entries().count() == 2
+
+    cache_key = VTJService._get_query_cache_key(
+        application.social_security_number, "handler"
+    )
+    assert application.social_security_number not in cache_key
+    cached_value = cache.get(cache_key)
+    assert isinstance(cached_value, bytes)
+    assert application.social_security_number.encode() not in cached_value
+
+
+@override_settings(**VTJ_QUERY_SETTINGS)
+def test_fetch_vtj_json_does_not_cache_failed_vtj_query():
+    """Failed VTJ queries are not cached, so each of them is logged."""
+    cache.clear()
+    application = YouthApplicationFactory()
+
+    with mock.patch(
+        "shared.vtj.vtj_client.requests.Session.post",
+        side_effect=RequestsConnectionError("Connection refused"),
+    ) as mock_post:
+        for _ in range(2):
+            with pytest.raises(VTJServiceUnavailableError):
+                VTJService.fetch_vtj_json(application, end_user="handler")
+
+    assert mock_post.call_count == 2
+    assert [entry.context["success"] for entry in get_vtj_query_log_entries()] == [
+        False,
+        False,
+    ]
+
+
+@override_settings(
+    **{**VTJ_QUERY_SETTINGS, "ENABLE_AUTH_LOGGING": False, "VTJ_CACHE_TIMEOUT": 0}
+)
+def test_query_vtj_json_coalesces_concurrent_identical_queries():
+    """Concurrent identical VTJ queries wait for a single query to VTJ."""
+    social_security_number = "111111A111C"
+    thread_count = 4
+    vtj_response = {"Henkilo": {}}
+    queried = []
+    is_vtj_responding = threading.Event()
+    waiting_queries = threading.Semaphore(0)
+    future_result = Future.result
+
+    def post(*args, **kwargs):
+        is_vtj_responding.wait(timeout=10)
+        response = mock.Mock()
+        response.json.return_value = vtj_response
+        return response
+
+    def wait_for_result(future, *args, **kwargs):
+        waiting_queries.release()
+        return future_result(future, *args, **kwargs)
+
+    def on_vtj_queried(**kwargs):
+        queried.append(kwargs["social_security_number"])
+
+    vtj_queried.connect(on_vtj_queried)
+    try:
+        with (
+            mock.patch(
+                "shared.vtj.vtj_client.requests.Session.post", side_effect=post
+            ) as mock_post,
+            mock.patch.object(Future, "result", wait_for_result),
+            ThreadPoolExecutor(max_workers=thread_count) as executor,
+        ):
+            results = [
+                executor.submit(
+                    VTJService.query_vtj_json, social_security_number, "handler"
+                )
+                for _ in range(thread_count)
+            ]
+            # Let VTJ respond once the other queries wait for the first one
+            for _ in range(thread_count - 1):
+                assert waiting_queries.acquire(timeout=10)
+            is_vtj_responding.set()
+            vtj_jsons = [result.result() for result in results]
+    finally:
+        vtj_queried.disconnect(on_vtj_queried)
+
+    assert mock_post.call_count == 1
+    assert queried == [social_security_number]
+    assert vtj_jsons == [json.dumps(vtj_response)] * thread_count
+    assert VTJService._queries_in_progress == {}
@@ -9,9 +9,11 @@ import openpyxl
 import pytest
 from auditlog.models import LogEntry
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.http import StreamingHttpResponse
 from django.shortcuts import reverse
-from django.test import override_settings
+from django.test import override_settings, RequestFactory
+from django.test.utils import CaptureQueriesContext
 from django.utils import translation
 from django.utils.timezone import localdate
 from django.utils.translation import gettext_lazy as _
@@ -21,10 +23,12 @@ from rest_framework import status
 from applications.api.handler_excel_views import YouthApplicationExcelExportViewSet
 from applications.employer_excel_export import (
     EmployerExcelExportErrorCode,
+    EmployerExcelExportService,
     get_excel_download_error_message,
 )
 from applications.enums import (
     AdditionalInfoUserReason,
+    AttachmentType,
     EmployerApplicationStatus,
     ExcelColumns,
     VtjTestCase,
@@ -36,11 +40,12 @@ from applications.exporters.excel_exporter import (
     EMPLOYMENT_START_DATE_FIELD_TITLE,
     ExcelField,
     FIELDS,
+    generate_data_rows,
+    get_attachment_type_and_number,
     get_attachment_uri,
     get_exportable_fields,
     get_reporting_columns,
     get_talpa_columns,
-    handle_special_cases,
     HIRED_WITHOUT_VOUCHER_ASSESSMENT_FIELD_TITLE,
     INVOICER_EMAIL_FIELD_TITLE,
     INVOICER_NAME_FIELD_TITLE,
@@ -56,11 +61,14 @@ from applications.exporters.excel_exporter import (
     VOUCHER_NUMBER_FIELD_TITLE,
     WORK_HOURS_FIELD_TITLE,
 )
+from applications.exporters.xlsx_writer import stream_xlsx
+from applications.management.commands.benchmark_excel_rows import resolve_cell_value
 from applications.models import EmployerSummerVoucher, YouthApplication
 from applications.tests.test_models import create_test_employer_summer_vouchers
 from common.tests.factories import (
     ActiveVtjTestCaseYouthApplicationFactory,
     ActiveYouthApplicationFactory,
+    AttachmentFactory,
     EmployerApplicationFactory,
     EmployerSummerVoucherFactory,
     InactiveYouthApplicationFactory,
@@ -395,7 +403,10 @@ def test_excel_view_download_content(  # noqa: C901
                 assert output_column.value == voucher.value_in_euros
             elif excel_field.model_fields == ["attachments"]:
                 expected_attachment_uri = get_attachment_uri(
-                    voucher, excel_field, voucher.attachments, response.wsgi_request
+                    voucher,
+                    voucher.attachments,
+                    *get_attachment_type_and_number(excel_field),
+                    response.wsgi_request,
                 )
                 assert output_column.value == expected_attachment_uri
             elif (
@@ -414,7 +425,7 @@ def test_excel_view_download_content(  # noqa: C901
                 assert output_column.value == excel_field.value
             else:
                 values_tuple = tuple(
-                    handle_special_cases(
+                    resolve_cell_value(
                         getattr_nested(voucher, attr_str.split("__")),
                         attr_str,
                         voucher,
@@ -958,3 +969,110 @@ def test_talpa_excel_gated_2026_and_status_fields(staff_client, settings, exclud
     else:
         for title in expected_end:
             assert title not in header
+
+
+def _create_summer_voucher_with_attachments(created_at: datetime):
+    summer_voucher = EmployerSummerVoucherFactory()
+    # Create the attachments in reverse creation order to check that the columns are
+    # ordered by creation time and not by insertion order
+    for attachment_type in AttachmentType.values:
+        for index in reversed(range(3)):
+            with freeze_time(created_at + timedelta(minutes=index)):
+                AttachmentFactory(
+                    summer_voucher=summer_voucher, attachment_type=attachment_type
+                )
+    return summer_voucher
+
+
+@pytest.mark.django_db
+def test_excel_attachment_columns_use_prefetched_attachments():
+    attachment_fields = [
+        field for field in FIELDS if field.model_fields == ["attachments"]
+    ]
+    request = RequestFactory().get("/")
+
+    def export_attachment_columns(summer_vouchers):
+        queryset = EmployerExcelExportService.base_queryset(
+            {summer_voucher.pk for summer_voucher in summer_vouchers}
+        )
+        with CaptureQueriesContext(connection) as context:
+            rows = list(generate_data_rows(queryset, attachment_fields, request))
+        return rows, len(context.captured_queries)
+
+    created_at = utc_datetime(2024, 1, 1)
+    summer_vouchers = [_create_summer_voucher_with_attachments(created_at)]
+    _, single_voucher_query_count = export_attachment_columns(summer_vouchers)
+
+    summer_vouchers += [
+        _create_summer_voucher_with_attachments(created_at) for _ in range(4)
+    ]
+    rows, query_count = export_attachment_columns(summer_vouchers)
+
+    # One query for the summer vouchers and one for their attachments
+    assert query_count == single_voucher_query_count == 2
+    assert len(rows) == 5
+    for row in rows:
+        summer_voucher = EmployerSummerVoucher.objects.get(pk=row[0].split("/")[-4])
+        for field, uri in zip(attachment_fields, row):
+            assert uri == get_attachment_uri(
+                summer_voucher,
+                summer_voucher.attachments,
+                *get_attachment_type_and_number(field),
+                request,
+            )
+        for attachment_type in AttachmentType.values:
+            attachment_ids = [
+                str(attachment.pk)
+                for attachment in summer_voucher.attachments.filter(
+                    attachment_type=attachment_type
+                ).order_by("created_at")
+            ]
+            row_attachment_ids = [uri.split("/")[-2] for uri in row if uri]
+            assert [
+                attachment_id
+                for attachment_id in row_attachment_ids
+                if attachment_id in attachment_ids
+            ] == attachment_ids
+
+
+def test_stream_xlsx_writes_cells_by_field_definitions():
+    fields = [
+        ExcelField(ORDER_FIELD_TITLE, "", [], 15, "white", "int"),
+        ExcelField("", "", [], 5, "#7F7F7F"),
+        ExcelField(_("Nuoren nimi"), "%s", ["employee_name"], None, None),
+        ExcelField(SUM_FIELD_TITLE, "%s", ["value_in_euros"], 30, "#F7DAE3", "int"),
+    ]
+    rows = [[number, "", f" <{number}> & ", number * 100] for number in range(1, 6)]
+    rows.append([6, None, "\x01", "None"])
+
+    written_rows = []
+
+    def generate_rows():
+        for row in rows:
+            written_rows.append(row)
+            yield row
+
+    chunks = stream_xlsx(
+        fields, generate_rows(), sheet_name="Setelit & muut", rows_per_chunk=2
+    )
+    # The rows are consumed only as the chunks are iterated
+    content = next(chunks)
+    assert written_rows == []
+    content += b"".join(chunks)
+    assert written_rows == rows
+
+    workbook = openpyxl.load_workbook(filename=BytesIO(content))
+    worksheet = workbook.active
+    assert worksheet.title == "Setelit & muut"
+    assert list(worksheet.iter_rows(values_only=True)) == [
+        (str(ORDER_FIELD_TITLE), "", "Nuoren nimi", str(SUM_FIELD_TITLE)),
+        *[tuple(row) for row in rows[:-1]],
+        (6, None, "_x0001_", "None"),
+    ]
+    assert all(cell.font.b for cell in worksheet[1])
+    assert worksheet.column_dimensions["A"].width == 15
+    assert worksheet.column_dimensions["D"].width == 30
+    assert worksheet["B2"].fill.fgColor.rgb == "FF7F7F7F"
+    assert worksheet["B2"].border.left.style == "thin"
+    assert worksheet["D3"].fill.fgColor.rgb == "FFF7DAE3"
+    assert worksheet["C2"].fill.fill_type is None
@@ -1,4 +1,5 @@
 import itertools
+import json
 import operator
 import os
 from email.mime.image import MIMEImage
@@ -6,13 +7,23 @@ from typing import List
 from unittest import mock
 
 import base32_lib
+import jsonpath_ng
 import pytest
+from django.conf import settings
 from django.core import mail
 from django.test import override_settings
 from freezegun import freeze_time
 
 from applications.enums import EmployerApplicationStatus
-from applications.models import EmployerSummerVoucher, YouthSummerVoucher
+from applications.models import (
+    EmployerSummerVoucher,
+    SummerVoucherConfiguration,
+    YouthApplication,
+    YouthSummerVoucher,
+)
+from applications.services import _parse_jsonpath, VTJService
+from applications.tests.data.mock_vtj import mock_vtj_person_id_query_found_content
+from applications.tests.factories import SummerVoucherConfigurationFactory
 from common.tests.factories import (
     AttachmentFactory,
     EmployerApplicationFactory,
@@ -533,3 +544,122 @@ def test_get_random_serial_number():
     assert (
         sum(buckets) == sample_size
     )  # Sanity check that the buckets sum up to the total
+
+
+@pytest.mark.django_db
+def test_summer_voucher_configuration_cache(django_assert_num_queries):
+    SummerVoucherConfiguration.objects.filter(year=2030).delete()
+
+    with django_assert_num_queries(1):
+        assert SummerVoucherConfiguration.objects.get_for_year(2030) is None
+        assert SummerVoucherConfiguration.objects.get_for_year(2030) is None
+    assert YouthSummerVoucher.voucher_value_in_euros_in_year(2030) == (
+        settings.SUMMER_VOUCHER_DEFAULT_VOUCHER_VALUE
+    )
+
+    # Saving a configuration clears the cache
+    configuration = SummerVoucherConfigurationFactory(
+        year=2030, voucher_value_in_euros=400
+    )
+    with django_assert_num_queries(1):
+        assert YouthSummerVoucher.voucher_value_in_euros_in_year(2030) == 400
+        assert YouthSummerVoucher.voucher_value_in_euros_in_year(2030) == 400
+
+    configuration.voucher_value_in_euros = 450
+    configuration.save()
+    assert YouthSummerVoucher.voucher_value_in_euros_in_year(2030) == 450
+
+    # Deleting a configuration clears the cache
+    configuration.delete()
+    assert SummerVoucherConfiguration.objects.get_for_year(2030) is None
+
+
+@pytest.mark.django_db
+def test_summer_voucher_configuration_cache_expires(settings):
+    settings.SUMMER_VOUCHER_CONFIGURATION_CACHE_TIMEOUT = 60
+    SummerVoucherConfigurationFactory(year=2030, voucher_value_in_euros=400)
+    with freeze_time() as frozen_time:
+        assert YouthSummerVoucher.voucher_value_in_euros_in_year(2030) == 400
+        # Update without sending signals as if the change was made in another process
+        SummerVoucherConfiguration.objects.filter(year=2030).update(
+            voucher_value_in_euros=450
+        )
+        assert YouthSummerVoucher.voucher_value_in_euros_in_year(2030) == 400
+        frozen_time.tick(61)
+        assert YouthSummerVoucher.voucher_value_in_euros_in_year(2030) == 450
+
+
+@pytest.mark.django_db
+def test_summer_voucher_configuration_preload(django_assert_num_queries):
+    for created_at in [
+        utc_datetime(2023, 6, 1),
+        utc_datetime(2024, 1, 1),
+        utc_datetime(2024, 6, 1),
+        utc_datetime(2025, 6, 1),
+    ]:
+        with freeze_time(created_at):
+            EmployerSummerVoucherFactory()
+    summer_vouchers = list(EmployerSummerVoucher.objects.all())
+    SummerVoucherConfiguration.objects.cache.clear()
+    expected_values = [
+        SummerVoucherConfiguration.objects.get(
+            year=summer_voucher.created_at.year
+            - (1 if summer_voucher.created_at.month == 1 else 0)
+        ).voucher_value_in_euros
+        for summer_voucher in summer_vouchers
+    ]
+
+    with django_assert_num_queries(1):
+        SummerVoucherConfiguration.objects.preload()
+        assert [
+            summer_voucher.value_in_euros for summer_voucher in summer_vouchers
+        ] == expected_values
+        # Years without a configuration are not queried after preloading all years
+        assert SummerVoucherConfiguration.objects.get_for_year(2099) is None
+
+
+def _vtj_json_content(last_name: str) -> str:
+    return mock_vtj_person_id_query_found_content(
+        first_name="Anna",
+        last_name=last_name,
+        social_security_number="010101A0101",
+        is_alive=True,
+        is_home_municipality_helsinki=True,
+    )
+
+
+def test_youth_application_vtj_json_is_parsed_once():
+    youth_application = YouthApplication(
+        social_security_number="010101A0101",
+        encrypted_original_vtj_json=_vtj_json_content(last_name="Aalto"),
+    )
+
+    with mock.patch("applications.models.json.loads", wraps=json.loads) as loads:
+        assert youth_application.vtj_first_name == "Anna"
+        assert youth_application.vtj_last_name == "Aalto"
+        assert youth_application.vtj_home_municipality
+        assert youth_application.is_social_security_number_valid_according_to_vtj
+        assert not youth_application.is_applicant_dead_according_to_vtj
+    assert loads.call_count == 1
+
+    # Changing the VTJ JSON fields invalidates the parsed data
+    youth_application.encrypted_handler_vtj_json = _vtj_json_content(
+        last_name="Virtanen"
+    )
+    assert youth_application.vtj_last_name == "Virtanen"
+    youth_application.encrypted_handler_vtj_json = None
+    assert youth_application.vtj_last_name == "Aalto"
+    youth_application.encrypted_original_vtj_json = "invalid json"
+    assert youth_application.vtj_json is None
+
+
+def test_vtj_service_compiles_jsonpath_expressions_once():
+    vtj_json = json.loads(_vtj_json_content(last_name="Aalto"))
+    _parse_jsonpath.cache_clear()
+
+    with mock.patch(
+        "applications.services.jsonpath_ng.parse", wraps=jsonpath_ng.parse
+    ) as parse:
+        for _ in range(3):
+            assert VTJService.get_last_name(vtj_json) == "Aalto"
+    assert parse.call_count == 1
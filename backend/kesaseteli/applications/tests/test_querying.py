@@ -8,6 +8,7 @@ from django.db.models import Q
 from django.utils import timezone
 from freezegun import freeze_time
 
+from applications.enums import YouthApplicationRejectedReason, YouthApplicationStatus
 from applications.models import YouthApplication
 from common.tests.factories import YouthApplicationFactory
 
@@ -245,3 +246,54 @@ def test_youth_application_query_set_matches_any_of(api_client):
     ).values_list("pk", flat=True)
 
     assert sorted(matched_pks) == sorted(expected_matched_pks)
+
+
+def get_expected_duplicate_rejected_reason(email, social_security_number):
+    if YouthApplication.objects.is_email_or_social_security_number_active_this_year(
+        email, social_security_number
+    ):
+        return YouthApplicationRejectedReason.ALREADY_ASSIGNED
+    elif YouthApplication.objects.is_email_used_this_year(email):
+        return YouthApplicationRejectedReason.EMAIL_IN_USE
+    return None
+
+
+@freeze_time("2022-02-02")
+@pytest.mark.django_db
+@pytest.mark.parametrize("status", YouthApplicationStatus.values)
+@pytest.mark.parametrize("is_active", [False, True])
+@pytest.mark.parametrize("alive_seconds", [0, 43199, 43200, 86400 * 40])
+def test_youth_application_query_set_get_duplicate_rejected_reason_this_year(
+    api_client,
+    settings,
+    django_assert_num_queries,
+    status,
+    is_active: bool,
+    alive_seconds: int,
+):
+    settings.NEXT_PUBLIC_ACTIVATION_LINK_EXPIRATION_SECONDS = 43200
+    emails = get_two_test_emails()
+    social_security_numbers = get_two_test_social_security_numbers()
+    app = set_active_state(
+        YouthApplicationFactory.create(
+            email=emails[0],
+            social_security_number=social_security_numbers[0],
+            status=status,
+        ),
+        is_active,
+    )
+    app.created_at = timezone.now() - timedelta(seconds=alive_seconds)
+    app.save()
+
+    for email in emails:
+        for social_security_number in social_security_numbers:
+            expected_reason = get_expected_duplicate_rejected_reason(
+                email, social_security_number
+            )
+            with django_assert_num_queries(1):
+                reason = (
+                    YouthApplication.objects.get_duplicate_rejected_reason_this_year(
+                        email, social_security_number
+                    )
+                )
+            assert reason == expected_reason, (email, social_security_number)
@@ -1,8 +1,12 @@
+from unittest import mock
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
 
+from applications.api.v1.views import SchoolListView
 from applications.models import School
+from applications.services import SchoolService
 
 
 def get_schools_api_url():
@@ -55,3 +59,52 @@ def test_schools_list_returns_unique_elements_collection(api_client, school_list
 def test_schools_list_returns_sorted_collection(api_client, school_list):
     response = api_client.get(get_schools_api_url())
     assert sorted(response.json(), key=str.casefold) == response.json()
+
+
+@pytest.mark.django_db
+def test_schools_list_cache_headers(api_client, school_list, settings):
+    settings.SCHOOL_LIST_CACHE_MAX_AGE = 300
+    response = api_client.get(get_schools_api_url())
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"]
+    assert "max-age=300" in response["Cache-Control"]
+    assert "public" in response["Cache-Control"]
+
+    response = api_client.get(
+        get_schools_api_url(), HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+
+
+@pytest.mark.django_db
+def test_schools_list_is_cached_until_schools_are_imported(api_client, school_list):
+    response = api_client.get(get_schools_api_url())
+    etag = response["ETag"]
+
+    School.objects.create(name="Cached School")
+    response = api_client.get(get_schools_api_url())
+    assert "Cached School" not in response.json()
+    assert response["ETag"] == etag
+
+    SchoolService.import_schools(["Imported School"])
+    response = api_client.get(get_schools_api_url())
+    assert "Cached School" in response.json()
+    assert "Imported School" in response.json()
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_schools_list_collation_is_detected_once(api_client, school_list, monkeypatch):
+    monkeypatch.delattr(SchoolListView, "_preferred_sorter", raising=False)
+    with mock.patch.object(
+        SchoolListView,
+        "detect_preferred_sorter",
+        autospec=True,
+        side_effect=SchoolListView.detect_preferred_sorter,
+    ) as detect_preferred_sorter:
+        for _ in range(2):
+            SchoolService.clear_school_list_cache()
+            response = api_client.get(get_schools_api_url())
+            assert len(response.json()) == School.objects.count()
+    assert detect_preferred_sorter.call_count == 1
@@ -1,12 +1,21 @@
+from smtplib import SMTPException
 from unittest import mock
 
 import pytest
+from django.core import mail
+from django.core.mail import get_connection
+from django.template import Template
 from django.template.exceptions import TemplateDoesNotExist
 from django.utils.html import strip_tags
 
 from applications.enums import EmailTemplateType
 from applications.models import EmailTemplate
-from applications.services import EmailTemplateService
+from applications.services import (
+    _compiled_email_templates,
+    EmailBatchSender,
+    EmailTemplateService,
+)
+from common.tests.factories import YouthSummerVoucherFactory
 
 
 @pytest.mark.django_db
@@ -291,3 +300,51 @@ class TestIsTemplateUpToDate:
         template.text_body = "First paragraph\nSecond paragraph"
 
         assert EmailTemplateService.is_template_up_to_date(template) is True
+
+
+@pytest.mark.django_db
+def test_email_batch_sender_reuses_connection_and_templates():
+    vouchers = YouthSummerVoucherFactory.create_batch(3)
+    _compiled_email_templates.clear()
+
+    with (
+        mock.patch(
+            "applications.services.get_connection", wraps=get_connection
+        ) as mock_get_connection,
+        mock.patch("applications.services.Template", wraps=Template) as mock_template,
+    ):
+        with EmailBatchSender() as email_sender:
+            for voucher in vouchers:
+                assert voucher.send_youth_summer_voucher_email(
+                    language="fi", email_sender=email_sender
+                )
+
+    assert mock_get_connection.call_count == 1
+    # Subject, text body and html body are compiled once for the whole batch
+    assert mock_template.call_count == 3
+    assert [message.to for message in mail.outbox] == [
+        [voucher.youth_application.email] for voucher in vouchers
+    ]
+    assert email_sender.failures == []
+
+
+@pytest.mark.django_db
+def test_email_batch_sender_reports_failures_per_message():
+    voucher, other_voucher = YouthSummerVoucherFactory.create_batch(2)
+
+    with EmailBatchSender() as email_sender:
+        with mock.patch.object(
+            email_sender.connection,
+            "send_messages",
+            side_effect=[SMTPException("Connection lost"), 1],
+        ):
+            assert not voucher.send_youth_summer_voucher_email(
+                language="fi", email_sender=email_sender
+            )
+            assert other_voucher.send_youth_summer_voucher_email(
+                language="fi", email_sender=email_sender
+            )
+
+    assert len(email_sender.failures) == 1
+    assert email_sender.failures[0].recipient_list == [voucher.youth_application.email]
+    assert "Connection lost" in email_sender.failures[0].error
@@ -2832,7 +2832,7 @@ def test_create_youth_application_returns_503_on_vtj_request_exception(api_clien
     data = YouthApplicationSerializer(app).data
 
     with mock.patch(
-        "shared.vtj.vtj_client.requests.post",
+        "shared.vtj.vtj_client.requests.Session.post",
         side_effect=RequestsConnectionError("VTJ down"),
     ):
         with mock.patch("sentry_sdk.capture_exception") as mock_capture:
@@ -2859,7 +2859,7 @@ def test_retrieve_youth_application_returns_503_on_vtj_request_exception(staff_c
     app = AwaitingManualProcessingYouthApplicationFactory.create()
 
     with mock.patch(
-        "shared.vtj.vtj_client.requests.post",
+        "shared.vtj.vtj_client.requests.Session.post",
         side_effect=RequestsConnectionError("VTJ down"),
     ):
         with mock.patch("sentry_sdk.capture_exception") as mock_capture:
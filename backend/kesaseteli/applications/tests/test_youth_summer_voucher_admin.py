@@ -1,3 +1,4 @@
+from smtplib import SMTPException
 from unittest.mock import Mock, patch
 
 import pytest
@@ -80,6 +81,34 @@ def test_resend_voucher_action_failure(youth_summer_voucher_admin):
     assert any("Failed to resend summer voucher to 1 applicant." in m for m in msgs)
 
 
+@pytest.mark.django_db
+def test_resend_voucher_action_lists_failed_recipients(youth_summer_voucher_admin):
+    voucher = YouthSummerVoucherFactory()
+
+    request = RequestFactory().post(
+        reverse("admin:applications_youthsummervoucher_changelist")
+    )
+    request.user = Mock()
+    request.session = Mock()
+    storage = FallbackStorage(request)
+    request._messages = storage
+
+    queryset = YouthSummerVoucher.objects.filter(pk=voucher.pk)
+    with patch(
+        "django.core.mail.backends.locmem.EmailBackend.send_messages",
+        side_effect=SMTPException("Connection lost"),
+    ):
+        youth_summer_voucher_admin.resend_voucher(request, queryset)
+
+    # The failed recipients, including the handler copy, are listed
+    msgs = [msg.message for msg in storage]
+    assert any(
+        m.startswith("Failed to send the email to: ")
+        and voucher.youth_application.email in m
+        for m in msgs
+    )
+
+
 @pytest.mark.django_db
 def test_search_fields_exist(youth_summer_voucher_admin):
     search_fields = youth_summer_voucher_admin.search_fields
@@ -65,6 +65,31 @@ def are_same_text_lists(a, b) -> bool:
     )
 
 
+def build_email(
+    subject,
+    message,
+    from_email,
+    recipient_list,
+    bcc=None,
+    html_message=None,
+    images: Optional[List[MIMEImage]] = None,
+    connection=None,
+) -> EmailMultiAlternatives:
+    """
+    Build an email with given parameters, see send_mail_with_error_logging.
+    """
+    mail = EmailMultiAlternatives(
+        subject, message, from_email, to=recipient_list, bcc=bcc, connection=connection
+    )
+    if html_message:
+        mail.attach_alternative(html_message, "text/html")
+        if images:
+            mail.mixed_subtype = "related"
+            for image in images:
+                mail.attach(image)
+    return mail
+
+
 def send_mail_with_error_logging(
     subject,
     message,
@@ -93,17 +118,16 @@ def send_mail_with_error_logging(
         mixed_subtype to related.
     :return: True if email was sent, otherwise False.
     """
-    connection = get_connection(fail_silently=True)
-    mail = EmailMultiAlternatives(
-        subject, message, from_email, to=recipient_list, bcc=bcc, connection=connection
+    mail = build_email(
+        subject,
+        message,
+        from_email,
+        recipient_list,
+        bcc=bcc,
+        html_message=html_message,
+        images=images,
+        connection=get_connection(fail_silently=True),
     )
-    if html_message:
-        mail.attach_alternative(html_message, "text/html")
-        if images:
-            mail.mixed_subtype = "related"
-            for image in images:
-                mail.attach(image)
-
     sent_email_count = mail.send(fail_silently=True)
     if sent_email_count == 0:
         LOGGER.error(error_message)
@@ -144,6 +144,7 @@ env = environ.Env(
     VTJ_USERNAME=(str, ""),
     VTJ_PASSWORD=(str, ""),
     VTJ_TIMEOUT=(int, 30),
+    VTJ_CACHE_TIMEOUT=(int, 60),
     NEXT_PUBLIC_ENABLE_SUOMIFI=(bool, False),
     SUOMIFI_TEST=(bool, False),
     # base64 encoded public key certificate (e.g. base64 -w 0 public.pem)
@@ -162,6 +163,8 @@ env = environ.Env(
     SUOMIFI_ADMINISTRATIVE_EMAIL=(str, None),
     EXCEL_DOWNLOAD_BATCH_SIZE=(int, 50),
     EXCLUDE_2026_EXCEL_FIELDS=(bool, True),
+    SCHOOL_LIST_CACHE_TIMEOUT=(int, 15 * 60),
+    SCHOOL_LIST_CACHE_MAX_AGE=(int, 5 * 60),
     APP_RELEASE=(str, ""),
     OPENSHIFT_BUILD_COMMIT=(str, ""),
     SAML_ALLOWED_HOSTS=(list, None),
@@ -191,6 +194,7 @@ VTJ_PERSONAL_ID_QUERY_URL = env.str("VTJ_PERSONAL_ID_QUERY_URL")
 VTJ_USERNAME = env.str("VTJ_USERNAME")
 VTJ_PASSWORD = env.str("VTJ_PASSWORD")
 VTJ_TIMEOUT = env.int("VTJ_TIMEOUT")
+VTJ_CACHE_TIMEOUT = env.int("VTJ_CACHE_TIMEOUT")
 NEXT_PUBLIC_ENABLE_SUOMIFI = env("NEXT_PUBLIC_ENABLE_SUOMIFI")
 
 if NEXT_PUBLIC_ENABLE_SUOMIFI and not SOCIAL_SECURITY_NUMBER_HASH_KEY:
@@ -199,6 +203,9 @@ if NEXT_PUBLIC_ENABLE_SUOMIFI and not SOCIAL_SECURITY_NUMBER_HASH_KEY:
     )
 EXCEL_DOWNLOAD_BATCH_SIZE = env.int("EXCEL_DOWNLOAD_BATCH_SIZE")
 EXCLUDE_2026_EXCEL_FIELDS = env.bool("EXCLUDE_2026_EXCEL_FIELDS")
+# Seconds the school list is cached on the server and in the clients
+SCHOOL_LIST_CACHE_TIMEOUT = env.int("SCHOOL_LIST_CACHE_TIMEOUT")
+SCHOOL_LIST_CACHE_MAX_AGE = env.int("SCHOOL_LIST_CACHE_MAX_AGE")
 
 DB_PREFIX = {
     None: env.str("DB_PREFIX"),
@@ -878,6 +885,8 @@ SUMMER_VOUCHER_DEFAULT_TARGET_GROUPS = [
 SUMMER_VOUCHER_DEFAULT_VOUCHER_VALUE = 350
 SUMMER_VOUCHER_DEFAULT_MIN_WORK_COMPENSATION = 500
 SUMMER_VOUCHER_DEFAULT_MIN_WORK_HOURS = 60
+# Seconds the summer voucher configurations are cached in each process
+SUMMER_VOUCHER_CONFIGURATION_CACHE_TIMEOUT = 60
 
 # Load auditlog settings
 from kesaseteli.auditlog_settings import *  # noqa: E402, F403
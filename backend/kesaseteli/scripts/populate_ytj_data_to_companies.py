@@ -23,25 +23,37 @@ Prerequisites
 
      /path/to/.venv/bin/python /path/to/scripts/populate_ytj_data_to_companies.py
 
+   Options:
+
+     --file PATH        Filtered data file (default: FILTERED_DATA_FILE)
+     --chunk-size N     Records upserted per query (default: CHUNK_SIZE)
+     --workers N        Parse the records in N worker processes (default: 0,
+                        i.e. parse in the main process)
+
 Behaviour
 ---------
-- For each record in FILTERED_DATA_FILE, the script looks up the Company by
-  business_id. If found, it updates all fields. If not found, it creates a
-  new Company record.
+- The file is streamed with ijson, so it is never loaded into memory as a
+  whole. The records are upserted in chunks with one
+  bulk_create(update_conflicts=True) query on business_id per chunk: existing
+  companies are updated and missing ones are created.
 - organization_type is derived automatically from company_form using the
   same resolve_organization_type() function used by the rest of the app.
 - ytj_json is stored in the {"companies": [<record>]} wrapper format for
   compatibility with the standard YTJ API response shape.
-- Errors on individual records are logged with a full traceback and do not
-  abort the run. A summary is printed at the end.
+- Errors on individual records and chunks are logged with a full traceback
+  and do not abort the run. Progress and throughput are printed after each
+  chunk and a summary is printed at the end.
 """
 
-import json
+import argparse
 import os
 import sys
+import time
 import traceback
+from multiprocessing import Pool
 
 import django
+import ijson
 
 # Add the parent directory of 'scripts' to the Python path so Django imports work
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -55,6 +67,22 @@ from companies.models import Company  # noqa: E402
 
 FILTERED_DATA_FILE = os.path.join(SCRIPT_DIR, "data", "data_20260709_filtered.json")
 
+# Number of companies upserted with one query
+CHUNK_SIZE = 1000
+
+# Company fields updated from the YTJ data when the company already exists
+UPDATE_FIELDS = [
+    "name",
+    "company_form",
+    "industry",
+    "street_address",
+    "postcode",
+    "city",
+    "organization_type",
+    "ytj_json",
+    "modified_at",
+]
+
 
 def resolve_organization_type(company_form: str) -> str:
     """
@@ -174,83 +202,145 @@ def parse_record(record: dict) -> dict:
     }
 
 
-def populate_companies():
+def build_company_fields(record: dict) -> tuple:
+    """
+    Build the Company field values of a raw YTJ company record.
+
+    Returns a (business_id, fields, error) tuple where fields is None if the
+    record cannot be used. Only plain data is returned, so that the records can
+    be parsed in worker processes.
+    """
+    business_id = record.get("businessId", {}).get("value")
+    if not business_id:
+        return None, None, "Record missing businessId value, skipping."
+
+    try:
+        company_data = parse_record(record)
+
+        # Normalize city to Title Case (e.g. "Helsinki" not "HELSINKI")
+        city = company_data.get("city")
+        if city:
+            company_data["city"] = city.title()
+
+        return (
+            business_id,
+            {
+                **company_data,
+                "organization_type": resolve_organization_type(
+                    company_data.get("company_form", "")
+                ),
+                # Wrap in expected ytj_json format for system compatibility
+                "ytj_json": {"companies": [record]},
+            },
+            None,
+        )
+    except Exception as e:
+        return business_id, None, f"{e}\n{traceback.format_exc()}"
+
+
+def upsert_companies(companies_by_business_id: dict) -> tuple[int, int]:
+    """
+    Create or update the given companies with one upsert query.
+
+    Returns a (created_count, updated_count) tuple.
+    """
+    existing_count = Company.objects.filter(
+        business_id__in=companies_by_business_id.keys()
+    ).count()
+    Company.objects.bulk_create(
+        [
+            Company(business_id=business_id, **fields)
+            for business_id, fields in companies_by_business_id.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["business_id"],
+        update_fields=UPDATE_FIELDS,
+    )
+    return len(companies_by_business_id) - existing_count, existing_count
+
+
+def populate_companies(
+    data_file: str = FILTERED_DATA_FILE, chunk_size: int = CHUNK_SIZE, workers: int = 0
+):
     """
-    Read filtered YTJ company records from FILTERED_DATA_FILE and upsert
-    them into the Company model.
+    Stream filtered YTJ company records from data_file and upsert them into the
+    Company model.
 
     For each record:
     - Parses the raw YTJ JSON into Company field values (name, company_form,
-      industry, street_address, postcode, city).
-    - Looks up the existing Company by business_id.
-      - If found: updates all fields including ytj_json.
-      - If not found: creates a new Company record.
+      industry, street_address, postcode, city), optionally in worker processes.
     - Derives organization_type automatically from company_form.
     - Stores the raw YTJ record in ytj_json wrapped as {"companies": [record]}
       to match the standard YTJ API response shape.
 
-    Errors on individual records are caught, printed with a full traceback,
-    and counted — they do not abort the run. A summary of updated/created/
-    errored records is printed at the end.
+    The parsed records are upserted chunk_size at a time by business_id: existing
+    companies are updated and missing ones are created. If a business_id appears
+    several times in a chunk, its last record is used.
+
+    Errors on individual records and chunks are caught, printed with a full
+    traceback, and counted — they do not abort the run. Progress is printed after
+    each chunk and a summary of updated/created/errored records at the end.
     """
 
-    if not os.path.exists(FILTERED_DATA_FILE):
-        print(f"Error: Filtered data file not found at {FILTERED_DATA_FILE}")  # noqa: T201
+    if not os.path.exists(data_file):
+        print(f"Error: Filtered data file not found at {data_file}")  # noqa: T201
         return
 
-    with open(FILTERED_DATA_FILE, "r") as f:
-        try:
-            records = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"Error decoding JSON: {e}")  # noqa: T201
-            return
-
-    print(f"Loaded {len(records)} records from filtered data file.")  # noqa: T201
-
     updated_count = 0
     created_count = 0
     error_count = 0
+    processed_count = 0
+    start_time = time.monotonic()
 
-    for record in records:
-        business_id = record.get("businessId", {}).get("value")
-        if not business_id:
-            print("Warning: Record missing businessId value, skipping.")  # noqa: T201
-            error_count += 1
-            continue
-
+    def flush(chunk: dict):
+        nonlocal created_count, updated_count, error_count
         try:
-            company_data = parse_record(record)
-
-            # Normalize city to Title Case (e.g. "Helsinki" not "HELSINKI")
-            city = company_data.get("city")
-            if city:
-                company_data["city"] = city.title()
-
-            # Wrap in expected ytj_json format for system compatibility
-            ytj_data = {"companies": [record]}
-
-            _, created = Company.objects.update_or_create(
-                business_id=business_id,
-                defaults={
-                    **company_data,
-                    "organization_type": resolve_organization_type(
-                        company_data.get("company_form", "")
-                    ),
-                    "ytj_json": ytj_data,
-                },
-            )
-
-            if created:
-                created_count += 1
-                print(f"Created: {company_data['name']} ({business_id})")  # noqa: T201
-            else:
-                updated_count += 1
-                print(f"Updated: {company_data['name']} ({business_id})")  # noqa: T201
-
+            created, updated = upsert_companies(chunk)
+            created_count += created
+            updated_count += updated
         except Exception as e:
-            print(f"Error processing business ID {business_id}: {e}")  # noqa: T201
+            print(f"Error upserting {len(chunk)} companies: {e}")  # noqa: T201
             traceback.print_exc()
-            error_count += 1
+            error_count += len(chunk)
+        elapsed = time.monotonic() - start_time
+        print(  # noqa: T201
+            f"Processed {processed_count} records in {elapsed:.1f} s"
+            f" ({processed_count / elapsed if elapsed else 0:.0f} records/s)"
+        )
+
+    pool = Pool(workers) if workers > 0 else None
+    try:
+        with open(data_file, "rb") as f:
+            # use_float avoids Decimal values, which cannot be stored in ytj_json
+            records = ijson.items(f, "item", use_float=True)
+            if pool:
+                results = pool.imap(build_company_fields, records, chunksize=100)
+            else:
+                results = map(build_company_fields, records)
+
+            chunk = {}
+            for business_id, fields, error in results:
+                processed_count += 1
+                if error:
+                    if business_id:
+                        print(  # noqa: T201
+                            f"Error processing business ID {business_id}: {error}"
+                        )
+                    else:
+                        print(f"Warning: {error}")  # noqa: T201
+                    error_count += 1
+                    continue
+                chunk[business_id] = fields
+                if len(chunk) >= chunk_size:
+                    flush(chunk)
+                    chunk = {}
+            if chunk:
+                flush(chunk)
+    except ijson.JSONError as e:
+        print(f"Error decoding JSON: {e}")  # noqa: T201
+    finally:
+        if pool:
+            pool.terminate()
 
     print("\nPopulation summary:")  # noqa: T201
     print(f"  Updated: {updated_count}")  # noqa: T201
@@ -258,5 +348,18 @@ def populate_companies():
     print(f"  Errors:  {error_count}")  # noqa: T201
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Populate Company model data from a filtered YTJ data dump."
+    )
+    parser.add_argument("--file", default=FILTERED_DATA_FILE)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=0)
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    populate_companies()
+    args = parse_args()
+    populate_companies(
+        data_file=args.file, chunk_size=args.chunk_size, workers=args.workers
+    )
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime, timezone
-from typing import Callable, Optional, Union
+from typing import Callable, Iterable, Optional, Tuple, Union
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -54,7 +54,65 @@ def log(
     no changes to the object iteself but it was (re-)sent to another system for
     example. Thus it will not log the "changes" of the object.
     """
+    _write_resilient_log_entries(
+        [
+            _get_resilient_log_entry(
+                actor,
+                actor_backend,
+                operation,
+                target,
+                status,
+                get_time(),
+                ip_address,
+                additional_information,
+            )
+        ]
+    )
+
+
+def log_many(
+    actor: Optional[Union[User, AnonymousUser]],
+    actor_backend: str,
+    operation: Operation,
+    targets: Iterable[Tuple[Union[Model, ModelBase], str]],
+    status: Status = Status.SUCCESS,
+    get_time: Callable[[], datetime] = _now,
+    ip_address: str = "",
+):
+    """
+    Write an event of each of the targets to the audit log with one bulk insert.
+
+    The targets are given as (target, additional_information) pairs, otherwise the
+    events are the same as the ones written by log.
+    """
     current_time = get_time()
+    _write_resilient_log_entries(
+        [
+            _get_resilient_log_entry(
+                actor,
+                actor_backend,
+                operation,
+                target,
+                status,
+                current_time,
+                ip_address,
+                additional_information,
+            )
+            for target, additional_information in targets
+        ]
+    )
+
+
+def _get_resilient_log_entry(
+    actor: Optional[Union[User, AnonymousUser]],
+    actor_backend: str,
+    operation: Operation,
+    target: Union[Model, ModelBase],
+    status: Status,
+    current_time: datetime,
+    ip_address: str,
+    additional_information: str,
+) -> StructuredResilientLogEntryData:
     user_id = str(actor.pk) if getattr(actor, "pk", None) else ""
     provider = (
         DJANGO_BACKEND_MAPPING.get(actor_backend, actor_backend)
@@ -99,19 +157,23 @@ def log(
     ):
         _add_changes(target, message)
 
+    return _create_resilient_log_entry(
+        user_id=user_id,
+        role=role,
+        ip_address=ip_address,
+        provider=provider,
+        operation=operation,
+        target=target,
+        status=status,
+        additional_information=additional_information,
+        message=message,
+    )
+
+
+def _write_resilient_log_entries(entries: list[StructuredResilientLogEntryData]):
     # Use resilient logger if configured
     if getattr(settings, "RESILIENT_LOGGER", None):
-        _create_resilient_log_entry(
-            user_id=user_id,
-            role=role,
-            ip_address=ip_address,
-            provider=provider,
-            operation=operation,
-            target=target,
-            status=status,
-            additional_information=additional_information,
-            message=message,
-        )
+        ResilientLogSource.bulk_create_structured(entries)
     else:
         raise ImproperlyConfigured(
             "No resilient logger configured. Add RESILIENT_LOGGER to settings.py. "
@@ -177,8 +239,8 @@ def _create_resilient_log_entry(
     status: Status,
     additional_information: str,
     message: dict,
-):
-    """Create a resilient log entry using the structured format."""
+) -> StructuredResilientLogEntryData:
+    """Create the data of a resilient log entry using the structured format."""
     target_type = _get_target_type(target)
     target_id = _get_target_id(target)
 
@@ -201,7 +263,7 @@ def _create_resilient_log_entry(
     if provider:
         extra["provider"] = provider
 
-    entry = StructuredResilientLogEntryData(
+    return StructuredResilientLogEntryData(
         level=logging.NOTSET,
         message=str(status.value),
         actor={
@@ -216,5 +278,3 @@ def _create_resilient_log_entry(
         },
         extra=extra,
     )
-
-    ResilientLogSource.bulk_create_structured([entry])
@@ -251,3 +251,43 @@ def test_log_user_with_backend(user):
             },
         },
     }
+
+
+@pytest.mark.freeze_time(FIXED_TIMESTAMP)
+@pytest.mark.django_db
+def test_log_many(user, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        audit_logging.log_many(
+            AnonymousUser(),
+            "",
+            Operation.READ,
+            [(user, "first"), (user, "second")],
+            ip_address="192.168.1.1",
+        )
+
+    log_entries = ResilientLogEntry.objects.order_by("pk")
+    assert [
+        ResilientLogSourceEntry(log_entry).get_document() for log_entry in log_entries
+    ] == [
+        {
+            **_common_fields,
+            "audit_event": {
+                **_common_fields["audit_event"],
+                "actor": {
+                    "role": "ANONYMOUS",
+                    "user_id": None,
+                    "ip_address": "192.168.1.1",
+                },
+                "target": {
+                    "id": str(user.pk),
+                    "type": "User",
+                },
+                "extra": {
+                    "source_pk": log_entry.pk,
+                    "status": "SUCCESS",
+                    "additional_information": additional_information,
+                },
+            },
+        }
+        for log_entry, additional_information in zip(log_entries, ["first", "second"])
+    ]
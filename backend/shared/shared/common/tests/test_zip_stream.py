@@ -0,0 +1,24 @@
+import io
+import zipfile
+
+from shared.common.zip_stream import ZipStreamBuffer
+
+
+def test_zip_stream_buffer():
+    buffer = ZipStreamBuffer()
+    chunks = []
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("first.txt", "first")
+        chunks.append(buffer.take())
+        with zf.open("second.txt", mode="w") as entry:
+            entry.write(b"second")
+        chunks.append(buffer.take())
+    chunks.append(buffer.take())
+
+    # The written bytes are taken out as they are produced
+    assert all(chunks)
+    assert buffer.take() == b""
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    assert archive.read("first.txt") == b"first"
+    assert archive.read("second.txt") == b"second"
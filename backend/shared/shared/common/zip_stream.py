@@ -0,0 +1,24 @@
+import io
+from typing import List
+
+
+class ZipStreamBuffer(io.RawIOBase):
+    """
+    Unseekable output for zipfile that collects the written bytes until they are
+    taken out, so a zip file can be streamed without keeping it in memory
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
@@ -1,3 +1,4 @@
+import threading
 import uuid
 from typing import Tuple
 
@@ -8,6 +9,10 @@ from requests.exceptions import RequestException
 
 from shared.vtj.signals import vtj_queried, vtj_query_failed
 
+# Sessions are not shared between threads, each thread reuses its own session and so
+# its pooled connections to VTJ
+_thread_local = threading.local()
+
 
 class VTJClient:
     """
@@ -43,6 +48,18 @@ class VTJClient:
             return username
         return ""
 
+    @staticmethod
+    def get_session() -> requests.Session:
+        """
+        Get the session of the current thread, whose pooled connections are reused
+        by the subsequent VTJ queries instead of opening a new connection for each
+        query.
+        """
+        session = getattr(_thread_local, "session", None)
+        if session is None:
+            session = _thread_local.session = requests.Session()
+        return session
+
     @property
     def _auth(self) -> Tuple[str, str]:
         return str(settings.VTJ_USERNAME or ""), str(settings.VTJ_PASSWORD or "")
@@ -69,7 +86,7 @@ class VTJClient:
         headers = kwargs.pop("headers", {})
         headers["X-Request-ID"] = request_id
         try:
-            response = requests.post(
+            response = self.get_session().post(
                 self._url,
                 auth=self._auth,
                 json=self._json(social_security_number, end_user),